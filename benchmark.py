@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for AI Learning App
+
+Usage: python benchmark.py [--iterations N] [--concurrency N] [--lessons N]
+                           [--llm-latency S] [--search-latency S] [--seed N]
+                           [--llm-cache off|all]
+                           [--baseline PATH] [--tolerance F] [--save-baseline]
+
+Generates courses and assessments through LearningAppCrew and the Flask API
+with a scripted FakeLLM and fake Serper search (see src/fakes.py), so it needs
+no API keys or network. Reports p50/p95 latency, throughput and peak memory per
+scenario and exits with status 1 when a result regresses past the baseline.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+DEFAULT_BASELINE = Path(__file__).parent / 'benchmark_baseline.json'
+
+# Settings that change what a scenario measures; baselines are only compared when they match
+COMPARED_SETTINGS = ('iterations', 'concurrency', 'lessons', 'llm_latency', 'search_latency', 'seed', 'llm_cache')
+
+# Absolute slack on top of the relative tolerance, so noise in tiny values isn't a regression
+METRIC_SLACK = {'p50_ms': 5.0, 'p95_ms': 5.0, 'peak_memory_mb': 1.0}
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def isolate(directory: Path):
+    """Point every output, cache and trace path at a scratch directory"""
+    os.environ.update({
+        'OUTPUTS_DIR': str(directory / 'outputs'),
+        'STORAGE_BACKEND': 'sqlite',
+        'STORAGE_DB': str(directory / 'outputs' / 'learning_app.db'),
+        'COURSE_CACHE_PATH': str(directory / 'course_cache.db'),
+        'SEARCH_CACHE_PATH': str(directory / 'search_cache.db'),
+        'LLM_CACHE_PATH': str(directory / 'llm_cache.db'),
+        'TRACE_DIR': str(directory / 'traces'),
+        # Speculative assessments would compete with the measured jobs
+        'ASSESSMENT_PREFETCH_WORKERS': '0',
+        # The fakes are installed on this process's crew
+        'CREW_EXECUTOR': 'thread',
+        # The fake LLM has no provider budgets; keep the gateway's concurrency limit only
+        'LLM_REQUESTS_PER_MINUTE': '0',
+        'LLM_TOKENS_PER_MINUTE': '0',
+        # No network: keep CrewAI's telemetry exporter from trying to reach its collector
+        'CREWAI_DISABLE_TELEMETRY': 'true',
+        'OPENAI_API_KEY': 'offline',
+        'SERPER_API_KEY': 'offline'
+    })
+
+class Scenario:
+    """One operation measured over several iterations"""
+
+    def __init__(self, name: str, operation, iterations: int):
+        self.name = name
+        self.operation = operation
+        self.iterations = iterations
+
+    def run(self, concurrency: int) -> dict:
+        latencies = []
+        lock = threading.Lock()
+
+        def timed(iteration):
+            start = time.perf_counter()
+            self.operation(iteration)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(timed, range(self.iterations)))
+        elapsed = time.perf_counter() - start
+
+        # Peak memory is taken from one extra run, so tracing doesn't skew the latencies
+        tracemalloc.start()
+        try:
+            self.operation(self.iterations)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+            'throughput_per_s': round(len(latencies) / elapsed, 3),
+            'peak_memory_mb': round(peak / 1024 / 1024, 2)
+        }
+
+def build_scenarios(args):
+    """Create the crew and app against fake backends and define the scenarios"""
+    from src import web_server
+    from src.fakes import use_fake_llm, use_fake_search
+
+    crew = web_server.get_crew()
+    use_fake_llm(crew, latency=args.llm_latency, seed=args.seed)
+    use_fake_search(latency=args.search_latency, seed=args.seed)
+    client = web_server.app.test_client()
+
+    # Final course files, as they are written
+    courses = []
+    crew.add_course_listener(courses.append)
+
+    def wait_for_job(response) -> dict:
+        body = response.get_json()
+        if response.status_code == 200 and body.get('status') == 'completed':
+            return body
+        if response.status_code != 202:
+            raise RuntimeError(f"Request failed: {body}")
+        while True:
+            job = client.get(f"/api/jobs/{body['job_id']}").get_json()
+            if job['status'] == 'completed':
+                return job
+            if job['status'] in ('error', 'cancelled'):
+                raise RuntimeError(f"Job {job['id']} {job['status']}: {job.get('error')}")
+            time.sleep(0.02)
+
+    def create_course(iteration):
+        result = crew.create_course(f"Benchmark Subject {iteration}", args.lessons, use_cache=False)
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+
+    def build_assessment(iteration):
+        result = crew.build_assessment(courses[iteration % len(courses)])
+        if 'error' in result:
+            raise RuntimeError(result['error'])
+
+    def api_create_course(iteration):
+        wait_for_job(client.post('/api/create-course', json={
+            'subject': f"API Benchmark Subject {iteration}",
+            'numLessons': args.lessons,
+            'bypassCache': True
+        }))
+
+    def api_build_assessment(iteration):
+        wait_for_job(client.post('/api/build-assessment', json={'courseFilename': courses[iteration % len(courses)]}))
+
+    def api_listing(iteration):
+        for path in ('/api/courses', '/api/assessments', '/api/outputs', '/metrics'):
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {path} returned {response.status_code}")
+
+    return [
+        Scenario('create_course', create_course, args.iterations),
+        Scenario('build_assessment', build_assessment, args.iterations),
+        Scenario('api_create_course', api_create_course, args.iterations),
+        Scenario('api_build_assessment', api_build_assessment, args.iterations),
+        Scenario('api_listing', api_listing, args.iterations * 10)
+    ]
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """List the results that are worse than the baseline by more than the tolerance"""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, slack in METRIC_SLACK.items():
+            if result[metric] > previous[metric] * (1 + tolerance) + slack:
+                regressions.append(f"{name} {metric}: {result[metric]} > {previous[metric]} baseline")
+        if result['throughput_per_s'] < previous['throughput_per_s'] * (1 - tolerance):
+            regressions.append(f"{name} throughput_per_s: {result['throughput_per_s']} < "
+                               f"{previous['throughput_per_s']} baseline")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark course and assessment generation offline")
+    parser.add_argument('--iterations', type=int, default=5, help="Runs per scenario")
+    parser.add_argument('--concurrency', type=int, default=1, help="Runs in flight at once")
+    parser.add_argument('--lessons', type=int, default=3, help="Lessons per course (1-3)")
+    parser.add_argument('--llm-latency', type=float, default=0.2, help="Fake LLM call latency in seconds")
+    parser.add_argument('--search-latency', type=float, default=0.1, help="Fake search latency in seconds")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the latency jitter")
+    parser.add_argument('--llm-cache', choices=['off', 'all'], default='off',
+                        help="Replay repeated prompts from the LLM response cache")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help="Baseline results file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed regression, as a fraction")
+    parser.add_argument('--save-baseline', action='store_true', help="Save the results as the new baseline")
+    args = parser.parse_args()
+
+    settings = {name: getattr(args, name) for name in COMPARED_SETTINGS}
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='learning_app_benchmark_') as directory:
+        isolate(Path(directory))
+        os.environ['LLM_CACHE'] = args.llm_cache
+        sys.path.insert(0, str(Path(__file__).parent))
+
+        # Agents and jobs are chatty; keep the report readable
+        warnings.filterwarnings('ignore', message='function callbacks cannot be serialized')
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            scenarios = build_scenarios(args)
+
+        print(f"Benchmarking with {json.dumps(settings)}")
+        print(f"{'scenario':<22} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>8} {'peak MB':>9}")
+        for scenario in scenarios:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                result = scenario.run(args.concurrency)
+            results[scenario.name] = result
+            print(f"{scenario.name:<22} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f} "
+                  f"{result['throughput_per_s']:>8.2f} {result['peak_memory_mb']:>9.2f}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'settings': settings, 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.is_file():
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r') as f:
+        baseline = json.load(f)
+    if baseline.get('settings') != settings:
+        print(f"\nBaseline was recorded with {json.dumps(baseline.get('settings'))}; not comparing")
+        return 0
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%} of the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\n✅ No regressions beyond {args.tolerance:.0%} of the baseline")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
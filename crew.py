@@ -2,140 +2,217 @@
 Main CrewAI setup for the AI Learning App
 """
 import os
+import re
 import json
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
-from crewai import Agent, Task, Crew, Process, LLM
-from crewai_tools import SerperDevTool
-import yaml
-from src.progress_tracker import progress_tracker
+from crewai import Task, Crew, Process, LLM
+from src.assessment_merge import assessment_size, lesson_digest, merge_questions
+from src.tracing import flush_trace_hooks, in_current_context, install_trace_hooks, set_attributes, span, trace_run
+from src.metrics import JSON_PARSE_FAILURES, TASK_DURATION, TASK_RETRIES, install_llm_hooks
+from src.llm_gateway import through_gateway
+from src.course_cache import coalesce_course, course_cache_key, get_course_cache
+from src.output_catalog import course_subject
+from src.output_parser import OutputParseError, extract_json, result_text
+from src.progress_tracker import ProgressTracker, progress_tracker
+from src.run_manifest import RunManifest
+from src.prompt_config import get_prompt_configs
+from src.templates import CrewTemplates
+from src.storage import OutputStorage, create_storage, default_outputs_path, kind_for_name
+from src.tools import get_search_tool, get_batch_search_tool
 
 # Load environment variables
 load_dotenv()
 
+# Appended to a task's description when its output could not be parsed as JSON
+JSON_RETRY_PROMPT = """
+
+YOUR PREVIOUS RESPONSE COULD NOT BE PARSED AS JSON.
+Parse error: {error}
+
+Previous response:
+{previous}
+
+Respond again with ONLY the complete, corrected JSON document and no other text."""
+
+# Prompt configuration versions whose templates are kept, for runs that outlive a reload
+TEMPLATE_VERSIONS = 4
+
+def with_course_filename(course, course_filename: str):
+    """Attach the name of the final course file a course result was saved as"""
+    if isinstance(course, dict):
+        return dict(course, course_filename=course_filename)
+    return course
+
 class LearningAppCrew:
     """Main crew class for the AI Learning Application"""
     
-    def __init__(self):
+    def __init__(self, storage: OutputStorage = None):
         self.config_path = Path(__file__).parent / "config"
-        self.outputs_path = Path(__file__).parent / "outputs"
-        self.outputs_path.mkdir(exist_ok=True)
+        self.outputs_path = default_outputs_path()
+        self.outputs_path.mkdir(parents=True, exist_ok=True)
+        
+        # Storage backend for courses, assessments and intermediate outputs
+        self.storage = storage or create_storage(self.outputs_path)
         
-        # Load configurations
-        self.agents_config = self._load_yaml("agents.yaml")
-        self.tasks_config = self._load_yaml("tasks.yaml")
+        # Validated agent and task configuration, reloaded when config/ changes
+        self.prompt_configs = get_prompt_configs()
+        self.prompt_configs.current()
         
-        # Configure GPT-4o Mini model
+        # Configure GPT-4o Mini model (LLM_TEMPERATURE=0 for reproducible, cacheable reruns)
         self.llm = LLM(
             model="gpt-4o-mini",
-            temperature=0.7
+            temperature=float(os.getenv("LLM_TEMPERATURE", "0.7"))
         )
         
-        # Initialize tools
-        self.search_tool = SerperDevTool()
+        # Initialize tools (cached Serper search over a pooled HTTP session)
+        self.search_tool = get_search_tool()
+        self.batch_search_tool = get_batch_search_tool()
+        
+        # Maximum number of lessons researched and written at the same time
+        self.lesson_parallelism = int(os.getenv("LESSON_PARALLELISM", "3"))
+        
+        # Times a task is re-prompted when its output can't be repaired into JSON
+        self.json_retries = int(os.getenv("JSON_RETRIES", "1"))
+        
+        # How assessments are generated: "chunked" (per lesson, then merged),
+        # "single" (one task for the whole course) or "auto" (chunked for multi-lesson courses)
+        self.assessment_mode = os.getenv("ASSESSMENT_MODE", "auto").lower()
+        
+        # Called with the name of each final course file as soon as it is written
+        self.course_listeners = []
+        
+        # Agent and prompt templates for the most recent models, tools and configuration versions
+        self._templates = OrderedDict()
+        self._templates_lock = threading.Lock()
+        
+        # Export LLM call latency and token usage on /metrics, and trace LLM and tool calls
+        install_llm_hooks()
+        install_trace_hooks()
+    
+    def add_course_listener(self, callback):
+        """Register a callback for newly written final course files"""
+        self.course_listeners.append(callback)
+    
+    def _notify_course_saved(self, course_filename: str):
+        """Tell listeners about a new final course file"""
+        for callback in self.course_listeners:
+            try:
+                callback(course_filename)
+            except Exception as e:
+                print(f"Error in course listener: {e}")
+    
+    @property
+    def agents_config(self) -> dict:
+        """Agent configuration of the current run (or the latest version outside a run)"""
+        return self.prompt_configs.active().agents
     
-    def _load_yaml(self, filename):
-        """Load YAML configuration file"""
-        with open(self.config_path / filename, 'r') as file:
-            return yaml.safe_load(file)
+    @property
+    def tasks_config(self) -> dict:
+        """Task configuration of the current run (or the latest version outside a run)"""
+        return self.prompt_configs.active().tasks_config
+    
+    @property
+    def config_hash(self) -> str:
+        """Hash of the raw configuration files of the current run"""
+        return self.prompt_configs.active().digest
+    
+    def _get_templates(self) -> CrewTemplates:
+        """Get the agent and prompt templates for the current model, tools and configuration
+        
+        A few configurations are kept, so runs that started before a reload
+        don't rebuild their templates.
+        """
+        config = self.prompt_configs.active()
+        tools = [self.batch_search_tool, self.search_tool]
+        key = (type(self.llm).__name__, self.llm.model, tuple(tool.name for tool in tools), config.digest)
+        with self._templates_lock:
+            templates = self._templates.get(key)
+            if templates is None:
+                templates = CrewTemplates(key, config.agents, config.tasks, through_gateway(self.llm), tools)
+                self._templates[key] = templates
+                while len(self._templates) > TEMPLATE_VERSIONS:
+                    self._templates.popitem(last=False)
+            else:
+                self._templates.move_to_end(key)
+            return templates
     
     def _create_agents(self):
         """Create agents from configuration"""
-        curriculum_builder = Agent(
-            role=self.agents_config['curriculum_builder']['role'],
-            goal=self.agents_config['curriculum_builder']['goal'],
-            backstory=self.agents_config['curriculum_builder']['backstory'],
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
-        )
-        
-        lesson_builder = Agent(
-            role=self.agents_config['lesson_builder']['role'],
-            goal=self.agents_config['lesson_builder']['goal'],
-            backstory=self.agents_config['lesson_builder']['backstory'],
-            tools=[self.search_tool],
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=5
-        )
-        
-        content_reviewer = Agent(
-            role=self.agents_config['content_reviewer']['role'],
-            goal=self.agents_config['content_reviewer']['goal'],
-            backstory=self.agents_config['content_reviewer']['backstory'],
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+        templates = self._get_templates()
+        return (
+            templates.agent('curriculum_builder'),
+            templates.agent('lesson_builder'),
+            templates.agent('content_reviewer')
         )
-        
-        return curriculum_builder, lesson_builder, content_reviewer
+    
+    def _create_lesson_builder(self):
+        """Create a lesson builder agent (one per lesson when lessons are written concurrently)"""
+        return self._get_templates().agent('lesson_builder')
     
     def _create_assessment_agent(self):
         """Create assessment builder agent"""
-        assessment_builder = Agent(
-            role=self.agents_config['assessment_builder']['role'],
-            goal=self.agents_config['assessment_builder']['goal'],
-            backstory=self.agents_config['assessment_builder']['backstory'],
-            llm=self.llm,
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
-        )
-        
-        return assessment_builder
+        return self._get_templates().agent('assessment_builder')
     
-    def _create_tasks_with_progress(self, subject: str, num_lessons: int, agents):
-        """Create tasks with progress tracking callbacks"""
+    def _create_tasks_with_progress(self, subject: str, num_lessons: int, agents, tracker: ProgressTracker = None,
+                                    manifest: RunManifest = None):
+        """Create tasks with progress tracking and checkpointing callbacks"""
         curriculum_builder, lesson_builder, content_reviewer = agents
+        tracker = tracker or progress_tracker
+        manifest = manifest or RunManifest.create(self.storage, subject, num_lessons)
+        templates = self._get_templates()
         
         # Task 1: Build curriculum
         def curriculum_callback(output):
-            progress_tracker.complete_stage("curriculum_building", "Curriculum structure created")
-            progress_tracker.start_stage("content_creation", "Starting content research and creation...")
+            self._save_checkpoint(manifest, "curriculum", f"curriculum_{manifest.run_id}.json", output.raw)
+            tracker.complete_stage("curriculum_building", "Curriculum structure created")
+            tracker.start_stage("content_creation", "Starting content research and creation...")
             return output
         
         build_curriculum_task = Task(
-            description=self.tasks_config['build_curriculum']['description'].format(
+            description=templates.task('build_curriculum').description.render(
                 subject=subject, 
                 num_lessons=num_lessons
             ),
-            expected_output=self.tasks_config['build_curriculum']['expected_output'],
+            expected_output=templates.task('build_curriculum').expected_output.text,
+            name='build_curriculum',
             agent=curriculum_builder,
-            output_file=f"outputs/curriculum_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             callback=curriculum_callback
         )
         
         # Task 2: Create lesson content
         def content_callback(output):
-            progress_tracker.complete_stage("content_creation", "Lesson content created")
-            progress_tracker.start_stage("content_review", "Reviewing and structuring content...")
+            self._complete_content_stage(output.raw, tracker, manifest)
             return output
         
         create_content_task = Task(
-            description=self.tasks_config['create_lesson_content']['description'],
-            expected_output=self.tasks_config['create_lesson_content']['expected_output'],
+            description=templates.task('create_lesson_content').description.text,
+            expected_output=templates.task('create_lesson_content').expected_output.text,
+            name='create_lesson_content',
             agent=lesson_builder,
-            output_file=f"outputs/lessons_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             context=[build_curriculum_task],
             callback=content_callback
         )
         
         # Task 3: Structure final course
         def review_callback(output):
-            progress_tracker.complete_stage("content_review", "Content review completed")
+            self._complete_review_stage(output.raw, tracker, manifest)
             return output
         
         structure_course_task = Task(
-            description=self.tasks_config['structure_final_course']['description'],
-            expected_output=self.tasks_config['structure_final_course']['expected_output'],
+            description=templates.task('structure_final_course').description.text,
+            expected_output=templates.task('structure_final_course').expected_output.text,
+            name='structure_final_course',
             agent=content_reviewer,
-            output_file=f"outputs/final_course_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
             context=[create_content_task],
             callback=review_callback
         )
@@ -146,102 +223,389 @@ class LearningAppCrew:
         """Create tasks from configuration (legacy method for compatibility)"""
         return self._create_tasks_with_progress(subject, num_lessons, agents)
     
-    def create_course(self, subject: str, num_lessons: int):
-        """Main method to create a course"""
+    def _save_checkpoint(self, manifest: RunManifest, stage: str, name: str, content):
+        """Store a stage's output and record it in the run manifest"""
+        self.storage.save(kind_for_name(name), name, content)
+        manifest.complete(stage, name)
+    
+    def _load_checkpoint(self, manifest: RunManifest, stage: str):
+        """Load a completed stage's output, or None if the stage has to run"""
+        name = manifest.output(stage)
+        if not name:
+            return None
+        try:
+            return self.storage.load(kind_for_name(name), name)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unusable checkpoint for {stage}: {e}")
+            return None
+    
+    def _kickoff(self, agents, tasks):
+        """Run tasks as a sequential crew, recording how long they take"""
+        labels = {
+            'task': '+'.join(task.name or 'unnamed' for task in tasks),
+            'agent': '+'.join(agent.role.strip() for agent in agents)
+        }
+        start = time.perf_counter()
+        status = 'error'
+        with span(labels['task'], kind='task', agent=labels['agent']):
+            try:
+                result = Crew(
+                    agents=agents,
+                    tasks=tasks,
+                    process=Process.sequential,
+                    verbose=True
+                ).kickoff()
+                status = 'success'
+                return result
+            finally:
+                TASK_DURATION.observe(time.perf_counter() - start, status=status, **labels)
+                # Let the event bus attach this task's LLM and tool calls before the span ends
+                flush_trace_hooks()
+    
+    def _parse_task_output(self, raw, task: Task = None):
+        """Parse a task's output as JSON, re-prompting only that task if it can't be repaired
+        
+        Returns the parsed output and the raw text it came from. Raises
+        OutputParseError when every retry fails too.
+        """
+        for attempt in range(self.json_retries + 1):
+            try:
+                return extract_json(raw), raw
+            except OutputParseError as e:
+                JSON_PARSE_FAILURES.inc(task=task.name if task else 'restored')
+                if task is None or attempt == self.json_retries:
+                    raise
+                print(f"Could not parse task output ({e}); retrying the task")
+                TASK_RETRIES.inc(task=task.name)
+                raw = self._retry_task(task, raw, e)
+    
+    def _retry_task(self, task: Task, previous, error: Exception) -> str:
+        """Run a task again with the parse error of its previous output attached"""
+        previous = str(previous)
+        if len(previous) > 20000:
+            previous = previous[:20000] + "..."
+        retry_task = Task(
+            description=task.description + JSON_RETRY_PROMPT.format(error=error, previous=previous),
+            expected_output=task.expected_output,
+            agent=task.agent,
+            name=task.name
+        )
+        result = self._kickoff([task.agent], [retry_task])
+        return result_text(result)
+    
+    def _complete_content_stage(self, raw, tracker: ProgressTracker, manifest: RunManifest):
+        """Save the lesson content and move progress on to the review stage"""
+        self._save_checkpoint(manifest, "content", f"lessons_{manifest.run_id}.json", raw)
+        tracker.complete_stage("content_creation", "Lesson content created")
+        tracker.start_stage("content_review", "Reviewing and structuring content...")
+    
+    def _complete_review_stage(self, raw, tracker: ProgressTracker, manifest: RunManifest):
+        """Save the structured course and mark the review stage as done"""
+        self._save_checkpoint(manifest, "review", f"final_course_{manifest.run_id}.json", raw)
+        tracker.complete_stage("content_review", "Content review completed")
+    
+    def _extract_lesson_outlines(self, curriculum):
+        """Get the lesson_N_outline entries of the curriculum output (raw text or parsed), in lesson order"""
+        try:
+            if isinstance(curriculum, str):
+                curriculum = extract_json(curriculum)
+            curriculum = curriculum.get('curriculum', {})
+        except (ValueError, AttributeError):
+            return []
+        
+        outline_keys = [key for key in curriculum if re.fullmatch(r'lesson_\d+_outline', key)]
+        outline_keys.sort(key=lambda key: int(key.split('_')[1]))
+        return [curriculum[key] for key in outline_keys]
+    
+    def _create_lesson(self, subject: str, lesson_number: int, outline: dict):
+        """Research and write a single lesson from its outline"""
+        lesson_builder = self._create_lesson_builder()
+        template = self._get_templates().task('create_single_lesson_content')
+        lesson_task = Task(
+            description=template.description.render(
+                subject=subject,
+                lesson_number=lesson_number,
+                lesson_outline=json.dumps(outline, indent=2)
+            ),
+            expected_output=template.expected_output.text,
+            name='create_single_lesson_content',
+            agent=lesson_builder
+        )
+        
+        result = self._kickoff([lesson_builder], [lesson_task])
+        
+        try:
+            lesson, _ = self._parse_task_output(result.raw, lesson_task)
+            return lesson.get('lesson', lesson)
+        except (ValueError, AttributeError):
+            # Keep the text; the reviewer structures it either way
+            return {"title": outline.get('title', f"Lesson {lesson_number}"), "content": result.raw}
+    
+    def _create_lessons_concurrently(self, subject: str, outlines, tracker: ProgressTracker, manifest: RunManifest):
+        """Write one lesson per outline, at most `lesson_parallelism` at a time
+        
+        Lessons already checkpointed in the manifest are reused, and each new
+        lesson is checkpointed as soon as it is written.
+        """
+        lessons = {}
+        for number in range(1, len(outlines) + 1):
+            lesson = self._load_checkpoint(manifest, f"lesson_{number}")
+            if lesson is not None:
+                lessons[number] = lesson
+        
+        def write_lesson(number, outline):
+            with span(f"lesson_{number}"):
+                lesson = self._create_lesson(subject, number, outline)
+            self._save_checkpoint(manifest, f"lesson_{number}", f"lesson_{number}_{manifest.run_id}.json", lesson)
+            return lesson
+        
+        pending = [(number, outline) for number, outline in enumerate(outlines, start=1) if number not in lessons]
+        workers = max(1, min(self.lesson_parallelism, len(pending)))
+        set_attributes(restored=len(lessons), written=len(pending), parallelism=workers)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lesson") as executor:
+            futures = {
+                executor.submit(in_current_context(write_lesson), number, outline): number
+                for number, outline in pending
+            }
+            for future in as_completed(futures):
+                number = futures[future]
+                lessons[number] = future.result()
+                tracker.update_stage_progress(
+                    "content_creation",
+                    len(lessons) * 100 // len(outlines),
+                    f"Lesson {number} of {len(outlines)} written"
+                )
+        
+        return {"lessons": {f"lesson_{number}": lessons[number] for number in sorted(lessons)}}
+    
+    def _run_course_pipeline(self, subject: str, agents, tasks, tracker: ProgressTracker, manifest: RunManifest):
+        """Run the course tasks, fanning lesson writing out to one task per lesson outline
+        
+        Stages already completed in the run manifest are restored from their
+        checkpoints instead of being run again. Returns the crew result and the
+        task that produced it, so finalization can re-prompt just that task.
+        """
+        curriculum_builder, lesson_builder, content_reviewer = agents
+        build_curriculum_task, create_content_task, structure_course_task = tasks
+        
+        # A structured course means only finalization is left
+        course = self._load_checkpoint(manifest, "review")
+        if course is not None:
+            for stage_id in ("curriculum_building", "content_creation", "content_review"):
+                tracker.complete_stage(stage_id, "Restored from checkpoint")
+            return SimpleNamespace(raw=json.dumps(course)), None
+        
+        outlines = self._extract_lesson_outlines(self._load_checkpoint(manifest, "curriculum") or {})
+        if outlines:
+            tracker.complete_stage("curriculum_building", "Restored from checkpoint")
+            tracker.start_stage("content_creation", "Starting content research and creation...")
+        else:
+            with span("curriculum"):
+                curriculum_result = self._kickoff([curriculum_builder], [build_curriculum_task])
+                try:
+                    curriculum, raw = self._parse_task_output(curriculum_result.raw, build_curriculum_task)
+                    if raw is not curriculum_result.raw:
+                        self._save_checkpoint(manifest, "curriculum", f"curriculum_{manifest.run_id}.json", raw)
+                    outlines = self._extract_lesson_outlines(curriculum)
+                except OutputParseError:
+                    outlines = []
+        
+        if not outlines:
+            # Fall back to writing every lesson in a single task
+            print("Could not split the curriculum into lesson outlines; writing all lessons in one task")
+            with span("content_and_review"):
+                result = self._kickoff([lesson_builder, content_reviewer], [create_content_task, structure_course_task])
+            return result, structure_course_task
+        
+        lessons = self._load_checkpoint(manifest, "content")
+        if lessons is not None:
+            tracker.complete_stage("content_creation", "Restored from checkpoint")
+            tracker.start_stage("content_review", "Reviewing and structuring content...")
+            lessons_str = json.dumps(lessons, indent=2)
+        else:
+            with span("lessons", lesson_count=len(outlines)):
+                lessons = self._create_lessons_concurrently(subject, outlines, tracker, manifest)
+            lessons_str = json.dumps(lessons, indent=2)
+            self._complete_content_stage(lessons_str, tracker, manifest)
+        
+        # The merged lessons are passed in the description, as build_assessment does with courses
+        def review_callback(output):
+            self._complete_review_stage(output.raw, tracker, manifest)
+            return output
+        
+        template = self._get_templates().task('structure_final_course')
+        review_task = Task(
+            description=f"{template.description.text}\n\nLESSON CONTENT TO STRUCTURE:\n{lessons_str}",
+            expected_output=template.expected_output.text,
+            name='structure_final_course',
+            agent=content_reviewer,
+            callback=review_callback
+        )
+        
+        with span("review", prompt_bytes=len(review_task.description.encode())):
+            result = self._kickoff([content_reviewer], [review_task])
+        return result, review_task
+    
+    def create_course(self, subject: str, num_lessons: int, tracker: ProgressTracker = None, use_cache: bool = True):
+        """Main method to create a course
+        
+        Finished courses are cached by subject, lesson count, model and prompt
+        configuration; a cache hit reuses the cached course's file. Identical requests that arrive while one is being
+        generated wait for that run, also when it runs in another process (a
+        crew worker or server process). Pass use_cache=False to always regenerate.
+        
+        A successful result carries the name of its final course file as
+        `course_filename`, so callers can build its assessment.
+        """
+        tracker = tracker or progress_tracker
+        with self.prompt_configs.pinned():
+            return self._create_course(subject, num_lessons, tracker, use_cache)
+    
+    def _create_course(self, subject: str, num_lessons: int, tracker: ProgressTracker, use_cache: bool):
+        if not use_cache:
+            return self._generate_course(subject, num_lessons, tracker)
+        
+        cache = get_course_cache()
+        key = course_cache_key(subject, num_lessons, self.llm.model, self.config_hash)
+        
+        cached = cache.get(key)
+        if cached is not None:
+            print(f"Serving cached course for: {subject} with {num_lessons} lessons")
+            tracker.set_mode("course")
+            tracker.complete_all("Served from the course cache")
+            return self._serve_cached_course(cache, key, cached)
+        
+        def generate():
+            result = self._generate_course(subject, num_lessons, tracker)
+            # Only cache successfully parsed courses
+            if isinstance(result, dict) and 'course' in result and 'error' not in result:
+                cache.set(key, result)
+            return result
+        
+        def on_wait():
+            print(f"Waiting for identical course generation in progress: {subject}")
+            tracker.set_mode("course")
+            tracker.start_stage("curriculum_building", "An identical course is already being generated, waiting for it...")
+        
+        result, shared = coalesce_course(key, generate, on_wait)
+        if shared:
+            tracker.complete_all("Shared with an identical course generation")
+        return result
+    
+    def _serve_cached_course(self, cache, key: str, course: dict):
+        """Return a cached course, saving it as a final course file again if its file is gone
+        
+        A course saved again is announced to course listeners like a newly
+        generated one, and the cache entry is pointed at the new file.
+        """
+        course_filename = course.get('course_filename')
+        if course_filename and self.storage.exists("course", course_filename):
+            return course
+        
+        course = {field: value for field, value in course.items() if field != 'course_filename'}
+        course_filename = f"final_course_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}.json"
+        self.storage.save("course", course_filename, course)
+        course = with_course_filename(course, course_filename)
+        cache.set(key, course)
+        self._notify_course_saved(course_filename)
+        return course
+    
+    def resume_course(self, run_id: str = None, tracker: ProgressTracker = None):
+        """Resume an earlier course run (the most recent one by default) from its first incomplete stage"""
+        tracker = tracker or progress_tracker
+        manifest = RunManifest.load(self.storage, run_id) if run_id else RunManifest.latest(self.storage)
+        if manifest is None:
+            raise ValueError("No course runs found to resume")
+        
+        if manifest.status == "completed":
+            print(f"Run {manifest.run_id} already completed")
+            tracker.set_mode("course")
+            tracker.complete_all("Run already completed")
+            return self._load_checkpoint(manifest, "finalization")
+        
+        print(f"Resuming run {manifest.run_id}: {manifest.subject} with {manifest.num_lessons} lessons")
+        manifest.restart()
+        return self._generate_course(manifest.subject, manifest.num_lessons, tracker, manifest)
+    
+    def _generate_course(self, subject: str, num_lessons: int, tracker: ProgressTracker, manifest: RunManifest = None):
+        """Run the crew to create a course, checkpointing every stage in a run manifest
+        
+        The run is traced to outputs/traces/<run id>.jsonl, and uses the prompt
+        configuration that was current when it started.
+        """
         print(f"Starting course creation for: {subject} with {num_lessons} lessons")
+        manifest = manifest or RunManifest.create(self.storage, subject, num_lessons)
+        print(f"Run id: {manifest.run_id}")
         
+        with self.prompt_configs.pinned() as config, \
+                trace_run(manifest.run_id, "create_course", subject=subject, num_lessons=num_lessons,
+                          config_version=config.version):
+            return self._run_course(subject, num_lessons, tracker, manifest)
+    
+    def _run_course(self, subject: str, num_lessons: int, tracker: ProgressTracker, manifest: RunManifest):
+        """Run the course pipeline and package its result"""
         try:
             # Set progress tracker to course mode and start the overall process
-            progress_tracker.set_mode("course")
-            progress_tracker.start_stage("curriculum_building", f"Creating curriculum for: {subject}")
+            tracker.set_mode("course")
+            tracker.start_stage("curriculum_building", f"Creating curriculum for: {subject}")
             
             # Create agents
             agents = self._create_agents()
             
             # Create tasks with progress tracking
-            tasks = self._create_tasks_with_progress(subject, num_lessons, agents)
-            
-            # Create and run crew
-            crew = Crew(
-                agents=list(agents),
-                tasks=tasks,
-                process=Process.sequential,
-                verbose=True
-            )
+            tasks = self._create_tasks_with_progress(subject, num_lessons, agents, tracker, manifest)
             
-            # Execute the crew
-            result = crew.kickoff()
+            # Execute the crew, writing lessons concurrently
+            result, review_task = self._run_course_pipeline(subject, agents, tasks, tracker, manifest)
             
             # Mark finalization stage
-            progress_tracker.start_stage("finalization", "Packaging your course...")
-            progress_tracker.update_stage_progress("finalization", 50, "Processing results...")
+            tracker.start_stage("finalization", "Packaging your course...")
+            tracker.update_stage_progress("finalization", 50, "Processing results...")
             
         except Exception as e:
-            # Handle errors in progress tracking
-            if progress_tracker.current_stage:
-                progress_tracker.error_stage(progress_tracker.current_stage, str(e))
+            # Handle errors in progress tracking; completed stages stay checkpointed
+            manifest.fail(None, str(e))
+            if tracker.current_stage:
+                tracker.error_stage(tracker.current_stage, str(e))
             raise e
         
-        # Extract the actual result from CrewOutput
-        if hasattr(result, 'raw'):
-            raw_result = result.raw
-        elif hasattr(result, 'result'):
-            raw_result = result.result
-        else:
-            raw_result = str(result)
+        raw_result = result_text(result)
         
         # Save final result
-        output_file = self.outputs_path / f"course_{subject.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        output_name = f"course_{subject.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
-        # Try to parse result as JSON, handling markdown formatting
+        # Parse the result, repairing it or re-running only the review task if needed
         try:
-            if isinstance(raw_result, str):
-                # Strip markdown code blocks if present
-                cleaned_result = raw_result.strip()
-                if cleaned_result.startswith('```json'):
-                    cleaned_result = cleaned_result[7:]  # Remove ```json
-                if cleaned_result.startswith('```'):
-                    cleaned_result = cleaned_result[3:]   # Remove ```
-                if cleaned_result.endswith('```'):
-                    cleaned_result = cleaned_result[:-3]  # Remove ending ```
-                cleaned_result = cleaned_result.strip()
-                
-                json_result = json.loads(cleaned_result)
-            elif isinstance(raw_result, dict):
-                json_result = raw_result
-            else:
-                # If it's not a string or dict, convert to string and try parsing
-                cleaned_result = str(raw_result).strip()
-                if cleaned_result.startswith('```json'):
-                    cleaned_result = cleaned_result[7:]
-                if cleaned_result.startswith('```'):
-                    cleaned_result = cleaned_result[3:]
-                if cleaned_result.endswith('```'):
-                    cleaned_result = cleaned_result[:-3]
-                cleaned_result = cleaned_result.strip()
-                
-                json_result = json.loads(cleaned_result)
+            with span("finalization"):
+                json_result, raw_result = self._parse_task_output(raw_result, review_task)
             
-            with open(output_file, 'w') as f:
-                json.dump(json_result, f, indent=2)
+            # Keep the parsed course as the review checkpoint so resumes and listings read clean JSON
+            course_filename = f"final_course_{manifest.run_id}.json"
+            self._save_checkpoint(manifest, "review", course_filename, json_result)
+            self._save_checkpoint(manifest, "finalization", output_name, json_result)
+            manifest.finish()
+            self._notify_course_saved(course_filename)
             
             # Complete the finalization stage
-            progress_tracker.update_stage_progress("finalization", 100, "Course successfully created!")
-            progress_tracker.complete_stage("finalization", f"Course saved to: {output_file}")
+            tracker.update_stage_progress("finalization", 100, "Course successfully created!")
+            tracker.complete_stage("finalization", f"Course saved to: {output_name}")
                 
-            print(f"Course creation completed! Result saved to: {output_file}")
-            return json_result
+            print(f"Course creation completed! Result saved to: {output_name}")
+            return with_course_filename(json_result, course_filename)
             
-        except json.JSONDecodeError as e:
+        except OutputParseError as e:
             # If result is still not valid JSON, save as text and provide more info
-            with open(output_file.with_suffix('.txt'), 'w') as f:
-                f.write(str(raw_result))
+            self.storage.save("raw", output_name.replace('.json', '.txt'), str(raw_result))
+            
+            # The review output is unusable, so a resumed run writes it again
+            manifest.fail("review", f"Could not parse result as JSON: {e}")
             
             # Complete finalization with error
-            progress_tracker.update_stage_progress("finalization", 100, f"Course saved as text due to JSON error")
-            progress_tracker.complete_stage("finalization", f"Course saved to: {output_file} (as text)")
+            tracker.update_stage_progress("finalization", 100, f"Course saved as text due to JSON error")
+            tracker.complete_stage("finalization", f"Course saved to: {output_name} (as text)")
             
-            print(f"Course creation completed! Result saved to: {output_file} (as text)")
+            print(f"Course creation completed! Result saved to: {output_name} (as text)")
             print(f"JSON parsing error: {e}")
             
             # Return a structured error for the frontend
@@ -250,125 +614,185 @@ class LearningAppCrew:
                 "raw_result": str(raw_result)[:1000] + "..." if len(str(raw_result)) > 1000 else str(raw_result)
             }
     
-    def build_assessment(self, course_file_path: str):
-        """Build an assessment based on a completed course"""
-        print(f"Starting assessment creation for course: {course_file_path}")
+    def _course_lessons(self, course_content: dict):
+        """Get the lessons of a structured course, in lesson order"""
+        course = course_content.get('course', {}) if isinstance(course_content, dict) else {}
+        if not isinstance(course, dict):
+            return []
         
-        # Create assessments subdirectory
-        assessments_path = self.outputs_path / "assessments"
-        assessments_path.mkdir(exist_ok=True)
+        def lesson_number(key):
+            match = re.search(r'\d+', key)
+            return int(match.group()) if match else 0
         
+        return [course[key] for key in sorted(course, key=lesson_number) if isinstance(course[key], dict)]
+    
+    def _use_chunked_assessment(self, lessons) -> bool:
+        """Decide whether to generate the assessment per lesson"""
+        if self.assessment_mode == "single" or not lessons:
+            return False
+        return self.assessment_mode == "chunked" or len(lessons) > 1
+    
+    def _create_lesson_questions(self, subject: str, lesson_number: int, lesson: dict, question_count: int):
+        """Generate candidate assessment questions for a single lesson"""
+        assessment_agent = self._create_assessment_agent()
+        template = self._get_templates().task('build_lesson_questions')
+        questions_task = Task(
+            description=template.description.render(
+                subject=subject,
+                lesson_number=lesson_number,
+                question_count=question_count,
+                lesson_digest=lesson_digest(lesson)
+            ),
+            expected_output=template.expected_output.render(
+                question_count=question_count
+            ),
+            name='build_lesson_questions',
+            agent=assessment_agent
+        )
+        
+        result = self._kickoff([assessment_agent], [questions_task])
+        
+        try:
+            questions, _ = self._parse_task_output(result_text(result), questions_task)
+        except OutputParseError as e:
+            print(f"Skipping questions for lesson {lesson_number}: {e}")
+            return []
+        if isinstance(questions, dict):
+            questions = questions.get('questions', [])
+        return questions if isinstance(questions, list) else []
+    
+    def _build_assessment_chunked(self, subject: str, lessons, tracker: ProgressTracker):
+        """Generate questions per lesson concurrently, then merge them into one assessment
+        
+        Each lesson gets a few more candidates than its share so the merge can
+        drop duplicates and still balance question types and difficulty.
+        """
+        total = assessment_size(len(lessons))
+        per_lesson = math.ceil(total / len(lessons)) + 2
+        candidates = {}
+        workers = max(1, min(self.lesson_parallelism, len(lessons)))
+        
+        def lesson_questions(number, lesson):
+            with span(f"lesson_{number}_questions", question_count=per_lesson):
+                return self._create_lesson_questions(subject, number, lesson, per_lesson)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="questions") as executor:
+            futures = {
+                executor.submit(in_current_context(lesson_questions), number, lesson): number
+                for number, lesson in enumerate(lessons, start=1)
+            }
+            for future in as_completed(futures):
+                number = futures[future]
+                candidates[number] = future.result()
+                tracker.update_stage_progress(
+                    "question_generation",
+                    int(len(candidates) / len(lessons) * 100),
+                    f"Questions written for lesson {number} ({len(candidates)}/{len(lessons)})"
+                )
+        
+        with span("merge_questions", candidates=sum(len(questions) for questions in candidates.values())):
+            questions = merge_questions(candidates, total)
+        if not questions:
+            raise ValueError("No valid assessment questions were generated")
+        
+        assessment = {
+            "assessment": {
+                "title": f"Assessment: {subject}",
+                "description": "Test your understanding of the key concepts from this course",
+                "questions": questions
+            }
+        }
+        return SimpleNamespace(raw=json.dumps(assessment))
+    
+    def build_assessment(self, course_file_path: str, tracker: ProgressTracker = None, output_name: str = None):
+        """Build an assessment based on a completed course
+        
+        The assessment is saved as `output_name` when given, otherwise under a
+        name made from the subject and the current time. The run is traced to
+        outputs/traces/assessment_<course>_<time>.jsonl.
+        """
+        print(f"Starting assessment creation for course: {course_file_path}")
+        tracker = tracker or progress_tracker
+        
+        course_name = Path(course_file_path).name
+        trace_id = f"assessment_{Path(course_file_path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        with self.prompt_configs.pinned() as config, \
+                trace_run(trace_id, "build_assessment", course=course_name, config_version=config.version):
+            return self._run_assessment(course_file_path, tracker, output_name)
+    
+    def _run_assessment(self, course_file_path: str, tracker: ProgressTracker, output_name: str = None):
+        """Generate, parse and save the assessment for a course"""
         try:
             # Set progress tracker to assessment mode and start
-            progress_tracker.set_mode("assessment")
-            progress_tracker.start_stage("assessment_building", "Loading and analyzing course content...")
+            tracker.set_mode("assessment")
+            tracker.start_stage("assessment_building", "Loading and analyzing course content...")
             
-            # Load the course content with markdown handling
-            with open(course_file_path, 'r') as f:
-                content = f.read().strip()
-                
-            # Handle files that have markdown code block wrappers
-            if content.startswith('```json'):
-                lines = content.split('\n')
-                if lines[-1].strip() == '```':
-                    content = '\n'.join(lines[1:-1])
-                else:
-                    content = '\n'.join(lines[1:])
+            # Load the course content from storage (handles markdown wrappers)
+            course_content = self.storage.load("course", Path(course_file_path).name)
             
-            if not content:
+            if not course_content:
                 raise ValueError("Course file is empty or corrupted")
-                
-            course_content = json.loads(content)
             
-            # Extract subject from filename for assessment title
-            filename = Path(course_file_path).stem
-            subject = filename.replace('course_', '').replace('_', ' ').title()
+            # Subject for the assessment title, from the course itself when it names one
+            subject = course_subject(course_content)
+            if subject is None:
+                filename = Path(course_file_path).stem
+                subject = filename.replace('course_', '').replace('_', ' ').title()
             
             # Complete first stage and move to question generation
-            progress_tracker.complete_stage("assessment_building", "Course content analyzed successfully")
-            progress_tracker.start_stage("question_generation", "Creating assessment questions based on lesson content...")
-            
-            # Create assessment agent
-            assessment_agent = self._create_assessment_agent()
+            tracker.complete_stage("assessment_building", "Course content analyzed successfully")
+            tracker.start_stage("question_generation", "Creating assessment questions based on lesson content...")
             
-            # Create assessment task with course content included in description
-            course_content_str = json.dumps(course_content, indent=2)
-            assessment_description = f"{self.tasks_config['build_assessment']['description']}\n\nCOURSE CONTENT TO ANALYZE:\n{course_content_str}"
-            
-            assessment_task = Task(
-                description=assessment_description,
-                expected_output=self.tasks_config['build_assessment']['expected_output'],
-                agent=assessment_agent
-            )
-            
-            # Create and run crew for assessment
-            assessment_crew = Crew(
-                agents=[assessment_agent],
-                tasks=[assessment_task],
-                process=Process.sequential,
-                verbose=True
-            )
-            
-            # Execute assessment creation
-            result = assessment_crew.kickoff()
+            lessons = self._course_lessons(course_content)
+            if self._use_chunked_assessment(lessons):
+                # Generate questions per lesson concurrently and merge them
+                result = self._build_assessment_chunked(subject, lessons, tracker)
+                assessment_task = None
+            else:
+                # Create assessment agent
+                assessment_agent = self._create_assessment_agent()
+                
+                # Create assessment task with compact course content included in description
+                course_content_str = json.dumps(course_content, separators=(',', ':'))
+                template = self._get_templates().task('build_assessment')
+                assessment_description = f"{template.description.text}\n\nCOURSE CONTENT TO ANALYZE:\n{course_content_str}"
+                
+                assessment_task = Task(
+                    description=assessment_description,
+                    expected_output=template.expected_output.text,
+                    name='build_assessment',
+                    agent=assessment_agent
+                )
+                
+                # Create and run crew for assessment
+                result = self._kickoff([assessment_agent], [assessment_task])
             
             # Complete question generation and start finalization
-            progress_tracker.complete_stage("question_generation", "Assessment questions generated")
-            progress_tracker.start_stage("assessment_finalization", "Finalizing and structuring assessment...")
+            tracker.complete_stage("question_generation", "Assessment questions generated")
+            tracker.start_stage("assessment_finalization", "Finalizing and structuring assessment...")
             
             # Extract result
-            if hasattr(result, 'raw'):
-                raw_result = result.raw
-            elif hasattr(result, 'result'):
-                raw_result = result.result
-            else:
-                raw_result = str(result)
+            raw_result = result_text(result)
             
             # Save assessment result
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            assessment_file = assessments_path / f"assessment_{subject.replace(' ', '_')}_{timestamp}.json"
+            assessment_name = output_name or f"assessment_{subject.replace(' ', '_')}_{timestamp}.json"
             
-            # Parse and save JSON
+            # Parse and save JSON, re-running only the assessment task if it can't be repaired
             try:
-                if isinstance(raw_result, str):
-                    # Strip markdown code blocks if present
-                    cleaned_result = raw_result.strip()
-                    if cleaned_result.startswith('```json'):
-                        cleaned_result = cleaned_result[7:]
-                    if cleaned_result.startswith('```'):
-                        cleaned_result = cleaned_result[3:]
-                    if cleaned_result.endswith('```'):
-                        cleaned_result = cleaned_result[:-3]
-                    cleaned_result = cleaned_result.strip()
-                    
-                    json_result = json.loads(cleaned_result)
-                elif isinstance(raw_result, dict):
-                    json_result = raw_result
-                else:
-                    cleaned_result = str(raw_result).strip()
-                    if cleaned_result.startswith('```json'):
-                        cleaned_result = cleaned_result[7:]
-                    if cleaned_result.startswith('```'):
-                        cleaned_result = cleaned_result[3:]
-                    if cleaned_result.endswith('```'):
-                        cleaned_result = cleaned_result[:-3]
-                    cleaned_result = cleaned_result.strip()
-                    
-                    json_result = json.loads(cleaned_result)
+                json_result, raw_result = self._parse_task_output(raw_result, assessment_task)
                 
-                with open(assessment_file, 'w') as f:
-                    json.dump(json_result, f, indent=2)
+                self.storage.save("assessment", assessment_name, json_result)
                 
-                progress_tracker.complete_stage("assessment_finalization", f"Assessment saved to: {assessment_file}")
-                print(f"Assessment creation completed! Result saved to: {assessment_file}")
+                tracker.complete_stage("assessment_finalization", f"Assessment saved to: {assessment_name}")
+                print(f"Assessment creation completed! Result saved to: {assessment_name}")
                 return json_result
                 
-            except json.JSONDecodeError as e:
+            except OutputParseError as e:
                 # Save as text if JSON parsing fails
-                with open(assessment_file.with_suffix('.txt'), 'w') as f:
-                    f.write(str(raw_result))
+                self.storage.save("assessment_raw", assessment_name.replace('.json', '.txt'), str(raw_result))
                 
-                progress_tracker.error_stage("assessment_building", f"JSON parsing error: {str(e)}")
+                tracker.error_stage("assessment_building", f"JSON parsing error: {str(e)}")
                 print(f"Assessment saved as text due to JSON error: {e}")
                 
                 return {
@@ -377,7 +801,7 @@ class LearningAppCrew:
                 }
                 
         except Exception as e:
-            progress_tracker.error_stage("assessment_building", str(e))
+            tracker.error_stage("assessment_building", str(e))
             print(f"Error creating assessment: {e}")
             raise e
 
@@ -26,12 +26,26 @@ function CourseCarousel({ onCourseSelect }) {
     }
   };
 
-  const handleCourseClick = (course) => {
-    onCourseSelect({
-      courseData: course.course_data,
-      subject: course.subject,
-      numLessons: course.lesson_count,
-    });
+  const handleCourseClick = async (course) => {
+    try {
+      // The listing only carries summary metadata; fetch the full course on demand
+      const response = await fetch(`/api/outputs/${course.filename}`);
+      const courseData = await response.json();
+
+      if (!response.ok) {
+        throw new Error(courseData.error || "Failed to load course");
+      }
+
+      onCourseSelect({
+        courseData: courseData,
+        subject: course.subject,
+        numLessons: course.lesson_count,
+        courseFileName: course.filename,
+      });
+    } catch (err) {
+      setError(`Failed to load course: ${err.message}`);
+      console.error("Course loading error:", err);
+    }
   };
 
   if (loading) {
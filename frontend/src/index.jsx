@@ -17,9 +17,34 @@ function MaterialIcon({ icon, className = "", style = {} }) {
   );
 }
 
+// Poll a background job until it completes or fails
+async function waitForJob(jobId, intervalMs = 2000) {
+  while (true) {
+    const response = await fetch(`/api/jobs/${jobId}`);
+    const job = await response.json();
+
+    if (!response.ok) {
+      throw new Error(job.error || "Failed to get job status");
+    }
+
+    if (job.status === "completed") {
+      return job.result;
+    }
+    if (job.status === "error") {
+      throw new Error(job.error || "Job failed");
+    }
+    if (job.status === "cancelled") {
+      throw new Error("Job was cancelled");
+    }
+
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+  }
+}
+
 // ProgressTracker Component
 function ProgressTracker({
   isVisible,
+  jobId,
   onComplete,
   title = "AI Agents Creating Your Course",
 }) {
@@ -71,6 +96,24 @@ function ProgressTracker({
     };
   }, [isVisible, socket, onComplete]);
 
+  // Only receive updates for our own job once the server has assigned it
+  useEffect(() => {
+    if (!socket || !jobId) {
+      return;
+    }
+
+    const subscribe = () => socket.emit("subscribe", { job_id: jobId });
+    if (socket.connected) {
+      subscribe();
+    }
+    socket.on("connect", subscribe);
+
+    return () => {
+      socket.off("connect", subscribe);
+      socket.emit("unsubscribe", { job_id: jobId });
+    };
+  }, [socket, jobId]);
+
   if (!isVisible) {
     return null;
   }
@@ -178,6 +221,7 @@ function Home({ onCourseCreate }) {
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState("");
   const [showProgress, setShowProgress] = useState(false);
+  const [jobId, setJobId] = useState(null);
 
   const handleSubmit = async (e) => {
     e.preventDefault();
@@ -190,6 +234,7 @@ function Home({ onCourseCreate }) {
     setError("");
     setIsLoading(true);
     setShowProgress(true);
+    setJobId(null);
 
     try {
       // Call the actual backend API
@@ -210,17 +255,23 @@ function Home({ onCourseCreate }) {
         throw new Error(data.error || "Failed to create course");
       }
 
-      if (data.success && data.course_data) {
-        // Don't immediately navigate, let progress tracker handle completion
-        // Store the course data for when progress completes
-        window.courseCreationResult = {
-          courseData: data.course_data,
-          subject: subject,
-          numLessons: numLessons,
-        };
-      } else {
+      if (!data.success || !data.job_id) {
         throw new Error("Invalid response from server");
       }
+
+      // The course is generated in the background; wait for the job result
+      setJobId(data.job_id);
+      const courseData = await waitForJob(data.job_id);
+
+      // Store the course data; the progress tracker completion (or the
+      // fallback timeout below) navigates to the course
+      window.courseCreationResult = {
+        courseData: courseData,
+        subject: subject,
+        numLessons: numLessons,
+        courseFileName: courseData.course_filename,
+      };
+      setTimeout(handleProgressComplete, 1000);
     } catch (err) {
       setError(`Failed to create course: ${err.message}`);
       console.error("Course creation error:", err);
@@ -308,6 +359,7 @@ function Home({ onCourseCreate }) {
 
       <ProgressTracker
         isVisible={showProgress}
+        jobId={jobId}
         onComplete={handleProgressComplete}
       />
     </div>
@@ -520,13 +572,15 @@ function App() {
   const [currentLessonIndex, setCurrentLessonIndex] = useState(0);
   const [assessmentData, setAssessmentData] = useState(null);
   const [showAssessmentProgress, setShowAssessmentProgress] = useState(false);
+  const [assessmentJobId, setAssessmentJobId] = useState(null);
   const [courseFileName, setCourseFileName] = useState(null);
 
   // Navigation functions
-  const handleCourseCreate = ({ courseData, subject, numLessons }) => {
+  const handleCourseCreate = ({ courseData, subject, numLessons, courseFileName }) => {
     setCourseData(courseData);
     setSubject(subject);
     setNumLessons(numLessons);
+    setCourseFileName(courseFileName || null);
     setCurrentScreen(SCREENS.COURSE_OVERVIEW);
   };
 
@@ -565,23 +619,14 @@ function App() {
   // Assessment building functionality
   const handleBuildAssessment = async () => {
     setShowAssessmentProgress(true);
+    setAssessmentJobId(null);
 
     try {
-      // If we don't have a specific course filename, get the most recent course
-      let filename = courseFileName;
-      if (!filename) {
-        // Fetch the list of courses to get the most recent one
-        const coursesResponse = await fetch("/api/courses");
-        const coursesData = await coursesResponse.json();
-
-        if (coursesData.courses && coursesData.courses.length > 0) {
-          // Use the most recent course (first in the sorted list)
-          filename = coursesData.courses[0].filename;
-        } else {
-          throw new Error(
-            "No course files found. Please create a course first."
-          );
-        }
+      // Always the course on screen, never just the newest one on the server
+      if (!courseFileName) {
+        throw new Error(
+          "This course has no saved course file to build an assessment for."
+        );
       }
 
       const response = await fetch("/api/build-assessment", {
@@ -590,7 +635,7 @@ function App() {
           "Content-Type": "application/json",
         },
         body: JSON.stringify({
-          courseFilename: filename,
+          courseFilename: courseFileName,
         }),
       });
 
@@ -600,8 +645,16 @@ function App() {
         throw new Error(data.error || "Failed to build assessment");
       }
 
-      if (data.success && data.assessment_data) {
-        setAssessmentData(data.assessment_data);
+      if (data.success && data.assessment) {
+        // A pre-generated assessment is served straight away
+        setAssessmentData(data.assessment);
+        setShowAssessmentProgress(false);
+        setCurrentScreen(SCREENS.ASSESSMENT);
+      } else if (data.success && data.job_id) {
+        // The assessment is built in the background; wait for the job result
+        setAssessmentJobId(data.job_id);
+        const assessmentResult = await waitForJob(data.job_id);
+        setAssessmentData(assessmentResult);
         // Navigate to assessment screen after building
         setTimeout(() => {
           setShowAssessmentProgress(false);
@@ -691,6 +744,7 @@ function App() {
       {showAssessmentProgress && (
         <ProgressTracker
           isVisible={showAssessmentProgress}
+          jobId={assessmentJobId}
           onComplete={handleAssessmentProgress}
           title="AI Agent Building Your Assessment"
         />
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Load test for the web server's read path on large output archives
+
+Usage:
+  python load_test.py generate DIR --files N [--fenced F] [--seed N]
+  python load_test.py run [--sizes 1000,10000,100000] [--backend files|sqlite]
+                          [--requests N] [--concurrency N] [--max-seconds S]
+                          [--endpoint PATH ...]
+
+`generate` fills DIR with N synthetic final course and assessment files (a
+share of them wrapped in markdown fences, like raw agent output). `run`
+generates an archive per size in a temporary directory, starts the web server
+on it in a separate process, and hits the listing endpoints concurrently,
+reporting requests/sec, latency percentiles and the server's RSS.
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.fakes import fake_assessment, fake_course
+
+DEFAULT_ENDPOINTS = [
+    '/api/courses',
+    '/api/courses?limit=500',
+    '/api/courses?fields=id,subject,course_data&limit=20',
+    '/api/assessments',
+    '/api/outputs'
+]
+
+SUBJECTS = [
+    "Art History", "Quantum Physics", "Roman Empire", "Machine Learning", "Photosynthesis",
+    "Jazz Music", "Plate Tectonics", "Game Theory", "Ancient Egypt", "Cell Biology",
+    "Renaissance Painting", "Climate Science", "World War I", "Linear Algebra", "Greek Mythology"
+]
+
+# Seconds to wait for a single request; cold listings of large archives are slow
+REQUEST_TIMEOUT = 300
+
+def generate(directory: Path, files: int, fenced: float = 0.2, seed: int = 0):
+    """Write `files` final courses and assessments (half each) in the FileStorage layout"""
+    rng = random.Random(seed)
+    directory = Path(directory)
+    (directory / 'assessments').mkdir(parents=True, exist_ok=True)
+
+    start = datetime(2025, 1, 1)
+    for index in range(files):
+        subject = f"{rng.choice(SUBJECTS)} {index}"
+        created = start + timedelta(minutes=index * 7 + rng.randint(0, 6))
+        run_id = f"{created.strftime('%Y%m%d_%H%M%S')}_{index:06x}"
+
+        if index % 2 == 0:
+            path = directory / f"final_course_{run_id}.json"
+            content = fake_course(subject, rng.randint(1, 3), paragraphs=rng.randint(6, 20))
+        else:
+            path = directory / 'assessments' / f"assessment_{subject.replace(' ', '_')}_{created.strftime('%Y%m%d_%H%M%S')}.json"
+            content = fake_assessment(subject, rng.randint(8, 12))
+
+        text = json.dumps(content, indent=2)
+        if rng.random() < fenced:
+            text = f"```json\n{text}\n```"
+        with open(path, 'w') as f:
+            f.write(text)
+        timestamp = created.timestamp()
+        os.utime(path, (timestamp, timestamp))
+
+        if (index + 1) % 10000 == 0:
+            print(f"  {index + 1}/{files} files written")
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_server(outputs: Path, backend: str, port: int) -> subprocess.Popen:
+    """Start the web server on an archive in its own process"""
+    env = dict(os.environ,
+               OUTPUTS_DIR=str(outputs),
+               STORAGE_BACKEND=backend,
+               STORAGE_DB=str(outputs / 'learning_app.db'),
+               COURSE_CACHE_PATH=str(outputs / 'course_cache.db'),
+               SEARCH_CACHE_PATH=str(outputs / 'search_cache.db'),
+               TRACE_DIR=str(outputs / 'traces'),
+               OPENAI_API_KEY=os.getenv('OPENAI_API_KEY', 'offline'),
+               SERPER_API_KEY=os.getenv('SERPER_API_KEY', 'offline'))
+    code = f"from src.web_server import app; app.run(host='127.0.0.1', port={port}, threaded=True)"
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=Path(__file__).parent, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("Server did not start within 120s")
+
+def rss_mb(pid: int) -> dict:
+    """Current and peak resident memory of a process, in MB"""
+    memory = {}
+    with open(f"/proc/{pid}/status", 'r') as f:
+        for line in f:
+            field, _, value = line.partition(':')
+            if field in ('VmRSS', 'VmHWM'):
+                memory[field] = int(value.split()[0]) / 1024
+    return {'rss_mb': round(memory.get('VmRSS', 0), 1), 'peak_rss_mb': round(memory.get('VmHWM', 0), 1)}
+
+def fetch(url: str):
+    """Request a URL, returning (seconds, bytes) or raising on failure"""
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=REQUEST_TIMEOUT) as response:
+        size = len(response.read())
+    return time.perf_counter() - start, size
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def load(url: str, requests: int, concurrency: int, max_seconds: float) -> dict:
+    """Send up to `requests` requests to a URL, `concurrency` at a time
+
+    No new requests are started after `max_seconds`, so an endpoint that
+    has stopped scaling doesn't hold up the rest of the run.
+    """
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+
+    def request(_):
+        if time.perf_counter() - start > max_seconds:
+            return 'skipped'
+        try:
+            return fetch(url)
+        except (urllib.error.URLError, OSError):
+            return None
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for outcome in executor.map(request, range(requests)):
+            if outcome is None:
+                errors += 1
+            elif outcome != 'skipped':
+                latencies.append(outcome[0])
+    elapsed = time.perf_counter() - start
+
+    if not latencies:
+        return {'requests': 0, 'rps': 0.0, 'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'errors': errors}
+    return {
+        'requests': len(latencies),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'errors': errors
+    }
+
+def run(sizes, backend: str, requests: int, concurrency: int, max_seconds: float, endpoints, seed: int):
+    """Load test each archive size and print one table per size"""
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix='learning_app_load_') as directory:
+            outputs = Path(directory) / 'outputs'
+            print(f"\n📦 Generating {size} files...")
+            generate(outputs, size, seed=seed)
+            if backend == 'sqlite':
+                from migrate_outputs import migrate
+                migrate(outputs, outputs / 'learning_app.db')
+
+            port = free_port()
+            server = start_server(outputs, backend, port)
+            try:
+                base_url = f"http://127.0.0.1:{port}"
+                print(f"Server RSS at start: {rss_mb(server.pid)['rss_mb']} MB")
+                print(f"{'endpoint':<54} {'cold ms':>9} {'requests':>8} {'req/s':>8} {'p50 ms':>9} "
+                      f"{'p95 ms':>9} {'p99 ms':>9} {'errors':>6} {'KB':>8} {'RSS MB':>8}")
+                for endpoint in endpoints:
+                    # The first request pays for building the catalog
+                    try:
+                        cold, size_bytes = fetch(base_url + endpoint)
+                        cold_ms, kilobytes = f"{cold * 1000:.1f}", f"{size_bytes / 1024:.1f}"
+                    except (urllib.error.URLError, OSError) as e:
+                        print(f"{endpoint:<54} failed: {e}")
+                        continue
+
+                    result = load(base_url + endpoint, requests, concurrency, max_seconds)
+                    memory = rss_mb(server.pid)
+                    print(f"{endpoint:<54} {cold_ms:>9} {result['requests']:>8} {result['rps']:>8} {str(result['p50_ms']):>9} "
+                          f"{str(result['p95_ms']):>9} {str(result['p99_ms']):>9} {result['errors']:>6} "
+                          f"{kilobytes:>8} {memory['rss_mb']:>8}")
+                print(f"Server peak RSS: {rss_mb(server.pid)['peak_rss_mb']} MB")
+            finally:
+                server.terminate()
+                server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the listing endpoints on large archives")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = commands.add_parser('generate', help="Write a synthetic output archive")
+    generate_parser.add_argument('directory', type=Path)
+    generate_parser.add_argument('--files', type=int, default=1000, help="Number of course and assessment files")
+    generate_parser.add_argument('--fenced', type=float, default=0.2, help="Share of files wrapped in markdown fences")
+    generate_parser.add_argument('--seed', type=int, default=0)
+
+    run_parser = commands.add_parser('run', help="Load test the web server on generated archives")
+    run_parser.add_argument('--sizes', default='1000,10000,100000', help="Comma separated archive sizes")
+    run_parser.add_argument('--backend', choices=['files', 'sqlite'], default='files')
+    run_parser.add_argument('--requests', type=int, default=200, help="Requests per endpoint")
+    run_parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight at once")
+    run_parser.add_argument('--max-seconds', type=float, default=60, help="Time budget per endpoint")
+    run_parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help="Endpoint to test (repeatable); defaults to the listing endpoints")
+    run_parser.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == 'generate':
+        generate(args.directory, args.files, args.fenced, args.seed)
+        print(f"✅ Wrote {args.files} files to {args.directory}")
+    else:
+        sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+        run(sizes, args.backend, args.requests, args.concurrency, args.max_seconds, args.endpoints or DEFAULT_ENDPOINTS, args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -3,7 +3,11 @@
 AI Learning App - CrewAI Project
 """
 import sys
-from crew import LearningAppCrew
+
+def create_crew():
+    """Create the crew; CrewAI is only imported once a command needs it"""
+    from crew import LearningAppCrew
+    return LearningAppCrew()
 
 def run():
     """
@@ -28,7 +32,7 @@ def run():
     print("🤖 Starting CrewAI workflow...")
     
     # Initialize and run the crew
-    crew = LearningAppCrew()
+    crew = create_crew()
     result = crew.create_course(subject, num_lessons)
     
     print("\n✅ Course creation complete!")
@@ -49,39 +53,52 @@ def train():
         "Ancient Roman History"
     ]
     
-    crew = LearningAppCrew()
+    crew = create_crew()
+    from src.llm_gateway import llm_priority
     
     for subject in sample_subjects:
         print(f"📚 Training with: {subject}")
         try:
-            crew.create_course(subject, 2)
+            # Training is batch work; interactive runs sharing the gateway go first
+            with llm_priority('batch'):
+                crew.create_course(subject, 2)
             print(f"✅ Training completed for: {subject}")
         except Exception as e:
             print(f"❌ Training failed for {subject}: {e}")
     
     print("🎉 Training session complete!")
 
-def replay():
+def replay(run_id=None):
     """
-    Replay the crew execution from the last run
+    Resume a course run from its last completed stage (the most recent run by default)
     """
-    print("🔄 Replay functionality - re-running last course creation")
+    print(f"🔄 Replay - resuming run {run_id or '(most recent)'}")
+    
+    crew = create_crew()
+    try:
+        result = crew.resume_course(run_id)
+    except (ValueError, OSError) as e:
+        print(f"❌ Could not resume run: {e}")
+        return None
     
-    # For now, just run with default parameters
-    crew = LearningAppCrew()
-    result = crew.create_course("Einstein's Theory of Relativity", 2)
+    print("\n✅ Course creation complete!")
+    print("📁 Check the outputs/ directory for your course files")
     
     return result
 
 if __name__ == '__main__':
+    if '--startup-profile' in sys.argv:
+        from src.startup import profile_startup
+        sys.exit(profile_startup('cli'))
+    
     if len(sys.argv) > 1:
         command = sys.argv[1].lower()
         if command == 'train':
             train()
         elif command == 'replay':
-            replay()
+            replay(sys.argv[2] if len(sys.argv) > 2 else None)
         else:
-            print("Available commands: train, replay")
+            print("Available commands: train, replay [run-id], --startup-profile")
             print("Or run without arguments for interactive mode")
     else:
         run()
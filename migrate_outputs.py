@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Import existing JSON output files into the SQLite storage backend
+
+Usage: python migrate_outputs.py [path/to/learning_app.db]
+
+Reads the outputs directory the server uses (OUTPUTS_DIR, default outputs/)
+and writes to the given database, STORAGE_DB, or learning_app.db inside it.
+"""
+import os
+import sys
+from pathlib import Path
+
+from src.storage import SQLiteStorage, default_outputs_path, kind_for_name
+
+def migrate(outputs_path: Path, db_path: Path):
+    """Copy every file under outputs/ and outputs/assessments/ into the database"""
+    storage = SQLiteStorage(db_path)
+    
+    files = [p for p in outputs_path.glob('*') if p.suffix in ('.json', '.txt')]
+    files += [p for p in (outputs_path / 'assessments').glob('*') if p.suffix in ('.json', '.txt')]
+    
+    imported = 0
+    for file_path in sorted(files):
+        kind = kind_for_name(file_path.name)
+        if storage.exists(kind, file_path.name):
+            continue
+        
+        try:
+            with open(file_path, 'r') as f:
+                content = f.read()
+            # Keep the original modification time so listings stay in the same order
+            storage.save(kind, file_path.name, content, created=file_path.stat().st_mtime)
+            imported += 1
+        except Exception as e:
+            print(f"❌ Failed to import {file_path}: {e}")
+    
+    print(f"✅ Imported {imported} of {len(files)} output file(s) into {db_path}")
+
+if __name__ == '__main__':
+    outputs_path = default_outputs_path()
+    db_path = Path(sys.argv[1] if len(sys.argv) > 1 else os.getenv('STORAGE_DB', str(outputs_path / 'learning_app.db')))
+    migrate(outputs_path, db_path)
@@ -0,0 +1,506 @@
+"""
+Shared API for AI Learning App
+The JSON API's routes, request handling and job handlers, independent of the
+web framework. The Flask server (src/web_server.py) and the ASGI server
+(src/asgi_server.py) only adapt requests and responses to it
+"""
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.course_cache import get_course_cache
+from src.crew_executor import create_crew_executor
+from src.job_manager import JobManager
+from src.llm_cache import get_llm_cache, llm_cache_mode
+from src.metrics import registry as metrics_registry
+from src.output_catalog import COURSE_SUMMARY_FIELDS, ASSESSMENT_SUMMARY_FIELDS
+from src.progress_bus import create_progress_bus
+from src.progress_tracker import progress_registry
+from src.prompt_config import get_prompt_configs
+from src.storage import create_storage, default_outputs_path, kind_for_name
+from src.tools.search_cache import get_search_cache
+
+# Listing pagination limits
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+def course_job_params(data) -> dict:
+    """Validate a create-course request body into job parameters; raises ValueError"""
+    data = data or {}
+    subject = data.get('subject', '').strip()
+    num_lessons = data.get('numLessons', 1)
+
+    if not subject:
+        raise ValueError('Subject is required')
+
+    if not isinstance(num_lessons, int) or num_lessons < 1 or num_lessons > 3:
+        raise ValueError('Number of lessons must be between 1 and 3')
+
+    return {
+        'subject': subject,
+        'num_lessons': num_lessons,
+        'bypass_cache': bool(data.get('bypassCache', False))
+    }
+
+def prefetched_assessment_name(course_filename):
+    """Name under which the speculative assessment for a course is stored"""
+    return f"assessment_{Path(course_filename).stem}.json"
+
+def check_course_result(result):
+    """Raise if a course result is an error or is malformed"""
+    # The crew.create_course method returns a properly formatted JSON object
+    # or an error dict if parsing failed
+    if isinstance(result, dict) and 'error' in result:
+        raise ValueError(result['error'])
+
+    # Validate that we have a proper course structure
+    if not isinstance(result, dict) or 'course' not in result:
+        raise ValueError('Invalid course data format - missing course structure')
+
+def check_assessment_result(result):
+    """Raise if an assessment result is an error or is malformed"""
+    # Check if assessment building failed
+    if isinstance(result, dict) and 'error' in result:
+        raise ValueError(result['error'])
+
+    # Validate that we have a proper assessment structure
+    if not isinstance(result, dict) or 'assessment' not in result:
+        raise ValueError('Invalid assessment data format - missing assessment structure')
+
+def listing_params(fields: Optional[str], format: Optional[str], limit: Optional[int], summary_fields):
+    """Resolve a listing's query parameters into (fields, stream, limit)
+
+    fields - comma separated fields to return, e.g. `subject,course_data`;
+             defaults to summary metadata only
+    format - `ndjson` to stream one JSON object per line
+    limit  - page size (default 50, max 500); NDJSON streams everything when omitted
+    """
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else summary_fields
+    stream = format == 'ndjson'
+
+    if limit is None and not stream:
+        limit = DEFAULT_PAGE_SIZE
+    if limit is not None:
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    return fields, stream, limit
+
+def project_entry(storage, kind, entry, fields, body_field):
+    """Pick the requested fields of a listing entry"""
+    item = {field: entry[field] for field in fields if field in entry}
+    # Full bodies are only read from disk when explicitly requested
+    if body_field in fields:
+        item[body_field] = storage.load(kind, entry['filename'])
+    return item
+
+def register_metrics(job_managers: Dict[str, object], crew_executor):
+    """Export job, cache, crew worker and prompt configuration gauges on /metrics"""
+    def jobs_in_flight():
+        """Queued and running jobs per pool, kind and status"""
+        counts = {}
+        for pool, manager in job_managers.items():
+            for (kind, status), count in manager.status_counts().items():
+                if status in ('queued', 'running'):
+                    counts[(pool, kind, status)] = count
+        return counts
+
+    def cache_stat(field):
+        """Read one statistic from each result cache"""
+        def collect():
+            stats = {
+                ('search',): get_search_cache().stats()[field],
+                ('course',): get_course_cache().stats()[field]
+            }
+            if llm_cache_mode() != 'off':
+                stats[('llm',)] = get_llm_cache().stats()[field]
+            return stats
+        return collect
+
+    metrics_registry.gauge('learning_app_jobs_in_flight', 'Queued and running background jobs',
+                           ['pool', 'kind', 'status'], function=jobs_in_flight)
+    metrics_registry.gauge('learning_app_cache_hit_ratio', 'Share of cache lookups served from the cache',
+                           ['cache'], function=cache_stat('hit_ratio'))
+    metrics_registry.counter('learning_app_cache_hits_total', 'Cache lookups served from the cache',
+                             ['cache'], function=cache_stat('hits'))
+    metrics_registry.counter('learning_app_cache_misses_total', 'Cache lookups not found in the cache',
+                             ['cache'], function=cache_stat('misses'))
+    metrics_registry.gauge('learning_app_cache_entries', 'Entries stored in each cache',
+                           ['cache'], function=cache_stat('entries'))
+    metrics_registry.gauge('learning_app_crew_workers', 'Crew worker processes by state (CREW_EXECUTOR=process)',
+                           ['state'], function=lambda: {(state,): count for state, count in crew_executor.stats().items()})
+    metrics_registry.gauge('learning_app_prompt_config_info', 'Prompt configuration version used by new runs',
+                           ['version'], function=lambda: {(get_prompt_configs().current().version,): 1})
+
+def llm_cache_status() -> dict:
+    """LLM response cache hit/miss counters and the cache mode"""
+    mode = llm_cache_mode()
+    return dict(get_llm_cache().stats() if mode != 'off' else {}, mode=mode)
+
+@dataclass
+class ApiResponse:
+    """A response of the shared API, converted to a Flask or ASGI response by each server
+
+    `data` is sent as JSON. Responses without data send `body` as is: text,
+    or an iterator of text chunks that is streamed.
+    """
+    data: Any = None
+    status: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Any = None
+    content_type: str = 'application/json'
+
+def error_response(message: str, status: int) -> ApiResponse:
+    return ApiResponse({'error': message}, status)
+
+# URL rules of the API (Flask syntax) and the LearningAppApi method serving each
+API_ROUTES = [
+    ('/api/create-course', ('POST',), 'create_course'),
+    ('/api/build-assessment', ('POST',), 'build_assessment'),
+    ('/api/jobs/<job_id>', ('GET',), 'get_job'),
+    ('/api/jobs/<job_id>/progress', ('GET',), 'get_progress'),
+    ('/api/courses', ('GET',), 'get_courses'),
+    ('/api/courses/<filename>', ('DELETE',), 'delete_course'),
+    ('/api/assessments', ('GET',), 'get_assessments'),
+    ('/api/outputs', ('GET',), 'list_outputs'),
+    ('/api/outputs/<filename>', ('GET',), 'get_output'),
+    ('/api/search-cache', ('GET',), 'get_search_cache_stats'),
+    ('/api/llm-cache', ('GET',), 'get_llm_cache_stats'),
+    ('/api/config', ('GET',), 'get_config_status'),
+    ('/metrics', ('GET',), 'metrics'),
+]
+
+def _int_arg(args: dict, name: str) -> Optional[int]:
+    try:
+        return int(args[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class LearningAppApi:
+    """Storage, job pools, crew executor and progress bus of a server, and the handlers using them
+
+    Route handlers are synchronous and take the request's query arguments
+    and parsed JSON body (None when there is none), plus the route's URL
+    parameters; they return an ApiResponse. Both servers register
+    `crew_call` and `job_result` around their crew executor as job handlers.
+    """
+
+    def __init__(self, storage, progress_bus, job_manager: JobManager, prefetch_manager: Optional[JobManager],
+                 crew_executor):
+        self.storage = storage
+        self.progress_bus = progress_bus
+        self.job_manager = job_manager
+        self.prefetch_manager = prefetch_manager
+        self.crew_executor = crew_executor
+
+        job_pools = {'jobs': job_manager}
+        if prefetch_manager is not None:
+            job_pools['prefetch'] = prefetch_manager
+            crew_executor.add_course_listener(self.prefetch_assessment)
+        register_metrics(job_pools, crew_executor)
+
+    def register_job_handler(self, handler: Callable):
+        """Run every job kind through `handler(job, prefetch=False)`"""
+        self.job_manager.register('course', handler)
+        self.job_manager.register('assessment', handler)
+        if self.prefetch_manager is not None:
+            self.prefetch_manager.register('assessment', lambda job: handler(job, prefetch=True))
+
+    def resume_jobs(self):
+        """Re-queue the jobs left waiting when the server last stopped"""
+        self.job_manager.resume_pending()
+        if self.prefetch_manager is not None:
+            self.prefetch_manager.resume_pending()
+
+    def shutdown(self):
+        self.job_manager.shutdown()
+        if self.prefetch_manager is not None:
+            self.prefetch_manager.shutdown()
+        self.crew_executor.shutdown()
+
+    # Jobs
+
+    def crew_call(self, job, prefetch: bool = False) -> Tuple[str, tuple, dict]:
+        """Get the crew method, arguments and keyword arguments that run a job
+
+        Each job gets its own progress tracker, passed as `tracker`.
+        """
+        if job.kind == 'course':
+            subject = job.params['subject']
+            num_lessons = job.params['num_lessons']
+            print(f"Creating course for subject: {subject}, lessons: {num_lessons}")
+            return 'create_course', (subject, num_lessons), {
+                'tracker': progress_registry.create(job.id),
+                'use_cache': not job.params.get('bypass_cache', False)
+            }
+
+        course_filename = job.params['course_filename']
+        if not prefetch:
+            print(f"Building assessment for course: {course_filename}")
+            return 'build_assessment', (course_filename,), {'tracker': progress_registry.create(job.id)}
+
+        if not self.storage.exists('course', course_filename):
+            raise ValueError('Course was deleted before its assessment was built')
+        print(f"Pre-generating assessment for course: {course_filename}")
+        # Speculative work; LLM calls for requested jobs are served first
+        return 'build_assessment', (course_filename,), {
+            'tracker': progress_registry.create(job.id),
+            'output_name': prefetched_assessment_name(course_filename),
+            'priority': 'batch'
+        }
+
+    def job_result(self, job, result, prefetch: bool = False):
+        """Check a job's crew result, raising if it failed, and return it"""
+        if job.kind == 'course':
+            check_course_result(result)
+            return result
+
+        check_assessment_result(result)
+        # The course may have been deleted while its assessment was being built
+        course_filename = job.params['course_filename']
+        if prefetch and not self.storage.exists('course', course_filename):
+            self.storage.delete('assessment', prefetched_assessment_name(course_filename))
+            raise ValueError('Course was deleted before its assessment was built')
+        return result
+
+    def prefetch_assessment(self, course_filename: str):
+        """Queue a speculative assessment build for a newly written course"""
+        self.prefetch_manager.submit('assessment', {'course_filename': course_filename})
+
+    def find_prefetch(self, course_filename: str):
+        """The latest pre-generation job for a course, if pre-generation is on"""
+        if self.prefetch_manager is None:
+            return None
+        return self.prefetch_manager.find('assessment', course_filename=course_filename)
+
+    def current_progress(self, job_id: str) -> Optional[dict]:
+        """Progress of a job run by this process, or the latest recorded by another one"""
+        tracker = progress_registry.get(job_id)
+        return tracker.get_current_progress() if tracker else self.progress_bus.latest(job_id)
+
+    # Routes
+
+    def create_course(self, args: dict, data) -> ApiResponse:
+        """Queue a course creation job"""
+        try:
+            try:
+                params = course_job_params(data)
+            except ValueError as e:
+                return error_response(str(e), 400)
+
+            job = self.job_manager.submit('course', params)
+
+            return ApiResponse({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status
+            }, 202)
+
+        except Exception as e:
+            print(f"Error creating course: {str(e)}")
+            return error_response(f'Failed to create course: {str(e)}', 500)
+
+    def build_assessment(self, args: dict, data) -> ApiResponse:
+        """Queue an assessment job for a completed course, or serve its pre-generated assessment"""
+        try:
+            course_filename = (data or {}).get('courseFilename', '').strip()
+
+            if not course_filename:
+                return error_response('Course filename is required', 400)
+
+            if not self.storage.exists('course', course_filename):
+                return error_response('Course file not found', 404)
+
+            # Serve a pre-generated assessment instantly when there is one
+            assessment_name = prefetched_assessment_name(course_filename)
+            if self.storage.exists('assessment', assessment_name):
+                return ApiResponse({
+                    'success': True,
+                    'status': 'completed',
+                    'assessment_filename': assessment_name,
+                    'assessment': self.storage.load('assessment', assessment_name)
+                })
+
+            # Wait for a pre-generation that is already running; one still queued
+            # behind other courses is replaced by a regular job
+            job = self.find_prefetch(course_filename)
+            if job is not None and job.status == 'queued':
+                self.prefetch_manager.cancel(job.id)
+            if job is None or job.status != 'running':
+                job = self.job_manager.submit('assessment', {'course_filename': course_filename})
+
+            return ApiResponse({
+                'success': True,
+                'job_id': job.id,
+                'status': job.status
+            }, 202)
+
+        except Exception as e:
+            print(f"Error building assessment: {str(e)}")
+            return error_response(f'Failed to build assessment: {str(e)}', 500)
+
+    def get_job(self, args: dict, data, job_id: str) -> ApiResponse:
+        """Get the status of a job, including its result once completed"""
+        job = self.job_manager.get(job_id) or (self.prefetch_manager and self.prefetch_manager.get(job_id))
+        if job is None:
+            return error_response('Job not found', 404)
+
+        return ApiResponse(asdict(job))
+
+    def get_progress(self, args: dict, data, job_id: str) -> ApiResponse:
+        """Get current progress state for a job"""
+        progress = self.current_progress(job_id)
+        if progress is None:
+            return error_response('No progress found for job', 404)
+
+        return ApiResponse(progress)
+
+    def catalog_listing(self, args: dict, kind: str, collection: str, summary_fields, body_field: str) -> ApiResponse:
+        """Build a paginated, projected listing response for an output kind
+
+        Query parameters:
+          cursor - opaque cursor from a previous page's `next_cursor`
+          limit  - page size (default 50, max 500); NDJSON streams everything when omitted
+          fields - comma separated fields to return, e.g. `subject,course_data`;
+                   defaults to summary metadata only
+          format - `ndjson` to stream one JSON object per line
+        """
+        fields, stream, limit = listing_params(args.get('fields'), args.get('format'), _int_arg(args, 'limit'),
+                                               summary_fields)
+
+        entries, next_cursor = self.storage.page(kind, args.get('cursor'), limit)
+
+        def project(entry):
+            return project_entry(self.storage, kind, entry, fields, body_field)
+
+        if stream:
+            def generate():
+                for entry in entries:
+                    try:
+                        yield json.dumps(project(entry)) + '\n'
+                    except Exception as e:
+                        print(f"Error streaming output file {entry['filename']}: {e}")
+
+            headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+            return ApiResponse(body=generate(), headers=headers, content_type='application/x-ndjson')
+
+        items = []
+        for entry in entries:
+            try:
+                items.append(project(entry))
+            except Exception as e:
+                print(f"Error loading output file {entry['filename']}: {e}")
+
+        return ApiResponse({collection: items, 'next_cursor': next_cursor})
+
+    def get_courses(self, args: dict, data) -> ApiResponse:
+        """Get final courses, newest first"""
+        try:
+            return self.catalog_listing(args, 'course', 'courses', COURSE_SUMMARY_FIELDS, 'course_data')
+
+        except ValueError as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            return error_response(f'Failed to get courses: {str(e)}', 500)
+
+    def delete_course(self, args: dict, data, filename: str) -> ApiResponse:
+        """Delete a course, cancelling and discarding its pre-generated assessment"""
+        try:
+            if not self.storage.exists('course', filename):
+                return error_response('Course file not found', 404)
+
+            self.storage.delete('course', filename)
+
+            job = self.find_prefetch(filename)
+            if job is not None:
+                self.prefetch_manager.cancel(job.id)
+            self.storage.delete('assessment', prefetched_assessment_name(filename))
+
+            return ApiResponse({'success': True})
+
+        except Exception as e:
+            return error_response(f'Failed to delete course: {str(e)}', 500)
+
+    def get_assessments(self, args: dict, data) -> ApiResponse:
+        """Get assessments, newest first"""
+        try:
+            return self.catalog_listing(args, 'assessment', 'assessments', ASSESSMENT_SUMMARY_FIELDS,
+                                        'assessment_data')
+
+        except ValueError as e:
+            return error_response(str(e), 400)
+        except Exception as e:
+            return error_response(f'Failed to get assessments: {str(e)}', 500)
+
+    def list_outputs(self, args: dict, data) -> ApiResponse:
+        """List all generated course outputs"""
+        try:
+            return ApiResponse({'outputs': self.storage.list_outputs()})
+
+        except Exception as e:
+            return error_response(f'Failed to list outputs: {str(e)}', 500)
+
+    def get_output(self, args: dict, data, filename: str) -> ApiResponse:
+        """Get a specific output file"""
+        try:
+            kind = kind_for_name(filename)
+            if not self.storage.exists(kind, filename):
+                return error_response('File not found', 404)
+
+            return ApiResponse(self.storage.load(kind, filename))
+
+        except Exception as e:
+            return error_response(f'Failed to get output: {str(e)}', 500)
+
+    def get_search_cache_stats(self, args: dict, data) -> ApiResponse:
+        """Get search cache hit/miss counters"""
+        return ApiResponse(get_search_cache().stats())
+
+    def get_llm_cache_stats(self, args: dict, data) -> ApiResponse:
+        """Get LLM response cache hit/miss counters and the cache mode"""
+        return ApiResponse(llm_cache_status())
+
+    def get_config_status(self, args: dict, data) -> ApiResponse:
+        """Get the active prompt configuration version and the last reload error, if any"""
+        return ApiResponse(get_prompt_configs().status())
+
+    def metrics(self, args: dict, data) -> ApiResponse:
+        """Export metrics in the Prometheus text format"""
+        return ApiResponse(body=metrics_registry.render(), content_type='text/plain; version=0.0.4')
+
+def create_api(crew_factory: Callable, job_manager_class=JobManager, crew_executor: str = 'thread') -> LearningAppApi:
+    """Create the API of a server process from the environment
+
+    JOB_WORKERS (default 2) jobs run at once. Assessments are built
+    speculatively as soon as a course is written, on a separate pool of
+    ASSESSMENT_PREFETCH_WORKERS (default 1) so they never hold up jobs a
+    learner is waiting for; 0 turns pre-generation off. Finished jobs are kept
+    for JOB_RETENTION seconds (default 7 days), at most JOB_MAX_FINISHED
+    (default 1000) per pool. `crew_executor` is the CREW_EXECUTOR used when
+    the variable is unset.
+    """
+    outputs_path = default_outputs_path()
+
+    job_workers = int(os.getenv('JOB_WORKERS', '2'))
+    prefetch_workers = int(os.getenv('ASSESSMENT_PREFETCH_WORKERS', '1'))
+    retention = {
+        'retention_seconds': float(os.getenv('JOB_RETENTION', str(7 * 24 * 3600))),
+        'max_finished': int(os.getenv('JOB_MAX_FINISHED', '1000'))
+    }
+    job_manager = job_manager_class(outputs_path / 'jobs', max_workers=job_workers, **retention)
+    prefetch_manager = job_manager_class(
+        outputs_path / 'jobs' / 'prefetch', max_workers=prefetch_workers, **retention
+    ) if prefetch_workers > 0 else None
+
+    return LearningAppApi(
+        storage=create_storage(outputs_path),
+        # Progress events reach clients connected to any server process sharing the bus
+        progress_bus=create_progress_bus(outputs_path),
+        job_manager=job_manager,
+        prefetch_manager=prefetch_manager,
+        # One crew thread or worker process per job thread, so prefetches never
+        # wait behind requested jobs
+        crew_executor=create_crew_executor(crew_factory, processes=job_workers + prefetch_workers,
+                                           default=crew_executor)
+    )
@@ -0,0 +1,265 @@
+"""
+ASGI server for AI Learning App
+An asyncio-native alternative to src/web_server.py serving the same API
+(src/api_common.py) and `progress_update` events. Jobs are asyncio tasks that
+await the crew executor and API handlers run off the event loop, so queued
+jobs and idle progress websockets don't hold a thread each
+"""
+import asyncio
+import json
+import mimetypes
+import re
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import socketio
+from dotenv import load_dotenv
+
+sys.path.append(str(Path(__file__).parent.parent))
+from src.api_common import API_ROUTES, ApiResponse, create_api
+from src.job_manager import AsyncJobManager
+from src.progress_bus import socketio_client_manager
+from src.progress_tracker import progress_registry
+
+load_dotenv()
+
+FRONTEND_DIR = Path(__file__).parent.parent / 'frontend'
+
+# The crew (and CrewAI) is only loaded when the first generation job runs
+_crew = None
+_crew_lock = threading.Lock()
+
+def get_crew():
+    """Get the shared crew, creating it on first use"""
+    global _crew
+    with _crew_lock:
+        if _crew is None:
+            from crew import LearningAppCrew
+            _crew = LearningAppCrew(storage=api.storage)
+        return _crew
+
+# Crews run in worker processes by default, so a running generation waits on
+# its worker's pipe from the event loop rather than holding a thread
+api = create_api(get_crew, job_manager_class=AsyncJobManager, crew_executor='process')
+
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*',
+                           client_manager=socketio_client_manager(api.progress_bus, asynchronous=True))
+
+# Event loop the server runs on; progress may be reported from crew threads
+_loop = None
+
+@sio.event
+async def connect(sid, environ):
+    """Handle client connection"""
+    print('Client connected')
+
+@sio.event
+async def disconnect(sid, reason=None):
+    """Handle client disconnection"""
+    print('Client disconnected')
+
+@sio.event
+async def subscribe(sid, data):
+    """Join the room for a job so the client only receives that job's progress"""
+    job_id = (data or {}).get('job_id')
+    if not job_id:
+        return
+
+    await sio.enter_room(sid, job_id)
+
+    # Send the job's current progress state to the new subscriber
+    progress = await asyncio.to_thread(api.current_progress, job_id)
+    if progress:
+        await sio.emit('progress_update', progress, to=sid)
+
+@sio.event
+async def unsubscribe(sid, data):
+    """Leave the room for a job"""
+    job_id = (data or {}).get('job_id')
+    if job_id:
+        await sio.leave_room(sid, job_id)
+
+def broadcast_progress(progress_data):
+    """Send progress updates to the clients subscribed to the job on every server process, from any thread"""
+    # Recorded in the caller's order, so the latest snapshot is never an older update
+    api.progress_bus.record(progress_data)
+    if _loop is not None:
+        asyncio.run_coroutine_threadsafe(
+            sio.emit('progress_update', progress_data, to=progress_data['job_id']), _loop
+        )
+
+# Register progress callback on every per-job tracker
+progress_registry.add_callback(broadcast_progress)
+
+async def run_job(job, prefetch=False):
+    """Job handler that awaits a job's crew method on the crew executor"""
+    method, args, kwargs = await asyncio.to_thread(api.crew_call, job, prefetch)
+    result = await api.crew_executor.run_async(method, *args, **kwargs)
+    return await asyncio.to_thread(api.job_result, job, result, prefetch)
+
+api.register_job_handler(run_job)
+
+class Request:
+    """The parts of an HTTP request the routes use"""
+
+    def __init__(self, scope, body: bytes):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.args = {key: values[0] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+        self.body = body
+
+    def get_json(self):
+        try:
+            return json.loads(self.body) if self.body else None
+        except ValueError:
+            return None
+
+class Response:
+    """An HTTP response whose body is bytes or an async iterator of bytes"""
+
+    def __init__(self, body=b'', status: int = 200, content_type: str = 'application/json', headers: dict = None):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {}, **{'content-type': content_type})
+
+    async def send(self, send):
+        await send({
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': [(key.encode(), str(value).encode()) for key, value in self.headers.items()]
+        })
+        if isinstance(self.body, bytes):
+            await send({'type': 'http.response.body', 'body': self.body})
+            return
+        async for chunk in self.body:
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+
+def jsonify(data, status: int = 200) -> Response:
+    return Response(json.dumps(data).encode(), status)
+
+ROUTES = []
+
+def route(pattern: str, methods=('GET',)):
+    """Register an async handler for a path pattern with `<name>` and `<path:name>` parameters"""
+    regex = re.sub(r'<(path:)?(\w+)>', lambda m: f"(?P<{m.group(2)}>{'.+' if m.group(1) else '[^/]+'})", pattern)
+    regex = re.compile('^' + regex + '$')
+
+    def decorator(handler):
+        ROUTES.append((regex, methods, handler))
+        return handler
+    return decorator
+
+async def send_from_directory(directory: Path, filename: str) -> Response:
+    """Serve a file from a directory, refusing paths that escape it"""
+    directory = directory.resolve()
+    path = (directory / filename).resolve()
+    if directory not in path.parents or not path.is_file():
+        return jsonify({'error': 'Not found'}, 404)
+    body = await asyncio.to_thread(path.read_bytes)
+    return Response(body, content_type=mimetypes.guess_type(path.name)[0] or 'application/octet-stream')
+
+@route('/')
+async def index(request):
+    """Serve the main page"""
+    return await send_from_directory(FRONTEND_DIR / 'public', 'index.html')
+
+@route('/styles.css')
+async def styles(request):
+    """Serve the CSS file"""
+    return await send_from_directory(FRONTEND_DIR / 'public', 'styles.css')
+
+@route('/src/<path:filename>')
+async def src_files(request, filename):
+    """Serve files from the src directory"""
+    return await send_from_directory(FRONTEND_DIR / 'src', filename)
+
+async def _stream(chunks):
+    """Iterate a blocking iterator of text chunks off the event loop"""
+    done = object()
+    while (chunk := await asyncio.to_thread(next, chunks, done)) is not done:
+        yield chunk.encode()
+
+def api_endpoint(handler):
+    """Wrap a shared API handler as an async route, running it off the event loop"""
+    async def endpoint(request, **params):
+        result: ApiResponse = await asyncio.to_thread(handler, request.args, request.get_json(), **params)
+        if result.data is not None:
+            body = json.dumps(result.data).encode()
+        elif isinstance(result.body, str):
+            body = result.body.encode()
+        else:
+            body = _stream(result.body)
+        return Response(body, result.status, content_type=result.content_type, headers=result.headers)
+
+    endpoint.__doc__ = handler.__doc__
+    return endpoint
+
+for rule, methods, name in API_ROUTES:
+    route(rule, methods)(api_endpoint(getattr(api, name)))
+
+def cors_preflight(scope, methods) -> Response:
+    """Answer a CORS preflight request for a route accepting `methods`"""
+    headers = {'access-control-allow-methods': ', '.join(sorted(set(methods) | {'OPTIONS'}))}
+    requested = dict(scope.get('headers', [])).get(b'access-control-request-headers')
+    if requested:
+        headers['access-control-allow-headers'] = requested.decode()
+    return Response(status=200, content_type='text/html; charset=utf-8', headers=headers)
+
+async def http_app(scope, receive, send):
+    """Dispatch plain HTTP requests to the routes; Socket.IO traffic never reaches here"""
+    if scope['type'] != 'http':
+        return
+
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+
+    request = Request(scope, body)
+    response = None
+    allowed = []
+    for regex, methods, handler in ROUTES:
+        match = regex.match(request.path)
+        if match:
+            allowed.extend(methods)
+            if request.method not in methods:
+                continue
+            response = await handler(request, **match.groupdict())
+            break
+
+    if response is None and request.method == 'OPTIONS' and allowed:
+        response = cors_preflight(scope, allowed)
+    elif response is None:
+        response = jsonify({'error': 'Method not allowed'}, 405) if allowed else jsonify({'error': 'Not found'}, 404)
+
+    # Any origin may call the API, as with flask-cors on the Flask server
+    response.headers.setdefault('access-control-allow-origin', '*')
+    await response.send(send)
+
+async def startup():
+    """Bind progress broadcasts and the job pools to the server's event loop"""
+    global _loop
+    _loop = asyncio.get_running_loop()
+    await api.job_manager.start()
+    if api.prefetch_manager is not None:
+        await api.prefetch_manager.start()
+    api.resume_jobs()
+
+app = socketio.ASGIApp(sio, other_asgi_app=http_app, on_startup=startup, on_shutdown=api.shutdown)
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        sys.exit("The ASGI server needs uvicorn: uv sync --extra asgi")
+
+    print("Starting AI Learning App ASGI server...")
+    print("Frontend available at: http://localhost:8000")
+    print("Same API endpoints and WebSocket events as src/web_server.py")
+
+    uvicorn.run(app, host='0.0.0.0', port=8000)
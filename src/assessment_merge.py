@@ -0,0 +1,132 @@
+"""
+Map-reduce helpers for AI Learning App assessments
+Builds compact lesson digests for per-lesson question generation and merges
+the candidate questions into one balanced assessment
+"""
+import re
+from typing import Dict, FrozenSet, List
+
+# Share of multiple choice questions; the rest are true/false (see tasks.yaml)
+MULTIPLE_CHOICE_SHARE = 0.7
+
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+# Questions sharing at least this fraction of their words are duplicates
+DUPLICATE_SIMILARITY = 0.8
+
+# Longest lesson text included in a digest, in characters
+MAX_DIGEST_TEXT = 6000
+
+def assessment_size(lesson_count: int) -> int:
+    """Number of questions in an assessment, within the 8-12 range of tasks.yaml"""
+    return max(8, min(12, 4 * lesson_count))
+
+def lesson_digest(lesson: dict) -> str:
+    """Render a lesson as compact text for question generation"""
+    lines = [f"Title: {lesson.get('title', '')}"]
+
+    key_concepts = lesson.get('key_concepts') or []
+    if key_concepts:
+        lines.append("Key concepts: " + "; ".join(str(concept) for concept in key_concepts))
+
+    key_terms = lesson.get('key_terms') or {}
+    if isinstance(key_terms, dict) and key_terms:
+        lines.append("Key terms:")
+        lines.extend(f"- {term}: {definition}" for term, definition in key_terms.items())
+
+    text = ' '.join(str(lesson.get('main_lesson_text', lesson.get('content', ''))).split())
+    if len(text) > MAX_DIGEST_TEXT:
+        text = text[:MAX_DIGEST_TEXT] + "..."
+    lines.append(f"Lesson text: {text}")
+
+    return "\n".join(lines)
+
+def _question_words(question: dict) -> FrozenSet[str]:
+    return frozenset(re.findall(r'[a-z0-9]+', str(question.get('question', '')).lower()))
+
+def _is_duplicate(words: FrozenSet[str], other: FrozenSet[str]) -> bool:
+    if not words or not other:
+        return words == other
+    return len(words & other) / len(words | other) >= DUPLICATE_SIMILARITY
+
+def _is_valid(question: dict) -> bool:
+    """Check that a candidate question is complete and internally consistent"""
+    if not isinstance(question, dict) or not str(question.get('question', '')).strip():
+        return False
+    if question.get('type') == 'multiple_choice':
+        options = question.get('options')
+        answer = question.get('correct_answer')
+        return (isinstance(options, list) and len(options) >= 2 and isinstance(answer, int)
+                and not isinstance(answer, bool) and 0 <= answer < len(options))
+    if question.get('type') == 'true_false':
+        return isinstance(question.get('correct_answer'), bool)
+    return False
+
+def merge_questions(candidates: Dict[int, List[dict]], total: int) -> List[dict]:
+    """Merge per-lesson candidate questions into one assessment
+
+    Drops invalid and duplicate questions, picks `total` questions round-robin
+    across lessons with a 70/30 multiple choice / true-false mix and an even
+    spread of difficulties, and renumbers the ids in lesson order.
+    """
+    # Dedupe across all lessons, keeping the first occurrence
+    kept = {number: [] for number in candidates}
+    seen = []
+    for number in sorted(candidates):
+        for question in candidates[number]:
+            if not _is_valid(question):
+                continue
+            words = _question_words(question)
+            if any(_is_duplicate(words, other) for other in seen):
+                continue
+            seen.append(words)
+            if question.get('difficulty') not in DIFFICULTIES:
+                question = dict(question, difficulty='medium')
+            kept[number].append(question)
+
+    available = sum(len(questions) for questions in kept.values())
+    total = min(total, available)
+    multiple_choice = min(round(total * MULTIPLE_CHOICE_SHARE),
+                          sum(q['type'] == 'multiple_choice' for qs in kept.values() for q in qs))
+    targets = {
+        'multiple_choice': multiple_choice,
+        'true_false': total - multiple_choice
+    }
+    # Top up with multiple choice when there are too few true/false questions
+    true_false = sum(q['type'] == 'true_false' for qs in kept.values() for q in qs)
+    if targets['true_false'] > true_false:
+        targets['multiple_choice'] += targets['true_false'] - true_false
+        targets['true_false'] = true_false
+
+    selected = {number: [] for number in kept}
+    counts = {'multiple_choice': 0, 'true_false': 0}
+    difficulty_counts = {difficulty: 0 for difficulty in DIFFICULTIES}
+    chosen = 0
+
+    while chosen < total:
+        progressed = False
+        for number in sorted(kept):
+            if chosen >= total:
+                break
+            pool = [q for q in kept[number] if counts[q['type']] < targets[q['type']]]
+            if not pool:
+                continue
+            # Prefer the type furthest below its target, then the least used difficulty
+            question = min(pool, key=lambda q: (
+                counts[q['type']] - targets[q['type']],
+                difficulty_counts[q['difficulty']]
+            ))
+            kept[number].remove(question)
+            selected[number].append(question)
+            counts[question['type']] += 1
+            difficulty_counts[question['difficulty']] += 1
+            chosen += 1
+            progressed = True
+        if not progressed:
+            break
+
+    questions = []
+    for number in sorted(selected):
+        for question in selected[number]:
+            questions.append(dict(question, id=len(questions) + 1))
+    return questions
@@ -0,0 +1,161 @@
+"""
+Course result cache for AI Learning App
+Finished courses are cached by a hash of everything that shapes them, and
+identical requests that arrive while a course is being generated share that
+run, whichever process sharing the cache database it runs in
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.disk_cache import DiskCache
+from src.storage import default_outputs_path
+
+def normalize_subject(subject: str) -> str:
+    """Normalize a subject so casing and spacing differences share a cache entry"""
+    return ' '.join(subject.lower().split())
+
+def course_cache_key(subject: str, num_lessons: int, model: str, config_hash: str) -> str:
+    """Build the content-addressed key for a course request"""
+    raw = json.dumps({
+        'subject': normalize_subject(subject),
+        'num_lessons': num_lessons,
+        'model': model,
+        'config': config_hash
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class _Call:
+    """A single in-flight call shared by every caller with the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one execution"""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], Any], on_wait: Callable[[], None] = None) -> Tuple[Any, bool]:
+        """Run `fn` unless a call with this key is already running, in which case wait for it
+
+        Returns the result and whether it was shared with another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if on_wait:
+                on_wait()
+            call.done.wait()
+            if call.error:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+# Process-wide coalescing of identical course generations
+course_flights = SingleFlight()
+
+_course_cache = None
+_course_cache_lock = threading.Lock()
+
+def get_course_cache() -> DiskCache:
+    """Get the process-wide course result cache, configured from the environment
+
+    COURSE_CACHE_PATH (default course_cache.db in OUTPUTS_DIR), COURSE_CACHE_TTL in
+    seconds (default 1 day, 0 disables caching) and COURSE_CACHE_MAX_ENTRIES
+    (default 500).
+    """
+    global _course_cache
+    with _course_cache_lock:
+        if _course_cache is None:
+            default_path = default_outputs_path() / 'course_cache.db'
+            _course_cache = DiskCache(
+                os.getenv('COURSE_CACHE_PATH', str(default_path)),
+                ttl_seconds=float(os.getenv('COURSE_CACHE_TTL', str(24 * 3600))),
+                max_entries=int(os.getenv('COURSE_CACHE_MAX_ENTRIES', '500')),
+                table='course_cache'
+            )
+        return _course_cache
+
+# How often a process waiting for another one's identical generation checks on it
+LEASE_POLL_SECONDS = 0.5
+
+_course_leases = None
+
+def get_course_leases() -> DiskCache:
+    """Get the leases of course generations in flight, kept next to the course cache
+
+    A lease expires after COURSE_LEASE_TTL seconds (default 30 minutes), so a
+    process that dies mid-generation doesn't hold up identical requests for longer.
+    """
+    global _course_leases
+    cache = get_course_cache()
+    with _course_cache_lock:
+        if _course_leases is None:
+            _course_leases = DiskCache(
+                cache.db_path,
+                ttl_seconds=float(os.getenv('COURSE_LEASE_TTL', str(30 * 60))),
+                max_entries=cache.max_entries,
+                table='course_leases'
+            )
+        return _course_leases
+
+def coalesce_course(key: str, generate: Callable[[], Any], on_wait: Callable[[], None]) -> Tuple[Any, bool]:
+    """Generate a course unless an identical one is already being generated
+
+    Callers in this process share the running generation. Processes sharing
+    the course cache database (crew worker processes, server processes) take
+    turns through a lease: a process that finds the lease held waits for it,
+    then serves the course the holder cached, or generates it if the holder
+    failed. With caching disabled there is nothing to hand over, so only
+    callers within a process are coalesced.
+
+    Returns the result and whether it came from another caller's generation.
+    """
+    cache = get_course_cache()
+
+    def lead() -> Tuple[Any, bool]:
+        if cache.ttl_seconds <= 0:
+            return generate(), False
+
+        leases = get_course_leases()
+        waited = False
+        while not leases.add(key, os.getpid()):
+            if not waited:
+                on_wait()
+                waited = True
+            time.sleep(LEASE_POLL_SECONDS)
+
+        try:
+            if waited:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached, True
+            return generate(), False
+        finally:
+            leases.delete(key)
+
+    (result, shared_across_processes), shared = course_flights.do(key, lead, on_wait=on_wait)
+    return result, shared or shared_across_processes
@@ -0,0 +1,404 @@
+"""
+Crew executors for AI Learning App
+Job handlers run crew methods through an executor: either on the calling
+thread, or in a pool of worker processes so CrewAI's CPU work and memory stay
+out of the web server. Worker progress is sent back over a pipe into the job's
+tracker, and workers are recycled after a number of jobs or above an RSS limit
+"""
+import asyncio
+import contextvars
+import functools
+import os
+import resource
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pipe
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from src.metrics import registry
+from src.progress_tracker import ProgressTracker
+
+# Crew methods an executor may run; all take a `tracker` keyword argument
+METHODS = ('create_course', 'build_assessment', 'resume_course')
+
+# LLM budgets of the process-wide gateway, split between worker processes
+LLM_BUDGETS = {
+    'LLM_REQUESTS_PER_MINUTE': '500',
+    'LLM_TOKENS_PER_MINUTE': '200000',
+    'LLM_MAX_CONCURRENCY': '8',
+}
+
+CREW_WORKERS_RECYCLED = registry.counter(
+    'learning_app_crew_workers_recycled_total',
+    'Crew worker processes stopped after too many jobs, too much memory or a crash',
+    ['reason']
+)
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+async def readable(conn: Connection):
+    """Wait, without blocking the event loop, until a connection has a message (or EOF) to read"""
+    if conn.poll():
+        return
+    loop = asyncio.get_running_loop()
+    ready = loop.create_future()
+    loop.add_reader(conn.fileno(), lambda: ready.done() or ready.set_result(None))
+    try:
+        await ready
+    finally:
+        loop.remove_reader(conn.fileno())
+
+class CrewExecutor:
+    """Interface shared by all executors
+
+    `run` calls a crew method (see METHODS) with the given arguments and a
+    `tracker` that receives the run's progress, at an LLM priority.
+    """
+
+    def __init__(self):
+        self.course_listeners: List[Callable[[str], None]] = []
+
+    def run(self, method: str, *args, tracker: ProgressTracker = None, priority: str = 'interactive', **kwargs):
+        raise NotImplementedError
+
+    async def run_async(self, method: str, *args, tracker: ProgressTracker = None, priority: str = 'interactive',
+                        **kwargs):
+        """Await `run` from an event loop on a worker thread of the loop's default executor"""
+        return await asyncio.to_thread(self.run, method, *args, tracker=tracker, priority=priority, **kwargs)
+
+    def add_course_listener(self, callback: Callable[[str], None]):
+        """Register a callback for newly written final course files"""
+        self.course_listeners.append(callback)
+
+    def _notify_course_saved(self, course_filename: str):
+        """Tell listeners about a new final course file"""
+        for callback in self.course_listeners:
+            try:
+                callback(course_filename)
+            except Exception as e:
+                print(f"Error in course listener: {e}")
+
+    def stats(self) -> dict:
+        return {}
+
+    def shutdown(self):
+        pass
+
+class InProcessCrewExecutor(CrewExecutor):
+    """Runs crew methods on the calling thread with one shared crew
+
+    From an event loop, runs go to a pool of `threads` threads of their own.
+    """
+
+    def __init__(self, crew_factory: Callable, threads: Optional[int] = None):
+        super().__init__()
+        self.crew_factory = crew_factory
+        self.threads = threads
+        self._listening = False
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _crew(self):
+        crew = self.crew_factory()
+        with self._lock:
+            if not self._listening:
+                crew.add_course_listener(self._notify_course_saved)
+                self._listening = True
+        return crew
+
+    def run(self, method: str, *args, tracker: ProgressTracker = None, priority: str = 'interactive', **kwargs):
+        if method not in METHODS:
+            raise ValueError(f"Unknown crew method: {method}")
+        crew = self._crew()
+        from src.llm_gateway import llm_priority
+        with llm_priority(priority):
+            return getattr(crew, method)(*args, tracker=tracker, **kwargs)
+
+    async def run_async(self, method: str, *args, tracker: ProgressTracker = None, priority: str = 'interactive',
+                        **kwargs):
+        """Await `run` on one of the executor's threads
+
+        CrewAI runs synchronously (its own kickoff_async is also a thread), so
+        every run in flight holds a thread: at most `threads` run at once and
+        later ones wait for a free thread. Use CREW_EXECUTOR=process to run
+        crews without holding threads of the server.
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='crew')
+        # Carry the caller's context (trace span, LLM priority) onto the thread, like asyncio.to_thread
+        call = functools.partial(contextvars.copy_context().run, self.run, method, *args,
+                                 tracker=tracker, priority=priority, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+class CrewWorker:
+    """One worker process running `python -m src.crew_executor`, serving one job at a time"""
+
+    def __init__(self, env: dict):
+        self.conn, child_conn = Pipe()
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'src.crew_executor', str(child_conn.fileno())],
+            cwd=Path(__file__).parent.parent, env=env, pass_fds=[child_conn.fileno()]
+        )
+        child_conn.close()
+        self.jobs = 0
+        self.rss = 0
+        self.alive = True
+
+    def _handle(self, message: tuple, tracker: Optional[ProgressTracker], on_course_saved: Callable[[str], None]):
+        """Act on a message from the worker; returns (True, result) once the job has finished"""
+        if message[0] == 'progress':
+            if tracker is not None:
+                tracker.apply(message[1])
+        elif message[0] == 'course_saved':
+            on_course_saved(message[1])
+        else:
+            self.rss = message[2]
+            if message[0] == 'error':
+                raise RuntimeError(message[1])
+            return True, message[1]
+        return False, None
+
+    def run(self, request: tuple, tracker: Optional[ProgressTracker], on_course_saved: Callable[[str], None]):
+        """Send a job to the worker and relay its messages until it finishes"""
+        self.jobs += 1
+        try:
+            self.conn.send(request)
+            while True:
+                done, result = self._handle(self.conn.recv(), tracker, on_course_saved)
+                if done:
+                    return result
+        except (EOFError, OSError) as e:
+            self.alive = False
+            raise RuntimeError(f"Crew worker {self.process.pid} exited unexpectedly") from e
+
+    async def run_async(self, request: tuple, tracker: Optional[ProgressTracker],
+                        on_course_saved: Callable[[str], None]):
+        """Like `run`, but waits for the worker's messages on the event loop instead of a thread"""
+        self.jobs += 1
+        try:
+            self.conn.send(request)
+            while True:
+                await readable(self.conn)
+                done, result = self._handle(self.conn.recv(), tracker, on_course_saved)
+                if done:
+                    return result
+        except (EOFError, OSError) as e:
+            self.alive = False
+            raise RuntimeError(f"Crew worker {self.process.pid} exited unexpectedly") from e
+        except asyncio.CancelledError:
+            # The worker is still running the job; it can't be reused
+            self.alive = False
+            self.process.kill()
+            raise
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it doesn't"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.conn.close()
+        self.alive = False
+
+class ProcessPoolCrewExecutor(CrewExecutor):
+    """Runs crew methods in a pool of worker processes
+
+    Workers are started on demand, up to `processes`, each with its own crew,
+    and each handles one job at a time. A worker is replaced after
+    `max_jobs` jobs, once its RSS after a job exceeds `max_rss_mb`, or when it
+    dies. The LLM gateway's budgets are divided between the workers so the
+    pool as a whole stays within them.
+
+    Each worker admits its own LLM calls, so `interactive` calls only go
+    before `batch` calls waiting in the same worker. A pre-generation worker
+    spends its share of the budget whatever the other workers are waiting for;
+    use the thread executor when requested jobs must always be served first.
+    """
+
+    def __init__(self, processes: int = 2, max_jobs: int = 20, max_rss_mb: float = 1024):
+        super().__init__()
+        self.processes = max(1, processes)
+        self.max_jobs = max_jobs
+        self.max_rss = max_rss_mb * 1024 * 1024
+
+        self._idle: List[CrewWorker] = []
+        self._started = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _worker_env(self) -> dict:
+        """Environment of a new worker: this one, with an equal share of each LLM budget"""
+        env = os.environ.copy()
+        for name, default in LLM_BUDGETS.items():
+            budget = float(os.getenv(name, default))
+            if name == 'LLM_MAX_CONCURRENCY':
+                # 0 turns a limit off, so it stays 0; otherwise every worker gets at least one slot
+                env[name] = str(max(1, int(budget) // self.processes) if budget > 0 else 0)
+            else:
+                env[name] = str(budget / self.processes)
+        return env
+
+    def _checkout(self) -> CrewWorker:
+        """Take an idle worker, starting one if the pool isn't full, or wait for one"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Crew executor is shut down")
+                if self._idle:
+                    return self._idle.pop()
+                if self._started < self.processes:
+                    self._started += 1
+                    break
+                self._condition.wait()
+
+        try:
+            worker = CrewWorker(self._worker_env())
+        except Exception:
+            with self._condition:
+                self._started -= 1
+                self._condition.notify()
+            raise
+        print(f"Started crew worker {worker.process.pid}")
+        return worker
+
+    def _checkin(self, worker: CrewWorker):
+        """Return a worker to the pool, or recycle it"""
+        reason = None
+        if not worker.alive:
+            reason = 'crashed'
+        elif self.max_jobs and worker.jobs >= self.max_jobs:
+            reason = 'jobs'
+        elif self.max_rss and worker.rss > self.max_rss:
+            reason = 'memory'
+
+        with self._condition:
+            if reason is None and not self._closed:
+                self._idle.append(worker)
+                self._condition.notify()
+                return
+
+        if reason:
+            CREW_WORKERS_RECYCLED.inc(reason=reason)
+            print(f"Recycling crew worker {worker.process.pid} ({reason}, {worker.jobs} jobs, "
+                  f"{worker.rss / 1024 / 1024:.0f} MB)")
+        worker.stop()
+        with self._condition:
+            self._started -= 1
+            self._condition.notify()
+
+    def run(self, method: str, *args, tracker: ProgressTracker = None, priority: str = 'interactive', **kwargs):
+        if method not in METHODS:
+            raise ValueError(f"Unknown crew method: {method}")
+        job_id = tracker.job_id if tracker is not None else None
+        worker = self._checkout()
+        try:
+            return worker.run((method, args, kwargs, job_id, priority), tracker, self._notify_course_saved)
+        finally:
+            self._checkin(worker)
+
+    async def run_async(self, method: str, *args, tracker: ProgressTracker = None, priority: str = 'interactive',
+                        **kwargs):
+        if method not in METHODS:
+            raise ValueError(f"Unknown crew method: {method}")
+        job_id = tracker.job_id if tracker is not None else None
+        # Checking out may start a process or wait for a free one, and
+        # recycling waits for a process to exit; neither runs on the loop
+        worker = await asyncio.to_thread(self._checkout)
+        try:
+            return await worker.run_async((method, args, kwargs, job_id, priority), tracker, self._notify_course_saved)
+        finally:
+            await asyncio.to_thread(self._checkin, worker)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {'idle': len(self._idle), 'busy': self._started - len(self._idle)}
+
+    def shutdown(self):
+        """Stop idle workers; busy ones are stopped when their job finishes"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._condition.notify_all()
+        for worker in idle:
+            worker.stop()
+
+def create_crew_executor(crew_factory: Callable, processes: int, default: str = 'thread') -> CrewExecutor:
+    """Create the executor selected by CREW_EXECUTOR (`default` when unset)
+
+    `thread` runs crews on the job threads of this process (up to `processes`
+    threads when awaited from an event loop); `process` runs them in up to
+    `processes` worker processes, recycled after CREW_WORKER_MAX_JOBS jobs
+    (default 20, 0 disables) or above CREW_WORKER_MAX_RSS_MB (default 1024,
+    0 disables).
+    """
+    kind = os.getenv('CREW_EXECUTOR', default).lower()
+    if kind == 'thread':
+        return InProcessCrewExecutor(crew_factory, threads=processes)
+    if kind == 'process':
+        return ProcessPoolCrewExecutor(
+            processes=processes,
+            max_jobs=int(os.getenv('CREW_WORKER_MAX_JOBS', '20')),
+            max_rss_mb=float(os.getenv('CREW_WORKER_MAX_RSS_MB', '1024'))
+        )
+    raise ValueError(f"Unknown crew executor: {kind}")
+
+def worker_main(fd: int):
+    """Serve jobs from the parent process until it sends None or goes away"""
+    conn = Connection(fd)
+    send_lock = threading.Lock()
+
+    def send(message):
+        # Progress arrives from the crew's lesson and search threads
+        with send_lock:
+            conn.send(message)
+
+    from crew import LearningAppCrew
+    from src.llm_gateway import llm_priority
+    crew = LearningAppCrew()
+    crew.add_course_listener(lambda course_filename: send(('course_saved', course_filename)))
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        method, args, kwargs, job_id, priority = request
+        tracker = ProgressTracker(job_id=job_id)
+        tracker.add_callback(lambda progress_data: send(('progress', progress_data)))
+        try:
+            with llm_priority(priority):
+                result = getattr(crew, method)(*args, tracker=tracker, **kwargs)
+        except Exception as e:
+            # Only the message is sent, so the parent never has to import CrewAI to unpickle it
+            send(('error', str(e), current_rss()))
+            continue
+        send(('result', result, current_rss()))
+
+if __name__ == '__main__':
+    worker_main(int(sys.argv[1]))
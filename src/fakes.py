@@ -0,0 +1,228 @@
+"""
+Offline stand-ins for the OpenAI and Serper backends
+A scripted CrewAI LLM and a fake Serper HTTP session with configurable latency,
+so courses and assessments can be generated deterministically without network
+access (used by benchmark.py)
+"""
+import json
+import random
+import re
+import threading
+import time
+from typing import List, Optional
+
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallStartedEvent, LLMCallType
+from crewai.llms.base_llm import BaseLLM
+
+from src.tools import serper_tool
+
+class _Latency:
+    """Seeded latency with jitter, shared between threads"""
+
+    def __init__(self, seconds: float, jitter: float, seed: int):
+        self.seconds = seconds
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self):
+        if self.seconds <= 0:
+            return
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(self.seconds * factor)
+
+class FakeLLM(BaseLLM):
+    """A scripted LLM that answers each task of the app with valid, deterministic output
+
+    Agents with tools first get a batch search action, then the final answer,
+    so the tool path runs as it would with a real model. Start and completion
+    events are emitted like CrewAI's LLM, so metrics and traces still work.
+    """
+
+    def __init__(self, model: str = "fake-llm", latency: float = 0.5, jitter: float = 0.2, seed: int = 0):
+        super().__init__(model=model)
+        self._latency = _Latency(latency, jitter, seed)
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None) -> str:
+        crewai_event_bus.emit(self, event=LLMCallStartedEvent(
+            messages=messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent, model=self.model
+        ))
+        if isinstance(messages, str):
+            messages = [{'role': 'user', 'content': messages}]
+
+        self._latency.sleep()
+        response = self._respond(messages, from_agent)
+
+        crewai_event_bus.emit(self, event=LLMCallCompletedEvent(
+            messages=messages, response=response, call_type=LLMCallType.LLM_CALL,
+            from_task=from_task, from_agent=from_agent, model=self.model
+        ))
+        return response
+
+    def supports_stop_words(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128000
+
+    def _respond(self, messages: List[dict], from_agent) -> str:
+        prompt = "\n".join(str(message.get('content', '')) for message in messages if message.get('role') != 'assistant')
+        searched = any('Observation:' in str(message.get('content', ''))
+                       for message in messages if message.get('role') == 'assistant')
+
+        tools = getattr(from_agent, 'tools', None) or []
+        batch_tool = next((tool.name for tool in tools if tool.name == serper_tool.SerperBatchSearchTool().name), None)
+        if batch_tool and not searched:
+            topic = _first_match(r'course on "([^"]+)"', prompt) or "the subject"
+            queries = [f"{topic} overview", f"{topic} history", f"{topic} examples"]
+            return (f"Thought: I should research the key topics first\n"
+                    f"Action: {batch_tool}\n"
+                    f"Action Input: {json.dumps({'queries': queries})}")
+
+        return f"Thought: I now know the final answer\nFinal Answer: {json.dumps(_answer(prompt), indent=2)}"
+
+def _first_match(pattern: str, text: str) -> Optional[str]:
+    match = re.search(pattern, text)
+    return match.group(1) if match else None
+
+def _lesson_numbers(text: str) -> List[int]:
+    """Lesson numbers mentioned in a task's input, ignoring its output template"""
+    text = text.split("LESSON CONTENT TO STRUCTURE:", 1)[-1]
+    numbers = sorted({int(number) for number in re.findall(r'"lesson_(\d+)"', text)})
+    return numbers or [1]
+
+# Lesson paragraphs, cycled to make lessons of any length
+_PARAGRAPHS = [
+    "Welcome to lesson {number} on {subject}. Let's explore how the core ideas fit together "
+    "and why they matter in practice.",
+    "You will learn the vocabulary used throughout {subject}, with concrete examples for each term.",
+    "Let's look at how these ideas developed over time, who shaped them, and which debates are still open.",
+    "Consider a worked example: we break a typical {subject} problem into steps and check each result.",
+    "Finally, we apply what you have learned to a real-world scenario and review the key points."
+]
+
+def _lesson(subject: str, number: int, paragraphs: int = 3) -> dict:
+    text = [_PARAGRAPHS[index % len(_PARAGRAPHS)].format(subject=subject, number=number) for index in range(paragraphs)]
+    return {
+        'title': f"Introduction to {subject}" if number == 1 else f"{subject}: Part {number}",
+        'key_concepts': [f"Concept {number}.{index}" for index in range(1, 4)],
+        'key_terms': {f"term_{number}_{index}": f"Definition of term {index} in lesson {number}" for index in range(1, 3)},
+        'main_lesson_text': "\n\n".join(text)
+    }
+
+def fake_course(subject: str, lesson_count: int, paragraphs: int = 3) -> dict:
+    """A final course in the structure_final_course format"""
+    return {'course': {f"lesson_{number}": _lesson(subject, number, paragraphs) for number in range(1, lesson_count + 1)}}
+
+def fake_assessment(subject: str, question_count: int = 10) -> dict:
+    """An assessment in the build_assessment format"""
+    return {'assessment': {
+        'title': f"Assessment: {subject}",
+        'description': "Test your understanding of the key concepts from this course",
+        'questions': [dict(_question(1 + index % 3, index), id=index) for index in range(1, question_count + 1)]
+    }}
+
+def _question(number: int, index: int) -> dict:
+    # Distinct tokens per question, so the assessment merge doesn't dedupe them
+    tag = f"L{number}Q{index}"
+    difficulty = ['easy', 'medium', 'hard'][index % 3]
+    if index % 10 in (2, 5, 8):
+        return {
+            'type': 'true_false',
+            'question': f"Statement {tag} holds for {tag}A and {tag}B according to the lesson",
+            'correct_answer': index % 2 == 0,
+            'explanation': f"Lesson {number} covers this directly.",
+            'difficulty': difficulty
+        }
+    return {
+        'type': 'multiple_choice',
+        'question': f"Which option best describes {tag}, as applied to {tag}A in case {tag}B?",
+        'options': [f"Option {letter} for concept {index}" for letter in "ABCD"],
+        'correct_answer': index % 4,
+        'explanation': f"Concept {index} is defined in lesson {number}.",
+        'difficulty': difficulty
+    }
+
+def _answer(prompt: str) -> dict:
+    """Build the JSON a well-behaved model would return for the task in the prompt"""
+    subject = _first_match(r'subject "([^"]+)"', prompt) or _first_match(r'course on "?([^"\n,]+)"?', prompt) or "Subject"
+
+    if "Create ONLY lesson outlines" in prompt:
+        count = int(_first_match(r'with (\d+) lesson', prompt) or 1)
+        return {'curriculum': {
+            f"lesson_{number}_outline": {
+                'title': f"{subject}: Part {number}",
+                'learning_objectives': [f"Understand part {number}", f"Apply part {number}"],
+                'key_topics': [f"Topic {number}.{index}" for index in range(1, 4)],
+                'description': f"Part {number} of the course on {subject}"
+            } for number in range(1, count + 1)
+        }}
+
+    if "Research and write the content for lesson" in prompt:
+        number = int(_first_match(r'content for lesson (\d+)', prompt) or 1)
+        lesson = _lesson(subject, number)
+        return {'title': lesson['title'], 'content': lesson['main_lesson_text']}
+
+    if "Take the curriculum outlines" in prompt:
+        numbers = sorted({int(number) for number in re.findall(r'lesson_(\d+)_outline', prompt)}) or [1]
+        return {'lessons': {
+            f"lesson_{number}": {'title': _lesson(subject, number)['title'], 'content': _lesson(subject, number)['main_lesson_text']}
+            for number in numbers
+        }}
+
+    if "structure it into the final course format" in prompt:
+        return {'course': {f"lesson_{number}": _lesson(subject, number) for number in _lesson_numbers(prompt)}}
+
+    if "Create candidate assessment questions" in prompt:
+        number = int(_first_match(r'for lesson (\d+)', prompt) or 1)
+        count = int(_first_match(r'Create (\d+) questions', prompt) or 4)
+        return {'questions': [_question(number, index) for index in range(1, count + 1)]}
+
+    if "Create a comprehensive assessment" in prompt:
+        return fake_assessment(subject)
+
+    return {'result': 'ok'}
+
+class _FakeResponse:
+    def __init__(self, payload: dict):
+        self._payload = payload
+        self.status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self) -> dict:
+        return self._payload
+
+class FakeSerperSession:
+    """Answers Serper search requests locally after a configurable delay"""
+
+    def __init__(self, latency: float = 0.3, jitter: float = 0.2, seed: int = 0):
+        self._latency = _Latency(latency, jitter, seed)
+
+    def post(self, url, json=None, headers=None, timeout=None) -> _FakeResponse:
+        self._latency.sleep()
+        query = (json or {}).get('q', '')
+        num = (json or {}).get('num', 5)
+        slug = re.sub(r'[^a-z0-9]+', '-', query.lower()).strip('-')
+        return _FakeResponse({'organic': [
+            {
+                'title': f"{query} - result {index}",
+                'link': f"https://example.com/{slug}/{index}",
+                'snippet': f"Background on {query}, with facts and examples ({index})."
+            } for index in range(1, num + 1)
+        ]})
+
+def use_fake_search(latency: float = 0.3, jitter: float = 0.2, seed: int = 0):
+    """Route Serper searches to a FakeSerperSession"""
+    with serper_tool._session_lock:
+        serper_tool._session = FakeSerperSession(latency, jitter, seed)
+
+def use_fake_llm(crew, latency: float = 0.5, jitter: float = 0.2, seed: int = 0) -> FakeLLM:
+    """Make a LearningAppCrew use a FakeLLM for every agent it creates"""
+    crew.llm = FakeLLM(model="fake-llm", latency=latency, jitter=jitter, seed=seed)
+    return crew.llm
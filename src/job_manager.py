@@ -0,0 +1,285 @@
+"""
+Background job system for AI Learning App
+Runs long CrewAI pipelines off the request thread and persists job state to disk
+"""
+import asyncio
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+@dataclass
+class Job:
+    """Represents a single course or assessment generation request"""
+    id: str
+    kind: str  # 'course', 'assessment'
+    params: Dict[str, Any]
+    status: str = "queued"  # 'queued', 'running', 'completed', 'error', 'cancelled'
+    created: str = None
+    started: str = None
+    finished: str = None
+    result: Any = None
+    error: str = None
+
+# Statuses of jobs that will not run again
+FINISHED_STATUSES = ("completed", "error", "cancelled")
+
+class JobManager:
+    """Runs jobs on a bounded worker pool and keeps one JSON record per job
+
+    Finished jobs are kept for `retention_seconds` (0 keeps them regardless of
+    age), and only the `max_finished` most recent ones; older records are
+    removed from memory and disk.
+    """
+
+    def __init__(self, jobs_path: Path, max_workers: int = 2, retention_seconds: float = 7 * 24 * 3600,
+                 max_finished: int = 1000):
+        self.jobs_path = Path(jobs_path)
+        self.jobs_path.mkdir(parents=True, exist_ok=True)
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self.handlers: Dict[str, Callable] = {}
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+
+        self._load_jobs()
+
+    def register(self, kind: str, handler: Callable):
+        """Register the function that runs jobs of the given kind"""
+        self.handlers[kind] = handler
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        """Queue a new job and return it immediately"""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            params=params,
+            created=datetime.now().isoformat()
+        )
+
+        with self._lock:
+            self.jobs[job.id] = job
+            self._save(job)
+
+        self._schedule(job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id"""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def find(self, kind: str, **params) -> Optional[Job]:
+        """Get the most recent job of a kind whose params include the given values"""
+        with self._lock:
+            matches = [
+                job for job in self.jobs.values()
+                if job.kind == kind and all(job.params.get(key) == value for key, value in params.items())
+            ]
+        return max(matches, key=lambda job: job.created or '', default=None)
+
+    def status_counts(self) -> Dict[tuple, int]:
+        """Count jobs by (kind, status)"""
+        counts: Dict[tuple, int] = {}
+        with self._lock:
+            for job in self.jobs.values():
+                key = (job.kind, job.status)
+                counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a job that has not finished yet
+
+        Queued jobs never start; a running job finishes its current work but
+        its result is discarded. Returns whether the job was cancelled.
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.status not in ("queued", "running"):
+                return False
+            job.status = "cancelled"
+            job.finished = datetime.now().isoformat()
+            self._save(job)
+            self._prune()
+            return True
+
+    def resume_pending(self):
+        """Re-queue jobs that were still waiting when the server last stopped"""
+        with self._lock:
+            pending = [job.id for job in self.jobs.values() if job.status == "queued" and job.kind in self.handlers]
+
+        for job_id in pending:
+            self._schedule(job_id)
+
+        if pending:
+            print(f"Resumed {len(pending)} queued job(s)")
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones"""
+        self._executor.shutdown(wait=wait)
+
+    def _schedule(self, job_id: str):
+        """Queue a job on the worker pool"""
+        self._executor.submit(self._run, job_id)
+
+    def _run(self, job_id: str):
+        """Execute a job on a worker thread"""
+        job = self._start(job_id)
+        if job is None:
+            return
+
+        try:
+            result = self.handlers[job.kind](job)
+        except Exception as e:
+            self._fail(job, e)
+            return
+
+        self._complete(job, result)
+
+    def _start(self, job_id: str) -> Optional[Job]:
+        """Mark a job as running, or return None if it was cancelled while queued"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            # Cancelled jobs may already have been pruned
+            if job is None or job.status == "cancelled":
+                return None
+            job.status = "running"
+            job.started = datetime.now().isoformat()
+            self._save(job)
+
+        print(f"Running {job.kind} job {job.id}")
+        return job
+
+    def _fail(self, job: Job, e: Exception):
+        """Record a job's error unless it was cancelled"""
+        print(f"Job {job.id} failed: {e}")
+        with self._lock:
+            if job.status == "cancelled":
+                return
+            job.status = "error"
+            job.error = str(e)
+            job.finished = datetime.now().isoformat()
+            self._save(job)
+            self._prune()
+
+    def _complete(self, job: Job, result: Any):
+        """Record a job's result unless it was cancelled"""
+        with self._lock:
+            if job.status == "cancelled":
+                print(f"Job {job.id} was cancelled; discarding its result")
+                return
+            job.status = "completed"
+            job.result = result
+            job.finished = datetime.now().isoformat()
+            self._save(job)
+            self._prune()
+
+        print(f"Job {job.id} completed")
+
+    def _save(self, job: Job):
+        """Atomically write a job record to disk"""
+        job_file = self.jobs_path / f"{job.id}.json"
+        tmp_file = job_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(asdict(job), f)
+        os.replace(tmp_file, job_file)
+
+    def _prune(self):
+        """Forget finished jobs past the retention period, and the oldest beyond `max_finished`"""
+        finished = sorted((job for job in self.jobs.values() if job.status in FINISHED_STATUSES),
+                          key=lambda job: job.finished or '', reverse=True)
+        cutoff = (datetime.now() - timedelta(seconds=self.retention_seconds)).isoformat()
+
+        for index, job in enumerate(finished):
+            expired = self.retention_seconds > 0 and bool(job.finished) and job.finished < cutoff
+            if index >= self.max_finished or expired:
+                del self.jobs[job.id]
+                (self.jobs_path / f"{job.id}.json").unlink(missing_ok=True)
+
+    def _load_jobs(self):
+        """Load persisted jobs; anything that was mid-run is marked as interrupted"""
+        for job_file in self.jobs_path.glob('*.json'):
+            try:
+                with open(job_file, 'r') as f:
+                    job = Job(**json.load(f))
+            except Exception as e:
+                print(f"Error loading job file {job_file}: {e}")
+                continue
+
+            if job.status == "running":
+                job.status = "error"
+                job.error = "Job was interrupted by a server restart"
+                job.finished = datetime.now().isoformat()
+                self._save(job)
+
+            self.jobs[job.id] = job
+
+        self._prune()
+
+class AsyncJobManager(JobManager):
+    """Runs jobs as asyncio tasks whose handlers are coroutines
+
+    At most `max_workers` jobs run at once; the rest wait on a semaphore
+    instead of holding a thread. Jobs can be submitted from any thread, but
+    only start once `start` has been awaited on the event loop.
+    """
+
+    def __init__(self, jobs_path: Path, max_workers: int = 2, retention_seconds: float = 7 * 24 * 3600,
+                 max_finished: int = 1000):
+        super().__init__(jobs_path, max_workers, retention_seconds, max_finished)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = []
+        self._tasks = set()
+
+    async def start(self):
+        """Bind to the running event loop and start the jobs submitted before it"""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            waiting, self._waiting = self._waiting, []
+
+        for job_id in waiting:
+            self._spawn(job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Cancel running jobs; they are marked as interrupted on the next start"""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _schedule(self, job_id: str):
+        with self._lock:
+            if self._loop is None:
+                self._waiting.append(job_id)
+                return
+        self._loop.call_soon_threadsafe(self._spawn, job_id)
+
+    def _spawn(self, job_id: str):
+        task = self._loop.create_task(self._run_async(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_async(self, job_id: str):
+        """Execute a job once a slot is free"""
+        async with self._semaphore:
+            job = self._start(job_id)
+            if job is None:
+                return
+
+            try:
+                result = await self.handlers[job.kind](job)
+            except Exception as e:
+                self._fail(job, e)
+                return
+
+            self._complete(job, result)
@@ -0,0 +1,84 @@
+"""
+Prompt-level LLM response cache for AI Learning App
+Completions are stored in a DiskCache keyed on the model, temperature and a
+hash of the messages, so identical prompts (repeated subjects, assessments of
+the same course, reruns) are answered without calling the provider
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Optional
+
+from src.course_cache import SingleFlight
+from src.disk_cache import DiskCache
+from src.storage import default_outputs_path
+
+# LLM_CACHE modes: which calls are cached
+CACHE_MODES = ('off', 'deterministic', 'all')
+
+def llm_cache_mode() -> str:
+    """The LLM_CACHE mode: "off" (default), "deterministic" (temperature-0 calls only) or "all"
+
+    "all" also caches sampled completions, replaying the first answer to a
+    prompt; use it for reproducible benchmark and debugging reruns.
+    """
+    mode = os.getenv('LLM_CACHE', 'off').lower()
+    return mode if mode in CACHE_MODES else 'off'
+
+def should_cache(temperature: Optional[float]) -> bool:
+    """Whether a call at this temperature is cached in the current mode"""
+    mode = llm_cache_mode()
+    return mode == 'all' or (mode == 'deterministic' and temperature == 0)
+
+def llm_cache_key(model: str, temperature: Optional[float], messages: Any, stop=None) -> str:
+    """Build the cache key for a completion request"""
+    raw = json.dumps({
+        'model': model,
+        'temperature': temperature,
+        'stop': sorted(stop or []),
+        'messages': hashlib.sha256(json.dumps(messages, sort_keys=True, default=str).encode()).hexdigest()
+    }, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+# Process-wide coalescing of identical in-flight completions
+llm_flights = SingleFlight()
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+def get_llm_cache() -> DiskCache:
+    """Get the process-wide LLM response cache, configured from the environment
+
+    LLM_CACHE_PATH (default llm_cache.db in OUTPUTS_DIR), LLM_CACHE_TTL in seconds
+    (default 1 day) and LLM_CACHE_MAX_ENTRIES (default 2000).
+    """
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            default_path = default_outputs_path() / 'llm_cache.db'
+            _llm_cache = DiskCache(
+                os.getenv('LLM_CACHE_PATH', str(default_path)),
+                ttl_seconds=float(os.getenv('LLM_CACHE_TTL', str(24 * 3600))),
+                max_entries=int(os.getenv('LLM_CACHE_MAX_ENTRIES', '2000')),
+                table='llm_cache'
+            )
+        return _llm_cache
+
+def cached_completion(model: str, temperature: Optional[float], messages: Any, stop, complete) -> Any:
+    """Return the cached completion for a request, or run `complete` and cache its text"""
+    cache = get_llm_cache()
+    key = llm_cache_key(model, temperature, messages, stop)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    def generate():
+        result = complete()
+        # Only plain text answers; tool call results and structured outputs are not replayable
+        if isinstance(result, str) and result:
+            cache.set(key, result)
+        return result
+
+    result, _ = llm_flights.do(key, generate)
+    return result
@@ -0,0 +1,283 @@
+"""
+Process-wide LLM gateway for AI Learning App
+Every LLM call from every crew goes through one scheduler that enforces the
+provider's requests-per-minute and tokens-per-minute budgets and a concurrency
+limit, serves interactive runs before batch ones, and backs all callers off
+together when the provider answers 429
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from crewai.llms.base_llm import BaseLLM
+
+from src.llm_cache import cached_completion, should_cache
+from src.metrics import LLM_GATEWAY_WAIT, LLM_THROTTLED, registry
+
+# Lower runs first
+PRIORITIES = {'interactive': 0, 'batch': 1}
+
+# Completion tokens reserved for a call before its response is known
+DEFAULT_COMPLETION_TOKENS = 1000
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar('llm_priority', default='interactive')
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the LLM calls in this block (and in workers started with `in_current_context`) at a priority"""
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def approximate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def is_throttled(error: BaseException) -> bool:
+    """Whether an error (or one it was raised from) is a provider rate limit"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if getattr(error, 'code', None) == 'insufficient_quota':
+            return False  # Out of credit; retrying won't help
+        status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+        if status == 429 or 'ratelimit' in type(error).__name__.lower() or 'rate limit' in str(error).lower():
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, from a Retry-After header"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        return float(headers.get('retry-after'))
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """A budget refilled continuously at `per_minute`, holding at most `burst_seconds` of it
+
+    The level may go negative when a call used more than it reserved; later
+    callers then wait for the debt to be paid off.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self._updated = clock()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` is available (0 if it is now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+class LLMGateway:
+    """Schedules LLM calls under shared rate, token and concurrency limits
+
+    Waiting calls are admitted strictly in (priority, arrival) order, so a
+    batch call never overtakes an interactive one. A limit of 0 turns that
+    budget off. `clock` gives the time in seconds for budgets and pauses.
+    """
+
+    def __init__(self, requests_per_minute: float = 500, tokens_per_minute: float = 200000,
+                 max_concurrency: int = 8, max_retries: int = 6,
+                 base_delay: float = 1.0, max_delay: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute > 0 else None
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._waiting = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        """Seconds the call at the head of the queue still has to wait, or 0 to admit it"""
+        if self.max_concurrency > 0 and self._in_flight >= self.max_concurrency:
+            return float('inf')  # Until a call finishes
+        waits = [self._paused_until - now]
+        if self.requests:
+            waits.append(self.requests.wait_time(1, now))
+        if self.tokens:
+            waits.append(self.tokens.wait_time(tokens, now))
+        return max(0.0, *waits)
+
+    def acquire(self, tokens: int, priority: str = 'interactive'):
+        """Block until a call reserving `tokens` may start"""
+        entry = (PRIORITIES[priority], next(self._order))
+        start = self._clock()
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    wait = float('inf')
+                    if self._waiting[0] == entry:
+                        wait = self._wait_time(tokens, self._clock())
+                        if wait == 0:
+                            break
+                    self._condition.wait(None if wait == float('inf') else wait)
+            except BaseException:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._condition.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            self._in_flight += 1
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+            self._condition.notify_all()
+        LLM_GATEWAY_WAIT.observe(self._clock() - start, priority=priority)
+
+    def release(self, reserved: int, used: int):
+        """Finish a call, settling the tokens it reserved against what it used"""
+        with self._condition:
+            self._in_flight -= 1
+            if self.tokens:
+                self.tokens.take(used - reserved)
+            self._condition.notify_all()
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Pause every caller after a 429, with exponential backoff and jitter"""
+        delay = retry_after(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt) * random.uniform(0.5, 1.5)
+        with self._condition:
+            self._paused_until = max(self._paused_until, self._clock() + delay)
+            self._condition.notify_all()
+        return delay
+
+    def call(self, operation, tokens: int, model: str = 'unknown'):
+        """Run `operation` once admitted, retrying it when the provider throttles"""
+        priority = _priority.get()
+        for attempt in range(self.max_retries + 1):
+            self.acquire(tokens, priority)
+            used = tokens
+            try:
+                result = operation()
+                used = tokens - DEFAULT_COMPLETION_TOKENS + approximate_tokens(str(result))
+                return result
+            except Exception as e:
+                if not is_throttled(e) or attempt == self.max_retries:
+                    raise
+                LLM_THROTTLED.inc(model=model)
+                delay = self.backoff(attempt, e)
+                print(f"LLM rate limited ({model}); retrying in {delay:.1f}s (attempt {attempt + 1}/{self.max_retries})")
+            finally:
+                self.release(tokens, used)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                'in_flight': self._in_flight,
+                'waiting': len(self._waiting),
+                'paused_for': round(max(0.0, self._paused_until - self._clock()), 3)
+            }
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """Get the process-wide LLM gateway, configured from the environment
+
+    LLM_REQUESTS_PER_MINUTE (default 500), LLM_TOKENS_PER_MINUTE (default
+    200000), LLM_MAX_CONCURRENCY (default 8) and LLM_MAX_RETRIES (default 6).
+    """
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(
+                requests_per_minute=float(os.getenv('LLM_REQUESTS_PER_MINUTE', '500')),
+                tokens_per_minute=float(os.getenv('LLM_TOKENS_PER_MINUTE', '200000')),
+                max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+                max_retries=int(os.getenv('LLM_MAX_RETRIES', '6'))
+            )
+        return _gateway
+
+registry.gauge('learning_app_llm_gateway_calls', 'LLM calls waiting for or holding a gateway slot',
+               ['state'], function=lambda: {
+                   ('in_flight',): get_llm_gateway().stats()['in_flight'],
+                   ('waiting',): get_llm_gateway().stats()['waiting']
+               })
+
+class GatewayLLM(BaseLLM):
+    """An LLM whose calls are scheduled by the process-wide gateway
+
+    Wraps the crew's configured LLM through CrewAI's public `BaseLLM`
+    interface; events, token usage callbacks and context window come from the
+    wrapped LLM. Stop words set on this LLM by CrewAI's agent executor are the
+    wrapped LLM's. Plain completions are answered from the LLM response cache
+    when LLM_CACHE is on (see src/llm_cache.py).
+    """
+
+    def __init__(self, inner: BaseLLM):
+        self.inner = inner
+        super().__init__(model=inner.model, temperature=getattr(inner, 'temperature', None),
+                         stop=list(inner.stop or []))
+
+    @property
+    def stop(self) -> List[str]:
+        return self.inner.stop
+
+    @stop.setter
+    def stop(self, value: List[str]):
+        self.inner.stop = value
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None):
+        prompt = messages if isinstance(messages, str) else "".join(str(message.get('content', '')) for message in messages)
+        tokens = approximate_tokens(prompt) + DEFAULT_COMPLETION_TOKENS
+
+        def operation():
+            return self.inner.call(messages, tools=tools, callbacks=callbacks,
+                                   available_functions=available_functions,
+                                   from_task=from_task, from_agent=from_agent)
+
+        def scheduled():
+            return get_llm_gateway().call(operation, tokens, model=self.model)
+
+        # Cache hits skip the gateway, so they don't use up the rate budgets
+        if not tools and available_functions is None and should_cache(self.temperature):
+            return cached_completion(self.model, self.temperature, messages, self.stop, scheduled)
+        return scheduled()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def supports_function_calling(self) -> bool:
+        supports = getattr(self.inner, 'supports_function_calling', None)
+        return bool(callable(supports) and supports())
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+def through_gateway(llm: BaseLLM) -> GatewayLLM:
+    """Wrap an LLM so its calls go through the process-wide gateway"""
+    if isinstance(llm, GatewayLLM):
+        return llm
+    return GatewayLLM(llm)
@@ -0,0 +1,295 @@
+"""
+Metrics for AI Learning App
+A small in-process registry of counters, gauges and histograms rendered in the
+Prometheus text exposition format for the /metrics endpoint
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds, from a cached search to a full course generation
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    """Base class for a named metric with a fixed set of label names"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 function: Optional[Callable[[], Dict[LabelValues, float]]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.function = function
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, '')) for name in self.label_names)
+
+    def values(self) -> Dict[LabelValues, float]:
+        """Get the current value of every label combination"""
+        if self.function is not None:
+            try:
+                return {tuple(str(v) for v in key): value for key, value in self.function().items()}
+            except Exception as e:
+                print(f"Error collecting metric {self.name}: {e}")
+                return {}
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+class Counter(_Metric):
+    """A value that only goes up"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    """A value that can go up and down, or is read from a function at scrape time"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    """Counts observations (such as latencies) in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            # Per-bucket counts, then the observation count and sum
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0, 0.0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block takes"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                labels = _format_labels(self.label_names, key, f'le="{_format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {values[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {values[-2]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(values[-1])}")
+        return lines
+
+class MetricsRegistry:
+    """Holds every metric and renders them for scraping"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Iterable[str] = (), function=None) -> Counter:
+        return self._register(Counter(name, documentation, labels, function))
+
+    def gauge(self, name: str, documentation: str, labels: Iterable[str] = (), function=None) -> Gauge:
+        return self._register(Gauge(name, documentation, labels, function))
+
+    def histogram(self, name: str, documentation: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labels, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Process-wide registry used by the crew, tools, trackers and web server
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    'learning_app_stage_duration_seconds',
+    'Time spent in each progress stage of course and assessment generation',
+    ['stage', 'status']
+)
+TASK_DURATION = registry.histogram(
+    'learning_app_task_duration_seconds',
+    'Time taken by each CrewAI task run, by task and agent',
+    ['task', 'agent', 'status']
+)
+LLM_DURATION = registry.histogram(
+    'learning_app_llm_call_duration_seconds',
+    'Latency of individual LLM calls',
+    ['model', 'agent', 'status']
+)
+LLM_TOKENS = registry.counter(
+    'learning_app_llm_tokens_total',
+    'Tokens used by LLM calls',
+    ['model', 'agent', 'type']
+)
+TOOL_DURATION = registry.histogram(
+    'learning_app_tool_duration_seconds',
+    'Latency of agent tool runs',
+    ['tool', 'status']
+)
+TASK_RETRIES = registry.counter(
+    'learning_app_task_retries_total',
+    'Tasks re-run because their output could not be parsed',
+    ['task']
+)
+JSON_PARSE_FAILURES = registry.counter(
+    'learning_app_json_parse_failures_total',
+    'Task outputs that could not be parsed as JSON even after repair',
+    ['task']
+)
+LLM_GATEWAY_WAIT = registry.histogram(
+    'learning_app_llm_gateway_wait_seconds',
+    'Time LLM calls waited for the rate limits and a free slot',
+    ['priority']
+)
+LLM_THROTTLED = registry.counter(
+    'learning_app_llm_throttled_total',
+    'LLM calls the provider rejected with a rate limit and that were retried',
+    ['model']
+)
+
+_llm_calls: Dict[tuple, dict] = {}
+_llm_calls_lock = threading.Lock()
+_llm_hooks_installed = False
+
+def _llm_labels(event) -> Dict[str, str]:
+    return {
+        'model': getattr(event, 'model', None) or 'unknown',
+        'agent': (getattr(event, 'agent_role', None) or 'none').strip()
+    }
+
+def llm_call_key(source) -> tuple:
+    """Key pairing an LLM call's start and end events
+
+    CrewAI emits both from the thread making the call and runs handlers on
+    that thread, so the calling thread and LLM identify a call in flight.
+    """
+    return (threading.get_ident(), id(source))
+
+def llm_token_usage(event) -> Dict[str, int]:
+    """Prompt and completion tokens of a completed LLM call
+
+    CrewAI's completion event doesn't carry the provider's usage, so the
+    tokens are counted with LiteLLM's tokenizer for the model.
+    """
+    import litellm
+
+    messages = event.messages or []
+    if isinstance(messages, str):
+        messages = [{'role': 'user', 'content': messages}]
+    model = event.model or 'unknown'
+    return {
+        'prompt_tokens': litellm.token_counter(model=model, messages=messages),
+        'completion_tokens': litellm.token_counter(model=model, text=str(event.response or ''))
+    }
+
+def install_llm_hooks():
+    """Record LLM call latency and token usage from CrewAI's event bus"""
+    global _llm_hooks_installed
+    if _llm_hooks_installed:
+        return
+    _llm_hooks_installed = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+
+    def finish_llm_call(source, event, status):
+        with _llm_calls_lock:
+            started = _llm_calls.pop(llm_call_key(source), None)
+        if started is None:
+            return
+        LLM_DURATION.observe((event.timestamp - started['start']).total_seconds(),
+                             status=status, **started['labels'])
+        return started['labels']
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        # A call restarted before it ended (e.g. retried without stop words) replaces it
+        with _llm_calls_lock:
+            _llm_calls[llm_call_key(source)] = {'start': event.timestamp, 'labels': _llm_labels(event)}
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        labels = finish_llm_call(source, event, 'success') or _llm_labels(event)
+        for token_type, count in llm_token_usage(event).items():
+            if count:
+                LLM_TOKENS.inc(count, type=token_type.replace('_tokens', ''), **labels)
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        finish_llm_call(source, event, 'error')
@@ -0,0 +1,205 @@
+"""
+Indexed catalog of generated output files for AI Learning App
+Caches parsed metadata per file and only re-parses files that changed
+"""
+import base64
+import bisect
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.output_parser import extract_json
+
+# Fields returned when a listing does not ask for anything else
+COURSE_SUMMARY_FIELDS = ['id', 'filename', 'subject', 'lesson_count', 'created', 'size']
+ASSESSMENT_SUMMARY_FIELDS = ['id', 'filename', 'subject', 'question_count', 'created', 'size']
+
+def load_output_json(file_path: Path):
+    """Load an output JSON file, handling markdown wrappers and malformed agent output"""
+    with open(file_path, 'r') as f:
+        return extract_json(f.read())
+
+def course_subject(data: dict) -> Optional[str]:
+    """Get the subject named in a course body, or None when it names none
+
+    Uses the course's `subject` or `title`, or an "Introduction to ..." first
+    lesson title.
+    """
+    for key in ('subject', 'title'):
+        if isinstance(data.get(key), str) and data[key].strip():
+            return data[key].strip()
+
+    lessons = data.get('course')
+    if isinstance(lessons, dict) and lessons:
+        first_lesson = next(iter(lessons.values()))
+        title_parts = first_lesson.get('title', '').split() if isinstance(first_lesson, dict) else []
+        if len(title_parts) > 2 and title_parts[0].lower() == 'introduction' and title_parts[1].lower() == 'to':
+            return ' '.join(title_parts[2:])
+    return None
+
+def course_entry(file_path: Path, data: dict) -> dict:
+    """Build the catalog entry for a final course file"""
+    filename = file_path.name
+
+    # Extract subject from the course data or filename
+    subject = course_subject(data)
+    if subject is None and data.get('course'):
+        # Fallback to extracting from filename
+        subject_from_filename = filename.replace('final_course_', '').split('_')[0]
+        subject = subject_from_filename.replace('_', ' ').title()
+    subject = subject or "Unknown Subject"
+
+    return {
+        'id': filename.replace('.json', ''),
+        'filename': filename,
+        'subject': subject,
+        'lesson_count': len(data.get('course', {}))
+    }
+
+def assessment_entry(file_path: Path, data: dict) -> dict:
+    """Build the catalog entry for an assessment file"""
+    filename = file_path.name
+
+    # Get subject from filename, dropping the timestamp parts
+    subject_from_filename = filename.replace('assessment_', '').split('_')
+    subject = ' '.join(subject_from_filename[:-2]).replace('_', ' ').title()
+
+    return {
+        'id': filename.replace('.json', ''),
+        'filename': filename,
+        'subject': subject,
+        'question_count': len(data.get('assessment', {}).get('questions', []))
+    }
+
+def output_entry(file_path: Path, data) -> dict:
+    """Build the listing entry for any top-level output file, with a short preview"""
+    preview = str(data)
+    return {
+        'filename': file_path.name,
+        'preview': preview[:200] + '...' if len(preview) > 200 else preview
+    }
+
+class OutputCatalog:
+    """Index of output files matching a glob pattern, newest first
+
+    Entries are cached per file keyed on (mtime, size). The directory is only
+    re-scanned when its own mtime changes (files added, removed or renamed) or
+    when `rescan_interval` seconds have passed, so repeat listings return the
+    cached list without touching the files.
+
+    Only summary metadata is kept in memory; full file bodies are read from
+    disk when a caller asks for them.
+    """
+
+    def __init__(self, directory: Path, pattern: str, build_entry: Callable[[Path, dict], dict],
+                 rescan_interval: float = 30.0):
+        self.directory = Path(directory)
+        self.pattern = pattern
+        self.build_entry = build_entry
+        self.rescan_interval = rescan_interval
+
+        self._entries: Dict[str, Tuple[int, int, dict]] = {}
+        self._sorted: List[dict] = []
+        self._keys: List[tuple] = []
+        self._dir_mtime: Optional[int] = None
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+
+    def list(self) -> List[dict]:
+        """Get all catalog entries sorted by creation time, newest first"""
+        with self._lock:
+            if self._is_stale():
+                self._refresh()
+            return self._sorted
+
+    def page(self, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of entries after `cursor` and the cursor for the next page"""
+        with self._lock:
+            if self._is_stale():
+                self._refresh()
+            entries, keys = self._sorted, self._keys
+
+        start = 0
+        if cursor:
+            start = bisect.bisect_right(keys, decode_cursor(cursor))
+
+        end = len(entries) if limit is None else min(len(entries), start + limit)
+        next_cursor = encode_cursor(entries[end - 1]) if end < len(entries) else None
+        return entries[start:end], next_cursor
+
+    def load(self, entry: dict):
+        """Load the full parsed body of a catalog entry from disk"""
+        return load_output_json(self.directory / entry['filename'])
+
+    def invalidate(self):
+        """Force a directory re-scan on the next listing"""
+        with self._lock:
+            self._dir_mtime = None
+
+    def _is_stale(self) -> bool:
+        """Check whether the directory may have changed since the last scan"""
+        if time.monotonic() - self._last_scan > self.rescan_interval:
+            return True
+        try:
+            dir_mtime = self.directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            dir_mtime = None
+        return dir_mtime is None or dir_mtime != self._dir_mtime
+
+    def _refresh(self):
+        """Re-scan the directory, parsing only new or changed files"""
+        self._last_scan = time.monotonic()
+        if not self.directory.exists():
+            self._entries.clear()
+            self._sorted = []
+            self._keys = []
+            self._dir_mtime = None
+            return
+
+        self._dir_mtime = self.directory.stat().st_mtime_ns
+
+        entries = {}
+        for file_path in self.directory.glob(self.pattern):
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+
+            key = str(file_path)
+            cached = self._entries.get(key)
+            if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                entries[key] = cached
+                continue
+
+            try:
+                entry = self.build_entry(file_path, load_output_json(file_path))
+            except Exception as e:
+                print(f"Error processing output file {file_path}: {e}")
+                continue
+
+            entry['created'] = stat.st_mtime
+            entry['size'] = stat.st_size
+            entries[key] = (stat.st_mtime_ns, stat.st_size, entry)
+
+        self._entries = entries
+        self._sorted = sorted((entry for _, _, entry in entries.values()), key=_sort_key)
+        self._keys = [_sort_key(entry) for entry in self._sorted]
+
+def _sort_key(entry: dict) -> tuple:
+    """Sort key for newest-first ordering with a stable tie-break"""
+    return (-entry['created'], entry['filename'])
+
+def encode_cursor(entry: dict) -> str:
+    """Encode the position of an entry as an opaque pagination cursor"""
+    raw = json.dumps([entry['created'], entry['filename']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+def decode_cursor(cursor: str) -> tuple:
+    """Decode a pagination cursor back into a sort key"""
+    try:
+        created, filename = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return (-created, filename)
@@ -0,0 +1,123 @@
+"""
+Output extraction for AI Learning App agent results
+Tolerant JSON extraction and repair shared by the crew, storage and catalogs
+"""
+import json
+import re
+from typing import Any, List
+
+# A fenced code block anywhere in the text, with an optional language tag
+_FENCE_PATTERN = re.compile(r'```[a-zA-Z]*\s*\n?(.*?)(?:```|$)', re.DOTALL)
+
+class OutputParseError(ValueError):
+    """Raised when agent output cannot be turned into JSON, even after repair"""
+
+def result_text(result) -> str:
+    """Get the raw text of a CrewOutput, TaskOutput or plain value"""
+    if hasattr(result, 'raw'):
+        return result.raw
+    if hasattr(result, 'result'):
+        return result.result
+    return str(result)
+
+def extract_json(content) -> Any:
+    """Parse agent output as JSON, repairing common formatting problems
+
+    Handles markdown code fences, prose before or after the JSON, trailing
+    commas and output that was cut off before its closing brackets. Already
+    parsed values (dicts and lists) are returned unchanged.
+    """
+    if isinstance(content, (dict, list)):
+        return content
+    if content is None:
+        raise OutputParseError("No output to parse")
+
+    text = str(content).strip()
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    candidates = _json_candidates(text)
+    if not candidates:
+        raise OutputParseError("No JSON object found in output")
+
+    first_error = None
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except ValueError as e:
+            first_error = first_error or e
+
+    for candidate in candidates:
+        try:
+            return json.loads(repair_json(candidate))
+        except ValueError:
+            pass
+
+    raise OutputParseError(f"Invalid JSON: {first_error}") from first_error
+
+def repair_json(text: str) -> str:
+    """Remove trailing commas and close any unterminated string, object or array"""
+    closers = []
+    repaired = []
+    in_string = False
+    escaped = False
+
+    for char in text:
+        if char in '}]' and not in_string:
+            _drop_trailing_comma(repaired)
+        repaired.append(char)
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            closers.append('}' if char == '{' else ']')
+        elif char in '}]' and closers:
+            closers.pop()
+
+    if in_string:
+        if escaped:
+            repaired.pop()
+        repaired.append('"')
+
+    result = ''.join(repaired).rstrip()
+    # A truncated document may end in the middle of a key/value pair
+    result = re.sub(r'(,|:)\s*$', '', result)
+    if closers and closers[-1] == '}':
+        result = re.sub(r'[{,]\s*"[^"]*"\s*$', lambda m: m.group(0)[0].replace(',', ''), result)
+    result = result.rstrip().rstrip(',')
+    return result + ''.join(reversed(closers))
+
+def _drop_trailing_comma(chars: List[str]):
+    """Remove a comma (and the whitespace after it) from the end of the output so far"""
+    index = len(chars)
+    while index and chars[index - 1].isspace():
+        index -= 1
+    if index and chars[index - 1] == ',':
+        del chars[index - 1:]
+
+def _json_candidates(text: str) -> List[str]:
+    """Find the pieces of agent output most likely to be the JSON document, best first"""
+    candidates = []
+    for match in _FENCE_PATTERN.finditer(text):
+        block = match.group(1).strip()
+        if block.startswith(('{', '[')):
+            candidates.append(block)
+
+    starts = [index for index in (text.find('{'), text.find('[')) if index != -1]
+    if starts:
+        start = min(starts)
+        # Everything from the first bracket keeps truncated documents whole,
+        # up to the last bracket drops prose after a complete one
+        candidates.append(text[start:])
+        end = max(text.rfind('}'), text.rfind(']'))
+        if end > start:
+            candidates.append(text[start:end + 1])
+    return candidates
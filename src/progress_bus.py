@@ -0,0 +1,183 @@
+"""
+Progress bus for AI Learning App
+Carries Socket.IO progress events between server processes, so a client
+connected to any worker receives updates for jobs running on another. The
+in-process bus serves a single server; the SQLite bus is a local stand-in for
+a message broker when several workers share a machine
+"""
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+from src.disk_cache import DiskCache
+
+class ProgressBus:
+    """Interface shared by all progress buses
+
+    Messages are JSON-serializable dicts. Every listener, in every process
+    sharing the bus, receives each message published after it started
+    listening, including the ones its own process published.
+    """
+
+    # Whether the bus reaches other processes
+    shared = False
+
+    def publish(self, message: dict):
+        raise NotImplementedError
+
+    def listen(self) -> Iterator[dict]:
+        """Yield messages as they are published; blocks while there are none"""
+        raise NotImplementedError
+
+    def record(self, progress_data: dict):
+        """Keep a job's latest progress for processes that don't run it"""
+
+    def latest(self, job_id: str) -> Optional[dict]:
+        """Get the latest progress recorded for a job"""
+        return None
+
+class MemoryProgressBus(ProgressBus):
+    """Delivers messages to listeners in this process only
+
+    A single server process already has every job's tracker, so nothing is
+    recorded.
+    """
+
+    def __init__(self):
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def publish(self, message: dict):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener.put(message)
+
+    def listen(self) -> Iterator[dict]:
+        listener = queue.Queue()
+        with self._lock:
+            self._listeners.append(listener)
+        try:
+            while True:
+                yield listener.get()
+        finally:
+            with self._lock:
+                self._listeners.remove(listener)
+
+class SQLiteProgressBus(ProgressBus):
+    """Shares messages between processes through a table in a SQLite database (WAL mode)
+
+    Listeners poll for rows newer than the last one they saw every
+    `poll_interval` seconds, and rows older than `retention` seconds are
+    pruned. Latest job progress is kept in a cache table of the same database.
+    """
+
+    shared = True
+
+    def __init__(self, db_path: Path, poll_interval: float = 0.05, retention: float = 60.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self.retention = retention
+
+        self._lock = threading.Lock()
+        self._pruned = 0.0
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # AUTOINCREMENT so ids keep increasing after old rows are pruned
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, body TEXT NOT NULL, created REAL NOT NULL)"
+            )
+
+        self.snapshots = DiskCache(self.db_path, ttl_seconds=24 * 3600, max_entries=1000, table="snapshots")
+
+    def publish(self, message: dict):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO messages (body, created) VALUES (?, ?)", (json.dumps(message), now))
+            if now - self._pruned > self.retention:
+                self._conn.execute("DELETE FROM messages WHERE created < ?", (now - self.retention,))
+                self._pruned = now
+
+    def listen(self) -> Iterator[dict]:
+        with self._lock:
+            last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM messages").fetchone()[0]
+
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, body FROM messages WHERE id > ? ORDER BY id", (last_id,)
+                ).fetchall()
+
+            for last_id, body in rows:
+                yield json.loads(body)
+
+            if not rows:
+                time.sleep(self.poll_interval)
+
+    def record(self, progress_data: dict):
+        if progress_data.get('job_id'):
+            self.snapshots.set(progress_data['job_id'], progress_data)
+
+    def latest(self, job_id: str) -> Optional[dict]:
+        return self.snapshots.get(job_id)
+
+def create_progress_bus(outputs_path: Path) -> ProgressBus:
+    """Create the progress bus selected by PROGRESS_BUS
+
+    `memory` (default) for a single server process, or `sqlite` to share
+    progress between server processes on one machine through
+    PROGRESS_BUS_DB (default outputs/progress_bus.db).
+    """
+    kind = os.getenv('PROGRESS_BUS', 'memory').lower()
+    if kind == 'memory':
+        return MemoryProgressBus()
+    if kind == 'sqlite':
+        return SQLiteProgressBus(Path(os.getenv('PROGRESS_BUS_DB', outputs_path / 'progress_bus.db')))
+    raise ValueError(f"Unknown progress bus: {kind}")
+
+def socketio_client_manager(bus: ProgressBus, asynchronous: bool = False):
+    """Socket.IO client manager that relays emits and room changes through the bus
+
+    This is the hook Flask-SocketIO's `message_queue` uses for Redis or
+    RabbitMQ: every emit is published, and each server process delivers it
+    to its own connected clients. Returns None (Socket.IO's in-memory
+    manager) for a bus that doesn't leave the process.
+    """
+    if not bus.shared:
+        return None
+
+    import socketio
+
+    if asynchronous:
+        class AsyncBusManager(socketio.AsyncPubSubManager):
+            name = 'progress-bus'
+
+            async def _publish(self, data):
+                await asyncio.to_thread(bus.publish, data)
+
+            async def _listen(self):
+                messages = bus.listen()
+                while True:
+                    yield await asyncio.to_thread(next, messages)
+
+        return AsyncBusManager()
+
+    class BusManager(socketio.PubSubManager):
+        name = 'progress-bus'
+
+        def _publish(self, data):
+            bus.publish(data)
+
+        def _listen(self):
+            return bus.listen()
+
+    return BusManager()
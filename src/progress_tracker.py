@@ -3,11 +3,15 @@ Progress tracking system for AI Learning App
 Handles real-time progress updates during course creation
 """
 import json
+import threading
 import time
-from typing import Dict, List, Callable
+from collections import OrderedDict
+from typing import Dict, List, Callable, Optional
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from src.metrics import STAGE_DURATION
+
 @dataclass
 class ProgressStage:
     """Represents a single stage in the course creation process"""
@@ -23,10 +27,12 @@ class ProgressStage:
 class ProgressTracker:
     """Tracks and broadcasts progress of course creation"""
     
-    def __init__(self):
+    def __init__(self, job_id: Optional[str] = None):
+        self.job_id = job_id
         self.stages: Dict[str, ProgressStage] = {}
         self.callbacks: List[Callable] = []
         self.current_stage = None
+        self._lock = threading.RLock()
         
         # Define the standard stages for course creation
         self._initialize_stages()
@@ -102,14 +108,15 @@ class ProgressTracker:
     
     def set_mode(self, mode: str):
         """Set the progress tracker mode ('course' or 'assessment')"""
-        if mode == "course":
-            self._set_course_creation_stages()
-        elif mode == "assessment":
-            self._set_assessment_building_stages()
-        else:
-            raise ValueError(f"Unknown mode: {mode}")
-        
-        self.current_stage = None
+        with self._lock:
+            if mode == "course":
+                self._set_course_creation_stages()
+            elif mode == "assessment":
+                self._set_assessment_building_stages()
+            else:
+                raise ValueError(f"Unknown mode: {mode}")
+            
+            self.current_stage = None
         self._broadcast_update()
     
     def add_callback(self, callback: Callable):
@@ -123,14 +130,10 @@ class ProgressTracker:
     
     def _broadcast_update(self):
         """Broadcast current progress to all callbacks"""
-        progress_data = {
-            "stages": [asdict(stage) for stage in self.stages.values()],
-            "current_stage": self.current_stage,
-            "overall_progress": self._calculate_overall_progress(),
-            "timestamp": datetime.now().isoformat()
-        }
+        # Snapshot under the lock, call out without holding it
+        progress_data = self.get_current_progress()
         
-        for callback in self.callbacks:
+        for callback in list(self.callbacks):
             try:
                 callback(progress_data)
             except Exception as e:
@@ -146,7 +149,9 @@ class ProgressTracker:
     
     def start_stage(self, stage_id: str, details: str = ""):
         """Start a specific stage"""
-        if stage_id in self.stages:
+        with self._lock:
+            if stage_id not in self.stages:
+                return
             stage = self.stages[stage_id]
             stage.status = "running"
             stage.start_time = datetime.now().isoformat()
@@ -155,22 +160,26 @@ class ProgressTracker:
             self.current_stage = stage_id
             
             print(f"Started: {stage.title}")
-            self._broadcast_update()
+        self._broadcast_update()
     
     def update_stage_progress(self, stage_id: str, progress_percent: int, details: str = ""):
         """Update progress for a specific stage"""
-        if stage_id in self.stages:
+        with self._lock:
+            if stage_id not in self.stages:
+                return
             stage = self.stages[stage_id]
             stage.progress_percent = min(100, max(0, progress_percent))
             if details:
                 stage.details = details
-            
-            self._broadcast_update()
+        self._broadcast_update()
     
     def complete_stage(self, stage_id: str, details: str = ""):
         """Mark a stage as completed"""
-        if stage_id in self.stages:
+        with self._lock:
+            if stage_id not in self.stages:
+                return
             stage = self.stages[stage_id]
+            self._observe_duration(stage, "completed")
             stage.status = "completed"
             stage.end_time = datetime.now().isoformat()
             stage.progress_percent = 100
@@ -178,39 +187,112 @@ class ProgressTracker:
                 stage.details = details
             
             print(f"Completed: {stage.title}")
-            self._broadcast_update()
+        self._broadcast_update()
     
     def error_stage(self, stage_id: str, error_message: str):
         """Mark a stage as having an error"""
-        if stage_id in self.stages:
+        with self._lock:
+            if stage_id not in self.stages:
+                return
             stage = self.stages[stage_id]
+            self._observe_duration(stage, "error")
             stage.status = "error"
             stage.end_time = datetime.now().isoformat()
             stage.details = f"Error: {error_message}"
             
             print(f"Error in: {stage.title} - {error_message}")
-            self._broadcast_update()
+        self._broadcast_update()
+    
+    def _observe_duration(self, stage: ProgressStage, status: str):
+        """Record how long a running stage took before it completed or failed"""
+        if stage.status != "running" or not stage.start_time:
+            return
+        elapsed = (datetime.now() - datetime.fromisoformat(stage.start_time)).total_seconds()
+        STAGE_DURATION.observe(elapsed, stage=stage.id, status=status)
+    
+    def complete_all(self, details: str = ""):
+        """Mark every stage as completed, e.g. when a result is served without running the crew"""
+        for stage_id in list(self.stages):
+            self.complete_stage(stage_id, details)
     
     def reset(self):
         """Reset all stages to pending"""
-        for stage in self.stages.values():
-            stage.status = "pending"
-            stage.start_time = None
-            stage.end_time = None
-            stage.progress_percent = 0
-            stage.details = ""
-        
-        self.current_stage = None
+        with self._lock:
+            for stage in self.stages.values():
+                stage.status = "pending"
+                stage.start_time = None
+                stage.end_time = None
+                stage.progress_percent = 0
+                stage.details = ""
+            
+            self.current_stage = None
         self._broadcast_update()
     
+    def apply(self, progress_data: dict):
+        """Replace the stages with a snapshot from another tracker, e.g. one in a worker process"""
+        with self._lock:
+            stages = {}
+            for stage_data in progress_data["stages"]:
+                stage = ProgressStage(**stage_data)
+                previous = self.stages.get(stage.id)
+                if previous is not None and stage.status in ("completed", "error"):
+                    self._observe_duration(previous, stage.status)
+                stages[stage.id] = stage
+            self.stages = stages
+            self.current_stage = progress_data.get("current_stage")
+        self._broadcast_update()
+
     def get_current_progress(self) -> dict:
         """Get current progress state"""
-        return {
-            "stages": [asdict(stage) for stage in self.stages.values()],
-            "current_stage": self.current_stage,
-            "overall_progress": self._calculate_overall_progress(),
-            "timestamp": datetime.now().isoformat()
-        }
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "stages": [asdict(stage) for stage in self.stages.values()],
+                "current_stage": self.current_stage,
+                "overall_progress": self._calculate_overall_progress(),
+                "timestamp": datetime.now().isoformat()
+            }
+
+class ProgressTrackerRegistry:
+    """Keeps one ProgressTracker per job so concurrent runs don't share stages"""
+    
+    def __init__(self, max_trackers: int = 100):
+        self.max_trackers = max_trackers
+        self.trackers: "OrderedDict[str, ProgressTracker]" = OrderedDict()
+        self.callbacks: List[Callable] = []
+        self._lock = threading.Lock()
+    
+    def add_callback(self, callback: Callable):
+        """Add a callback that is attached to every tracker created from now on"""
+        self.callbacks.append(callback)
+    
+    def create(self, job_id: str) -> ProgressTracker:
+        """Create (or replace) the tracker for a job"""
+        tracker = ProgressTracker(job_id=job_id)
+        for callback in self.callbacks:
+            tracker.add_callback(callback)
+        
+        with self._lock:
+            self.trackers[job_id] = tracker
+            self.trackers.move_to_end(job_id)
+            # Keep finished trackers around for late subscribers, but bound the registry
+            while len(self.trackers) > self.max_trackers:
+                self.trackers.popitem(last=False)
+        
+        return tracker
+    
+    def get(self, job_id: str) -> Optional[ProgressTracker]:
+        """Get the tracker for a job, if it is still registered"""
+        with self._lock:
+            return self.trackers.get(job_id)
+    
+    def remove(self, job_id: str):
+        """Forget the tracker for a job"""
+        with self._lock:
+            self.trackers.pop(job_id, None)
 
-# Global progress tracker instance
+# Global progress tracker instance, used when no job-specific tracker is given (e.g. CLI runs)
 progress_tracker = ProgressTracker()
+
+# Global registry of per-job trackers used by the web server
+progress_registry = ProgressTrackerRegistry()
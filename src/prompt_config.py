@@ -0,0 +1,222 @@
+"""
+Hot-reloadable prompt configuration for AI Learning App
+config/agents.yaml and config/tasks.yaml are validated and compiled into
+templates as a versioned snapshot. Edits are picked up without a restart:
+new runs use the new snapshot, while runs in progress keep the one they started with
+"""
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+from src.templates import AGENT_SETTINGS, EXPECTED_OUTPUT_PARAMETERS, TASK_PARAMETERS, TaskTemplate
+
+CONFIG_FILES = ('agents.yaml', 'tasks.yaml')
+
+AGENT_FIELDS = ('role', 'goal', 'backstory')
+
+class PromptConfigError(ValueError):
+    """Raised when the prompt configuration is missing settings or has bad placeholders"""
+
+class PromptConfig:
+    """An immutable, validated snapshot of the agent and task configuration"""
+
+    def __init__(self, agents: dict, tasks: dict, digest: str):
+        self.agents = agents
+        self.tasks_config = tasks
+        self.digest = digest
+        self.version = digest[:12]
+        self.loaded_at = datetime.now().isoformat()
+        self.tasks: Dict[str, TaskTemplate] = {}
+
+        errors = self._check_agents()
+        for name in TASK_PARAMETERS:
+            errors.extend(self._compile_task(name))
+        if errors:
+            raise PromptConfigError("Invalid prompt configuration:\n  " + "\n  ".join(errors))
+
+    def _check_agents(self) -> list:
+        errors = []
+        for name in AGENT_SETTINGS:
+            config = self.agents.get(name)
+            if not isinstance(config, dict):
+                errors.append(f"agents.yaml: missing agent '{name}'")
+                continue
+            for field in AGENT_FIELDS:
+                if not isinstance(config.get(field), str) or not config[field].strip():
+                    errors.append(f"agents.yaml: agent '{name}' needs a '{field}'")
+        return errors
+
+    def _compile_task(self, name: str) -> list:
+        """Compile one task's prompts, checking their placeholders against what the crew passes"""
+        config = self.tasks_config.get(name)
+        if not isinstance(config, dict):
+            return [f"tasks.yaml: missing task '{name}'"]
+        for field in ('description', 'expected_output'):
+            if not isinstance(config.get(field), str) or not config[field].strip():
+                return [f"tasks.yaml: task '{name}' needs a '{field}'"]
+
+        try:
+            template = TaskTemplate(config)
+        except ValueError as e:
+            return [f"tasks.yaml: task '{name}' has a malformed placeholder ({e})"]
+
+        errors = []
+        parameters = TASK_PARAMETERS[name]
+        missing = parameters - template.description.fields
+        unknown = template.description.fields - parameters
+        if missing:
+            errors.append(f"tasks.yaml: task '{name}' description is missing {_placeholders(missing)}")
+        if unknown:
+            errors.append(f"tasks.yaml: task '{name}' description uses unknown {_placeholders(unknown)}"
+                          + ("" if parameters else "; write literal braces as {{ and }}"))
+        unknown = template.expected_output.fields - EXPECTED_OUTPUT_PARAMETERS.get(name, set())
+        if unknown:
+            errors.append(f"tasks.yaml: task '{name}' expected_output uses unknown {_placeholders(unknown)}")
+
+        self.tasks[name] = template
+        return errors
+
+def _placeholders(fields) -> str:
+    return "placeholder(s) " + ", ".join("{" + field + "}" for field in sorted(fields))
+
+def load_prompt_config(config_path: Path) -> PromptConfig:
+    """Read, validate and compile the configuration files in a directory"""
+    digest = hashlib.sha256()
+    documents = []
+    for filename in CONFIG_FILES:
+        raw = (Path(config_path) / filename).read_bytes()
+        digest.update(raw)
+        try:
+            document = yaml.safe_load(raw)
+        except yaml.YAMLError as e:
+            raise PromptConfigError(f"{filename}: invalid YAML ({e})") from e
+        if not isinstance(document, dict):
+            raise PromptConfigError(f"{filename}: expected a mapping at the top level")
+        documents.append(document)
+    return PromptConfig(documents[0], documents[1], digest.hexdigest())
+
+# The configuration a run started with, so a reload doesn't change it mid-run
+_pinned_config: contextvars.ContextVar[Optional[PromptConfig]] = contextvars.ContextVar('pinned_config', default=None)
+
+class PromptConfigStore:
+    """The current prompt configuration, reloaded when its files change
+
+    Like the output catalog, the files are only re-checked on access, at most
+    every `check_interval` seconds, and only re-read when their mtime or size
+    changed. A new version replaces the old one in a single assignment; an
+    invalid edit is reported and the previous version stays active.
+    """
+
+    def __init__(self, config_path: Path, check_interval: float = 2.0):
+        self.config_path = Path(config_path)
+        self.check_interval = check_interval
+        self._config: Optional[PromptConfig] = None
+        self._stamp = None
+        self._last_check = 0.0
+        self._last_error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> tuple:
+        stamp = []
+        for filename in CONFIG_FILES:
+            try:
+                stat = (self.config_path / filename).stat()
+                stamp.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _refresh(self, force: bool = False):
+        self._last_check = time.monotonic()
+        stamp = self._file_stamp()
+        if self._config is not None and stamp == self._stamp and not force:
+            return
+
+        try:
+            config = load_prompt_config(self.config_path)
+        except (OSError, PromptConfigError) as e:
+            if self._config is None:
+                raise
+            # Keep serving the last good version until the files change again
+            self._stamp = stamp
+            self._last_error = str(e)
+            print(f"❌ Keeping prompt config {self._config.version}: {e}")
+            return
+
+        previous = self._config
+        self._stamp = stamp
+        self._last_error = None
+        if previous is None or previous.digest != config.digest:
+            self._config = config
+            if previous is not None:
+                print(f"🔄 Prompt config reloaded: {previous.version} -> {config.version}")
+
+    def current(self) -> PromptConfig:
+        """The latest valid configuration, for runs that are starting"""
+        with self._lock:
+            if self._config is None or time.monotonic() - self._last_check >= self.check_interval:
+                self._refresh()
+            return self._config
+
+    def reload(self) -> PromptConfig:
+        """Re-read the files now, regardless of the check interval"""
+        with self._lock:
+            self._refresh(force=True)
+            return self._config
+
+    def active(self) -> PromptConfig:
+        """The configuration pinned by the current run, or the latest one"""
+        return _pinned_config.get() or self.current()
+
+    @contextmanager
+    def pinned(self):
+        """Keep using the same configuration for the rest of a run
+
+        Nested runs share the outer pin. Worker threads see it when their
+        functions are wrapped with `in_current_context`.
+        """
+        if _pinned_config.get() is not None:
+            yield _pinned_config.get()
+            return
+        token = _pinned_config.set(self.current())
+        try:
+            yield _pinned_config.get()
+        finally:
+            _pinned_config.reset(token)
+
+    def status(self) -> dict:
+        config = self.current()
+        return {
+            'version': config.version,
+            'digest': config.digest,
+            'loaded_at': config.loaded_at,
+            'files': [str(self.config_path / filename) for filename in CONFIG_FILES],
+            'check_interval': self.check_interval,
+            'last_error': self._last_error
+        }
+
+_prompt_configs: Optional[PromptConfigStore] = None
+_prompt_configs_lock = threading.Lock()
+
+def get_prompt_configs() -> PromptConfigStore:
+    """Get the process-wide prompt configuration store
+
+    CONFIG_CHECK_INTERVAL sets how often, in seconds, config/ is checked for
+    changes (default 2).
+    """
+    global _prompt_configs
+    with _prompt_configs_lock:
+        if _prompt_configs is None:
+            _prompt_configs = PromptConfigStore(
+                Path(__file__).parent.parent / 'config',
+                check_interval=float(os.getenv('CONFIG_CHECK_INTERVAL', '2'))
+            )
+        return _prompt_configs
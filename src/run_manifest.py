@@ -0,0 +1,122 @@
+"""
+Run manifests for AI Learning App course generation
+Records the output of every completed stage so a failed run can resume where it stopped
+"""
+import threading
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from src.storage import OutputStorage
+
+class RunManifest:
+    """Checkpoint record for one course generation run
+
+    Stages are 'curriculum', 'lesson_N' (one per lesson), 'content', 'review'
+    and 'finalization'. Each completed stage records the name of the stored
+    output it produced.
+    """
+
+    def __init__(self, storage: OutputStorage, data: dict):
+        self.storage = storage
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, storage: OutputStorage, subject: str, num_lessons: int) -> "RunManifest":
+        """Start a manifest for a new run"""
+        now = datetime.now()
+        manifest = cls(storage, {
+            "run_id": f"{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
+            "subject": subject,
+            "num_lessons": num_lessons,
+            "status": "running",
+            "created": now.isoformat(),
+            "updated": now.isoformat(),
+            "error": None,
+            "stages": {}
+        })
+        manifest.save()
+        return manifest
+
+    @classmethod
+    def load(cls, storage: OutputStorage, run_id: str) -> "RunManifest":
+        """Load the manifest of an earlier run"""
+        return cls(storage, storage.load("manifest", f"run_{run_id}.json"))
+
+    @classmethod
+    def latest(cls, storage: OutputStorage) -> Optional["RunManifest"]:
+        """Load the manifest of the most recent run, if any"""
+        names = storage.names("manifest")
+        if not names:
+            return None
+        return cls(storage, storage.load("manifest", names[0]))
+
+    @property
+    def run_id(self) -> str:
+        return self.data["run_id"]
+
+    @property
+    def subject(self) -> str:
+        return self.data["subject"]
+
+    @property
+    def num_lessons(self) -> int:
+        return self.data["num_lessons"]
+
+    @property
+    def status(self) -> str:
+        return self.data["status"]
+
+    def output(self, stage: str) -> Optional[str]:
+        """Get the output name of a stage if it completed"""
+        with self._lock:
+            entry = self.data["stages"].get(stage)
+            if entry and entry["status"] == "completed":
+                return entry["output"]
+            return None
+
+    def complete(self, stage: str, output: str):
+        """Record that a stage completed and where its output is stored"""
+        with self._lock:
+            self.data["stages"][stage] = {
+                "status": "completed",
+                "output": output,
+                "finished": datetime.now().isoformat()
+            }
+            self._save_locked()
+
+    def fail(self, stage: Optional[str], error: str):
+        """Record that the run failed, optionally discarding a stage's unusable output"""
+        with self._lock:
+            if stage:
+                self.data["stages"][stage] = {
+                    "status": "error",
+                    "output": None,
+                    "finished": datetime.now().isoformat()
+                }
+            self.data["status"] = "error"
+            self.data["error"] = error
+            self._save_locked()
+
+    def finish(self):
+        """Record that the run completed"""
+        with self._lock:
+            self.data["status"] = "completed"
+            self.data["error"] = None
+            self._save_locked()
+
+    def restart(self):
+        """Mark a failed run as running again before resuming it"""
+        with self._lock:
+            self.data["status"] = "running"
+            self._save_locked()
+
+    def save(self):
+        """Write the manifest to storage"""
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        self.data["updated"] = datetime.now().isoformat()
+        self.storage.save("manifest", f"run_{self.run_id}.json", self.data)
@@ -0,0 +1,99 @@
+"""
+Startup profiling for AI Learning App
+`--startup-profile` on the web server or CLI runs its startup once under
+`python -X importtime`, times each startup phase and reports the slowest imports
+"""
+import importlib
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+# Matches "import time:       self [us] |  cumulative | imported package" lines
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+\d+\s+\|\s*(\S+)')
+
+def _phase(name: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"  {name:<36} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+def _web_phases():
+    """Import the server, serve the frontend, then build the crew for the first generation request"""
+    web_server = _phase("import src.web_server", lambda: importlib.import_module('src.web_server'))
+    client = web_server.app.test_client()
+    _phase("first GET / (index.html)", lambda: client.get('/'))
+    _phase("first GET /api/courses", lambda: client.get('/api/courses'))
+    _phase("build crew (first generation)", web_server.get_crew)
+
+def _cli_phases():
+    """Import the CLI, then build the crew for a command"""
+    main = _phase("import main", lambda: importlib.import_module('main'))
+    _phase("build crew (first command)", main.create_crew)
+
+PHASES = {'web': _web_phases, 'cli': _cli_phases}
+
+def scratch_env(directory: Path) -> dict:
+    """Environment that points every output, cache and job path at a scratch directory
+
+    A profiled startup then never loads (and marks as interrupted) the real
+    job records, and has no queued jobs or pre-generations to start.
+    """
+    outputs = directory / 'outputs'
+    return dict(
+        os.environ,
+        OUTPUTS_DIR=str(outputs),
+        STORAGE_DB=str(outputs / 'learning_app.db'),
+        PROGRESS_BUS_DB=str(outputs / 'progress_bus.db'),
+        COURSE_CACHE_PATH=str(outputs / 'course_cache.db'),
+        SEARCH_CACHE_PATH=str(outputs / 'search_cache.db'),
+        LLM_CACHE_PATH=str(outputs / 'llm_cache.db'),
+        TRACE_DIR=str(outputs / 'traces'),
+        ASSESSMENT_PREFETCH_WORKERS='0'
+    )
+
+def import_report(lines, top: int = 15):
+    """Sum the time spent importing each top-level package from `-X importtime` output
+
+    Uses each module's own (self) time, so a package's total is the time spent
+    in its own modules rather than in the dependencies it pulled in.
+    """
+    totals = defaultdict(int)
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if match:
+            totals[match.group(2).split('.')[0]] += int(match.group(1))
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+def profile_startup(target: str) -> int:
+    """Run a startup target in a fresh interpreter and print its phase and import times
+
+    The target runs against an empty scratch outputs directory (see scratch_env).
+    """
+    print(f"⏱️  Startup profile ({target})")
+    print("Phases:")
+    with tempfile.TemporaryDirectory(prefix='startup-profile-') as scratch:
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-m', 'src.startup', target],
+            cwd=Path(__file__).parent.parent, env=scratch_env(Path(scratch)), stderr=subprocess.PIPE, text=True
+        )
+        total = time.perf_counter() - start
+
+    lines = process.stderr.splitlines()
+    print(f"  {'total, including interpreter start':<36} {total * 1000:>9.1f} ms")
+    print("\nSlowest packages to import (own time):")
+    for package, microseconds in import_report(lines):
+        print(f"  {package:<36} {microseconds / 1000:>9.1f} ms")
+
+    errors = [line for line in lines if not line.startswith('import time:')]
+    if process.returncode != 0:
+        print("\n".join(errors))
+    return process.returncode
+
+if __name__ == '__main__':
+    PHASES[sys.argv[1]]()
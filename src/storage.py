@@ -0,0 +1,298 @@
+"""
+Storage backends for AI Learning App outputs
+Courses, assessments and intermediate task outputs are stored either as loose
+files under outputs/ or in a single SQLite database
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from src.output_catalog import (OutputCatalog, course_entry, assessment_entry, output_entry, load_output_json,
+                                encode_cursor, decode_cursor)
+from src.output_parser import extract_json
+
+# Output kinds and how their listing entries are built
+ENTRY_BUILDERS = {
+    'course': course_entry,
+    'assessment': assessment_entry,
+}
+
+class OutputStorage:
+    """Interface shared by all storage backends
+
+    Outputs are addressed by kind ('course', 'assessment', 'course_result',
+    'curriculum', 'lesson', 'lessons', 'raw', 'assessment_raw', 'manifest')
+    and by name, the filename the output has always had (e.g.
+    `final_course_20250101_120000.json`), so API clients keep using filenames
+    as identifiers whatever the backend.
+    """
+
+    def save(self, kind: str, name: str, content: Union[str, dict, list]) -> str:
+        """Store an output and return its name"""
+        raise NotImplementedError
+
+    def load(self, kind: str, name: str):
+        """Load and parse a stored output; raises FileNotFoundError if missing"""
+        raise NotImplementedError
+
+    def exists(self, kind: str, name: str) -> bool:
+        """Check whether an output exists"""
+        raise NotImplementedError
+
+    def delete(self, kind: str, name: str) -> bool:
+        """Delete an output; returns whether it existed"""
+        raise NotImplementedError
+
+    def names(self, kind: str) -> List[str]:
+        """Get the names of all outputs of a kind, newest first"""
+        raise NotImplementedError
+
+    def page(self, kind: str, cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[dict], Optional[str]]:
+        """Get one page of listing entries for a kind, newest first"""
+        raise NotImplementedError
+
+    def list_outputs(self) -> List[dict]:
+        """Get filename, creation time and a short preview of every top-level JSON output"""
+        raise NotImplementedError
+
+def kind_for_name(name: str) -> str:
+    """Work out the output kind from a legacy output filename"""
+    if name.endswith('.txt'):
+        return 'assessment_raw' if name.startswith('assessment_') else 'raw'
+    for prefix, kind in (('final_course_', 'course'), ('assessment_', 'assessment'),
+                         ('curriculum_', 'curriculum'), ('lessons_', 'lessons'),
+                         ('lesson_', 'lesson'), ('course_', 'course_result'), ('run_', 'manifest')):
+        if name.startswith(prefix):
+            return kind
+    return 'raw'
+
+def _serialize(content: Union[str, dict, list]) -> str:
+    """Convert content to the text that is stored"""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, indent=2)
+
+class FileStorage(OutputStorage):
+    """Stores outputs as files under outputs/
+
+    Assessments live under outputs/assessments/ and run manifests under outputs/runs/.
+    """
+
+    def __init__(self, outputs_path: Path):
+        self.outputs_path = Path(outputs_path)
+        self.outputs_path.mkdir(exist_ok=True)
+        self.catalogs = {
+            'course': OutputCatalog(self.outputs_path, 'final_course_*.json', course_entry),
+            'assessment': OutputCatalog(self.outputs_path / 'assessments', 'assessment_*.json', assessment_entry),
+        }
+        # Every top-level JSON output, for list_outputs
+        self.outputs_catalog = OutputCatalog(self.outputs_path, '*.json', output_entry)
+
+    def _invalidate(self, kind: str, name: str):
+        """Make the listings that may include an output see its change"""
+        if kind in self.catalogs:
+            self.catalogs[kind].invalidate()
+        if self._path(kind, name).parent == self.outputs_path:
+            self.outputs_catalog.invalidate()
+
+    def _path(self, kind: str, name: str) -> Path:
+        """Get the file path for an output"""
+        if kind.startswith('assessment'):
+            return self.outputs_path / 'assessments' / name
+        if kind == 'manifest':
+            return self.outputs_path / 'runs' / name
+        return self.outputs_path / name
+
+    def save(self, kind, name, content):
+        file_path = self._path(kind, name)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, 'w') as f:
+            f.write(_serialize(content))
+
+        self._invalidate(kind, name)
+        return name
+
+    def load(self, kind, name):
+        return load_output_json(self._path(kind, name))
+
+    def exists(self, kind, name):
+        file_path = self._path(kind, name)
+        # Names come from clients; never resolve outside the outputs directory
+        return file_path.resolve().is_relative_to(self.outputs_path.resolve()) and file_path.is_file()
+
+    def delete(self, kind, name):
+        if not self.exists(kind, name):
+            return False
+        self._path(kind, name).unlink(missing_ok=True)
+        self._invalidate(kind, name)
+        return True
+
+    def names(self, kind):
+        directory = self._path(kind, '')
+        files = [p for p in directory.glob('*') if p.is_file() and kind_for_name(p.name) == kind]
+        files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+        return [p.name for p in files]
+
+    def page(self, kind, cursor=None, limit=None):
+        return self.catalogs[kind].page(cursor, limit)
+
+    def list_outputs(self):
+        # Only new or changed files are parsed; the catalog keeps everything else's preview
+        return [{
+            'filename': entry['filename'],
+            'created': entry['created'],
+            'preview': entry['preview']
+        } for entry in self.outputs_catalog.list()]
+
+class SQLiteStorage(OutputStorage):
+    """Stores outputs in a SQLite database (WAL mode) with indexed listing queries"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outputs (
+            name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            subject TEXT,
+            created REAL NOT NULL,
+            size INTEGER NOT NULL,
+            summary TEXT,
+            content TEXT NOT NULL,
+            PRIMARY KEY (kind, name)
+        );
+        CREATE INDEX IF NOT EXISTS idx_outputs_kind_created ON outputs (kind, created DESC, name);
+        CREATE INDEX IF NOT EXISTS idx_outputs_subject ON outputs (subject);
+        CREATE INDEX IF NOT EXISTS idx_outputs_created ON outputs (created);
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, kind, name, content, created: Optional[float] = None):
+        text = _serialize(content)
+
+        # Listing metadata is computed once at write time
+        subject, summary = None, None
+        if kind in ENTRY_BUILDERS:
+            try:
+                entry = ENTRY_BUILDERS[kind](Path(name), extract_json(text))
+                subject = entry.pop('subject')
+                entry.pop('id')
+                entry.pop('filename')
+                summary = json.dumps(entry)
+            except Exception as e:
+                print(f"Stored {name} without listing metadata: {e}")
+
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO outputs (name, kind, subject, created, size, summary, content) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, kind, subject, created if created is not None else time.time(),
+                 len(text.encode()), summary, text)
+            )
+        return name
+
+    def load(self, kind, name):
+        row = self._connection().execute(
+            "SELECT content FROM outputs WHERE kind = ? AND name = ?", (kind, name)
+        ).fetchone()
+        if row is None:
+            raise FileNotFoundError(f"No {kind} output named {name}")
+        return extract_json(row['content'])
+
+    def exists(self, kind, name):
+        row = self._connection().execute(
+            "SELECT 1 FROM outputs WHERE kind = ? AND name = ?", (kind, name)
+        ).fetchone()
+        return row is not None
+
+    def delete(self, kind, name):
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM outputs WHERE kind = ? AND name = ?", (kind, name))
+        return cursor.rowcount > 0
+
+    def names(self, kind):
+        rows = self._connection().execute(
+            "SELECT name FROM outputs WHERE kind = ? ORDER BY created DESC, name", (kind,)
+        )
+        return [row['name'] for row in rows]
+
+    def page(self, kind, cursor=None, limit=None):
+        query = "SELECT name, subject, created, size, summary FROM outputs WHERE kind = ? AND summary IS NOT NULL"
+        params = [kind]
+        if cursor:
+            neg_created, name = decode_cursor(cursor)
+            query += " AND (created < ? OR (created = ? AND name > ?))"
+            params += [-neg_created, -neg_created, name]
+        query += " ORDER BY created DESC, name"
+        if limit is not None:
+            # Fetch one extra row to know whether there is a next page
+            query += " LIMIT ?"
+            params.append(limit + 1)
+
+        entries = []
+        for row in self._connection().execute(query, params):
+            entry = {
+                'id': row['name'].replace('.json', ''),
+                'filename': row['name'],
+                'subject': row['subject'],
+            }
+            entry.update(json.loads(row['summary']))
+            entry['created'] = row['created']
+            entry['size'] = row['size']
+            entries.append(entry)
+
+        next_cursor = None
+        if limit is not None and len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(entries[-1])
+        return entries, next_cursor
+
+    def list_outputs(self):
+        rows = self._connection().execute(
+            "SELECT name, created, substr(content, 1, 200) AS preview, size FROM outputs "
+            "WHERE kind NOT LIKE 'assessment%' AND kind != 'manifest' AND name LIKE '%.json' ORDER BY created DESC"
+        )
+        return [{
+            'filename': row['name'],
+            'created': row['created'],
+            'preview': row['preview'] + '...' if row['size'] > 200 else row['preview']
+        } for row in rows]
+
+def default_outputs_path() -> Path:
+    """Directory for generated outputs: OUTPUTS_DIR, or outputs/ in the project root"""
+    return Path(os.getenv('OUTPUTS_DIR', str(Path(__file__).parent.parent / 'outputs')))
+
+def create_storage(outputs_path: Path) -> OutputStorage:
+    """Create the storage backend selected by the STORAGE_BACKEND environment variable
+
+    STORAGE_BACKEND=files (default) keeps the loose files under outputs/;
+    STORAGE_BACKEND=sqlite stores everything in STORAGE_DB
+    (default outputs/learning_app.db).
+    """
+    backend = os.getenv('STORAGE_BACKEND', 'files').lower()
+    if backend == 'files':
+        return FileStorage(outputs_path)
+    if backend == 'sqlite':
+        return SQLiteStorage(os.getenv('STORAGE_DB', str(Path(outputs_path) / 'learning_app.db')))
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,103 @@
+"""
+Agent and prompt templates for AI Learning App
+Agent settings and the YAML prompt templates are prepared once per
+configuration (model, tools and YAML hash); each run only binds its parameters
+"""
+import string
+from typing import Dict, List, Tuple
+
+# Agents defined in agents.yaml, with whether they search and their iteration limit
+AGENT_SETTINGS = {
+    'curriculum_builder': {'tools': False, 'max_iter': 3},
+    'lesson_builder': {'tools': True, 'max_iter': 5},
+    'content_reviewer': {'tools': False, 'max_iter': 3},
+    'assessment_builder': {'tools': False, 'max_iter': 3},
+}
+
+# Parameters each task's description is rendered with; descriptions without
+# parameters are sent as written
+TASK_PARAMETERS = {
+    'build_curriculum': {'subject', 'num_lessons'},
+    'create_lesson_content': set(),
+    'create_single_lesson_content': {'subject', 'lesson_number', 'lesson_outline'},
+    'structure_final_course': set(),
+    'build_assessment': set(),
+    'build_lesson_questions': {'subject', 'lesson_number', 'question_count', 'lesson_digest'},
+}
+
+# Parameters an expected output may use
+EXPECTED_OUTPUT_PARAMETERS = {
+    'build_lesson_questions': {'question_count'},
+}
+
+class PromptTemplate:
+    """A prompt from tasks.yaml with its `{placeholders}` parsed once"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._formatter = string.Formatter()
+        # (literal text, field name, format spec, conversion) chunks, as str.format sees them
+        self._chunks: List[Tuple[str, str, str, str]] = list(self._formatter.parse(text))
+        self.fields = frozenset(field for _, field, _, _ in self._chunks if field is not None)
+
+    def render(self, **params) -> str:
+        """Fill in the placeholders, like str.format"""
+        missing = self.fields - params.keys()
+        if missing:
+            raise KeyError(f"Missing prompt parameters: {', '.join(sorted(missing))}")
+
+        parts = []
+        for literal, field, spec, conversion in self._chunks:
+            parts.append(literal)
+            if field is not None:
+                value = self._formatter.convert_field(params[field], conversion)
+                parts.append(format(value, spec or ''))
+        return ''.join(parts)
+
+class TaskTemplate:
+    """The description and expected output of one task in tasks.yaml"""
+
+    def __init__(self, config: dict):
+        self.description = PromptTemplate(config['description'])
+        self.expected_output = PromptTemplate(config['expected_output'])
+
+class AgentTemplate:
+    """Validated settings for one agent in agents.yaml
+
+    CrewAI agents keep per-execution state (their executor and token counts),
+    so every run builds its own Agent from these settings.
+    """
+
+    def __init__(self, config: dict, llm, tools: list, max_iter: int):
+        self.settings = {
+            'role': config['role'],
+            'goal': config['goal'],
+            'backstory': config['backstory'],
+            'llm': llm,
+            'verbose': True,
+            'allow_delegation': False,
+            'max_iter': max_iter
+        }
+        self.tools = list(tools)
+
+    def build(self):
+        from crewai import Agent
+        return Agent(tools=list(self.tools), **self.settings)
+
+class CrewTemplates:
+    """Agent and task templates for one configuration"""
+
+    def __init__(self, key: tuple, agents_config: dict, tasks: Dict[str, TaskTemplate], llm, tools: list):
+        self.key = key
+        self.agents: Dict[str, AgentTemplate] = {
+            name: AgentTemplate(agents_config[name], llm, tools if settings['tools'] else [], settings['max_iter'])
+            for name, settings in AGENT_SETTINGS.items()
+        }
+        self.tasks = tasks
+
+    def agent(self, name: str):
+        """Build a fresh agent for a run"""
+        return self.agents[name].build()
+
+    def task(self, name: str) -> TaskTemplate:
+        return self.tasks[name]
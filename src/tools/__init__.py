@@ -1,8 +1,15 @@
 """
 Tools initialization for the AI Learning App
 """
-from crewai_tools import SerperDevTool
+
+# The tools import CrewAI, so they are only loaded when a crew asks for them
 
 def get_search_tool():
     """Get the Serper search tool."""
-    return SerperDevTool()
+    from src.tools.serper_tool import SerperSearchTool
+    return SerperSearchTool()
+
+def get_batch_search_tool():
+    """Get the Serper tool that searches several queries concurrently."""
+    from src.tools.serper_tool import SerperBatchSearchTool
+    return SerperBatchSearchTool()
@@ -0,0 +1,45 @@
+"""
+Persistent search result cache for the AI Learning App search tools
+Results are stored in a DiskCache keyed on the normalized query and params
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Any, Dict
+
+from src.disk_cache import DiskCache
+from src.storage import default_outputs_path
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different phrasings share a cache entry"""
+    query = query.lower().strip()
+    query = re.sub(r'\s+', ' ', query)
+    return query.strip(' ?.!,;:"\'')
+
+def cache_key(query: str, params: Dict[str, Any]) -> str:
+    """Build the cache key for a normalized query and its request parameters"""
+    raw = json.dumps({'q': normalize_query(query), 'params': params}, sort_keys=True)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> DiskCache:
+    """Get the process-wide search cache, configured from the environment
+
+    SEARCH_CACHE_PATH (default search_cache.db in OUTPUTS_DIR), SEARCH_CACHE_TTL in
+    seconds (default 7 days) and SEARCH_CACHE_MAX_ENTRIES (default 5000).
+    """
+    global _search_cache
+    with _search_cache_lock:
+        if _search_cache is None:
+            default_path = default_outputs_path() / 'search_cache.db'
+            _search_cache = DiskCache(
+                os.getenv('SEARCH_CACHE_PATH', str(default_path)),
+                ttl_seconds=float(os.getenv('SEARCH_CACHE_TTL', str(7 * 24 * 3600))),
+                max_entries=int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', '5000')),
+                table='search_cache'
+            )
+        return _search_cache
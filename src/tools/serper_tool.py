@@ -2,11 +2,89 @@
 Serper search tool for CrewAI agents
 """
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from crewai_tools import BaseTool
-from typing import Type
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from crewai.tools import BaseTool
+from typing import List, Tuple, Type
 from pydantic import BaseModel, Field
 
+from src.metrics import TOOL_DURATION
+from src.tools.search_cache import cache_key, get_search_cache, normalize_query
+
+SERPER_URL = "https://google.serper.dev/search"
+
+# Connect and read timeouts for Serper requests, in seconds
+SERPER_TIMEOUT = (5, float(os.getenv("SERPER_TIMEOUT", "20")))
+
+# Maximum number of concurrent requests for one batch search
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "4"))
+
+# Maximum number of queries accepted in one batch search
+MAX_BATCH_QUERIES = 10
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Get the shared keep-alive HTTP session used for Serper requests"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=2,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["POST"]
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+        return _session
+
+def search_results(query: str, num: int = 5) -> List[dict]:
+    """Get the top organic results for a query, served from the cache when possible"""
+    params = {'num': num}
+    key = cache_key(query, params)
+    cache = get_search_cache()
+
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    api_key = os.getenv("SERPER_API_KEY")
+    if not api_key:
+        raise RuntimeError("SERPER_API_KEY not found in environment variables")
+
+    payload = {
+        'q': query,
+        'num': num
+    }
+
+    headers = {
+        'X-API-KEY': api_key,
+        'Content-Type': 'application/json'
+    }
+
+    response = get_session().post(SERPER_URL, json=payload, headers=headers, timeout=SERPER_TIMEOUT)
+    response.raise_for_status()
+
+    results = response.json().get('organic', [])[:num]
+    cache.set(key, results)
+    return results
+
+def format_results(results: List[dict]) -> str:
+    """Format search results as text for the agent"""
+    return "\n".join(
+        f"Title: {result.get('title', 'N/A')}\n"
+        f"Link: {result.get('link', 'N/A')}\n"
+        f"Snippet: {result.get('snippet', 'N/A')}\n"
+        for result in results
+    )
+
 
 class SerperSearchInput(BaseModel):
     """Input schema for Serper search."""
@@ -17,48 +95,94 @@ class SerperSearchTool(BaseTool):
     name: str = "Search the web"
     description: str = "A tool that can be used to search the web for information on any topic"
     args_schema: Type[BaseModel] = SerperSearchInput
-    
+
     def _run(self, query: str) -> str:
         """Execute the search using Serper API."""
-        api_key = os.getenv("SERPER_API_KEY")
-        if not api_key:
-            return "Error: SERPER_API_KEY not found in environment variables"
-        
-        url = "https://google.serper.dev/search"
-        
-        payload = {
-            'q': query,
-            'num': 5
-        }
-        
-        headers = {
-            'X-API-KEY': api_key,
-            'Content-Type': 'application/json'
-        }
-        
+        start = time.perf_counter()
+        status = "error"
         try:
-            response = requests.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            
-            results = response.json()
-            
-            # Format the results
-            formatted_results = []
-            
-            if 'organic' in results:
-                for result in results['organic'][:5]:  # Top 5 results
-                    formatted_results.append(
-                        f"Title: {result.get('title', 'N/A')}\n"
-                        f"Link: {result.get('link', 'N/A')}\n"
-                        f"Snippet: {result.get('snippet', 'N/A')}\n"
-                    )
-            
-            if not formatted_results:
+            results = search_results(query)
+            status = "success"
+
+            if not results:
                 return f"No search results found for query: {query}"
-            
-            return "\n".join(formatted_results)
-            
+
+            return format_results(results)
+
+        except RuntimeError as e:
+            return f"Error: {str(e)}"
         except requests.exceptions.RequestException as e:
             return f"Error searching: {str(e)}"
         except Exception as e:
             return f"Unexpected error: {str(e)}"
+        finally:
+            TOOL_DURATION.observe(time.perf_counter() - start, tool="serper_search", status=status)
+
+
+class SerperBatchSearchInput(BaseModel):
+    """Input schema for batch Serper search."""
+    queries: List[str] = Field(..., description="List of search queries to research at once")
+
+
+class SerperBatchSearchTool(BaseTool):
+    name: str = "Search the web for several queries"
+    description: str = (
+        "A tool that searches the web for a list of queries at once and returns the combined, "
+        "deduplicated results. Use it to research all key topics of a lesson in a single call."
+    )
+    args_schema: Type[BaseModel] = SerperBatchSearchInput
+
+    def _run(self, queries: List[str]) -> str:
+        """Execute the searches concurrently and merge the results."""
+        # Identical queries (after normalization) are only searched once
+        unique_queries = {}
+        for query in queries:
+            if query and query.strip():
+                unique_queries.setdefault(normalize_query(query), query.strip())
+        unique_queries = list(unique_queries.values())[:MAX_BATCH_QUERIES]
+
+        if not unique_queries:
+            return "Error: no search queries provided"
+
+        start = time.perf_counter()
+        status = "error"
+        try:
+            output, failed = self._search_all(unique_queries)
+            # The batch succeeded if any of its queries did
+            if failed < len(unique_queries):
+                status = "success"
+            return output
+        finally:
+            TOOL_DURATION.observe(time.perf_counter() - start, tool="serper_batch_search", status=status)
+
+    def _search_all(self, unique_queries: List[str]) -> Tuple[str, int]:
+        """Run the queries concurrently and merge their results; also returns how many queries failed."""
+        def run_query(query):
+            try:
+                return search_results(query), None
+            except Exception as e:
+                return [], str(e)
+
+        workers = max(1, min(SEARCH_CONCURRENCY, len(unique_queries)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(run_query, unique_queries))
+
+        # Merge results, keeping each link only under the first query that found it
+        seen_links = set()
+        sections = []
+        failed = 0
+        for query, (results, error) in zip(unique_queries, outcomes):
+            if error:
+                failed += 1
+                sections.append(f"Results for: {query}\nError searching: {error}\n")
+                continue
+
+            new_results = [r for r in results if r.get('link') not in seen_links]
+            seen_links.update(r.get('link') for r in new_results)
+
+            if new_results:
+                sections.append(f"Results for: {query}\n{format_results(new_results)}")
+            else:
+                sections.append(f"Results for: {query}\nNo new search results found\n")
+
+        return "\n".join(sections), failed
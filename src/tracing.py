@@ -0,0 +1,273 @@
+"""
+Execution tracing for AI Learning App runs
+Records nested spans (run → stage → task → agent iteration → LLM and tool
+calls) and appends them to one JSONL file per run under outputs/traces/
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.metrics import llm_call_key, llm_token_usage
+from src.storage import default_outputs_path
+
+TRACE_DIR = Path(os.getenv('TRACE_DIR', str(default_outputs_path() / 'traces')))
+
+# Set TRACING=0 to turn tracing off
+TRACING_ENABLED = os.getenv('TRACING', '1').lower() not in ('0', 'false', 'no')
+
+class Trace:
+    """The JSONL file that the spans of one run are appended to"""
+
+    def __init__(self, trace_id: str, path: Path):
+        self.trace_id = trace_id
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+class Span:
+    """A timed operation within a trace"""
+
+    def __init__(self, trace: Trace, name: str, kind: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end = None
+        self.status = 'ok'
+        self.attributes = dict(attributes)
+        # LLM and tool calls made while this span was current, written when it ends
+        self.calls: List[dict] = []
+        self._lock = threading.Lock()
+
+    def add_call(self, call: dict):
+        with self._lock:
+            self.calls.append(call)
+
+    def finish(self, status: str = 'ok'):
+        self.end = time.time()
+        self.status = status
+        self.trace.write(_record(self.trace.trace_id, self.span_id, self.parent_id, self.name, self.kind,
+                                 self.start, self.end, self.status, self.attributes))
+        _write_calls(self)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+def _record(trace_id, span_id, parent_id, name, kind, start, end, status, attributes) -> dict:
+    return {
+        'trace_id': trace_id,
+        'span_id': span_id,
+        'parent_id': parent_id,
+        'name': name,
+        'kind': kind,
+        'start': start,
+        'end': end,
+        'duration_ms': round((end - start) * 1000, 3),
+        'status': status,
+        'attributes': attributes
+    }
+
+def _write_calls(span: Span):
+    """Write a task's LLM and tool calls, grouped into agent iterations
+
+    Each LLM call starts an iteration of the agent loop; the iteration lasts
+    until the next LLM call (or the end of the task) and contains the tool
+    calls made in between.
+    """
+    with span._lock:
+        calls = sorted(span.calls, key=lambda call: call['start'])
+        span.calls = []
+    if not calls:
+        return
+
+    llm_starts = [call['start'] for call in calls if call['kind'] == 'llm']
+    iterations = []
+    for number, start in enumerate(llm_starts, start=1):
+        end = llm_starts[number] if number < len(llm_starts) else max(span.end, start)
+        iteration_id = f"{span.span_id}.{number}"
+        iterations.append((start, iteration_id))
+        span.trace.write(_record(span.trace.trace_id, iteration_id, span.span_id, f"iteration {number}",
+                                 'iteration', start, end, 'ok', {'iteration': number}))
+
+    for call in calls:
+        parent_id = span.span_id
+        for start, iteration_id in iterations:
+            if call['start'] >= start:
+                parent_id = iteration_id
+        span.trace.write(_record(span.trace.trace_id, uuid.uuid4().hex[:16], parent_id, call['name'],
+                                 call['kind'], call['start'], call['end'], call['status'], call['attributes']))
+
+@contextmanager
+def trace_run(trace_id: str, name: str, **attributes):
+    """Trace a whole run into its own JSONL file
+
+    Inside an existing trace this is just a nested span.
+    """
+    if not TRACING_ENABLED or _current_span.get() is not None:
+        with span(name, kind='run', **attributes) as current:
+            yield current
+        return
+
+    root = Span(Trace(trace_id, TRACE_DIR / f"{trace_id}.jsonl"), name, 'run', None, attributes)
+    token = _current_span.set(root)
+    status = 'error'
+    try:
+        yield root
+        status = 'ok'
+    finally:
+        _current_span.reset(token)
+        root.finish(status)
+
+@contextmanager
+def span(name: str, kind: str = 'stage', **attributes):
+    """Trace a nested operation; does nothing outside a traced run"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    current = Span(parent.trace, name, kind, parent.span_id, attributes)
+    token = _current_span.set(current)
+    status = 'error'
+    try:
+        yield current
+        status = 'ok'
+    finally:
+        _current_span.reset(token)
+        current.finish(status)
+
+def set_attributes(**attributes):
+    """Add attributes to the current span"""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+def in_current_context(fn: Callable) -> Callable:
+    """Wrap a function so it runs in the caller's trace context on a worker thread"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+_llm_calls: Dict[tuple, dict] = {}
+_llm_calls_lock = threading.Lock()
+_trace_hooks_installed = False
+
+def _size(value) -> int:
+    """Size in bytes of a prompt, response or tool payload"""
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        value = json.dumps(value, default=str)
+    return len(value.encode())
+
+def install_trace_hooks():
+    """Attach LLM and tool calls reported on CrewAI's event bus to the current span"""
+    global _trace_hooks_installed
+    if _trace_hooks_installed or not TRACING_ENABLED:
+        return
+    _trace_hooks_installed = True
+
+    from crewai.events import crewai_event_bus
+    from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+    from crewai.events.types.tool_usage_events import ToolUsageErrorEvent, ToolUsageFinishedEvent
+
+    # Handlers run on the thread that emitted the event, so the current span
+    # is the task that made the call
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source, event):
+        if _current_span.get() is None:
+            return
+        with _llm_calls_lock:
+            _llm_calls[llm_call_key(source)] = {
+                'start': event.timestamp.timestamp(),
+                'model': event.model,
+                'prompt_bytes': _size(event.messages)
+            }
+
+    def finish_llm_call(source, event, status, attributes):
+        current = _current_span.get()
+        with _llm_calls_lock:
+            started = _llm_calls.pop(llm_call_key(source), None)
+        if current is None or started is None:
+            return
+        model = started['model'] or 'unknown'
+        current.add_call({
+            'kind': 'llm',
+            'name': f"llm {model}",
+            'start': started['start'],
+            'end': event.timestamp.timestamp(),
+            'status': status,
+            'attributes': dict(attributes, model=model, agent=(event.agent_role or '').strip(),
+                               prompt_bytes=started['prompt_bytes'])
+        })
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source, event):
+        usage = llm_token_usage(event)
+        finish_llm_call(source, event, 'ok', {
+            'response_bytes': _size(event.response),
+            'prompt_tokens': usage['prompt_tokens'],
+            'completion_tokens': usage['completion_tokens'],
+            'total_tokens': usage['prompt_tokens'] + usage['completion_tokens']
+        })
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source, event):
+        finish_llm_call(source, event, 'error', {'error': event.error})
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def on_tool_finished(source, event):
+        current = _current_span.get()
+        if current is None:
+            return
+        current.add_call({
+            'kind': 'tool',
+            'name': f"tool {event.tool_name}",
+            'start': event.started_at.timestamp(),
+            'end': event.finished_at.timestamp(),
+            'status': 'error' if event.failure else 'ok',
+            'attributes': {
+                'tool': event.tool_name,
+                'input_bytes': _size(event.tool_args),
+                'output_bytes': _size(event.output),
+                'from_cache': event.from_cache
+            }
+        })
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def on_tool_error(source, event):
+        current = _current_span.get()
+        if current is None:
+            return
+        timestamp = event.timestamp.timestamp()
+        current.add_call({
+            'kind': 'tool',
+            'name': f"tool {event.tool_name}",
+            'start': timestamp,
+            'end': timestamp,
+            'status': 'error',
+            'attributes': {'tool': event.tool_name, 'error': str(event.error)}
+        })
+
+def flush_trace_hooks(timeout: float = 5.0):
+    """Wait for pending event bus handlers so a task's calls are recorded before it ends"""
+    if not _trace_hooks_installed:
+        return
+    from crewai.events import crewai_event_bus
+    # Handlers of the pinned CrewAI run synchronously; only buses that
+    # dispatch them in the background can be flushed
+    flush = getattr(crewai_event_bus, 'flush', None)
+    if flush is not None:
+        flush(timeout=timeout)
@@ -0,0 +1,113 @@
+"""Tests for the shared API handlers in src/api_common.py"""
+import pytest
+
+from src import api_common
+from src.api_common import API_ROUTES, LearningAppApi, prefetched_assessment_name
+from src.job_manager import JobManager
+from src.metrics import MetricsRegistry
+from src.progress_bus import MemoryProgressBus
+from src.storage import FileStorage
+
+COURSE = {'subject': 'Rust', 'course': {'lesson_1': {'title': 'Ownership', 'content': 'Moves'}}}
+ASSESSMENT = {'assessment': {'questions': []}}
+
+class FakeCrewExecutor:
+    """Runs crew methods on a stand-in crew that saves fixed outputs"""
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.listeners = []
+        self.calls = []
+
+    def add_course_listener(self, listener):
+        self.listeners.append(listener)
+
+    def run(self, method, *args, **kwargs):
+        self.calls.append((method, args, kwargs.get('output_name'), kwargs.get('priority')))
+        if method == 'create_course':
+            self.storage.save('course', 'final_course_1.json', COURSE)
+            return dict(COURSE, course_filename='final_course_1.json')
+        return ASSESSMENT
+
+    def stats(self):
+        return {}
+
+    def shutdown(self):
+        pass
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # Each API registers its gauges; keep them out of the process-wide registry
+    monkeypatch.setattr(api_common, 'metrics_registry', MetricsRegistry())
+    storage = FileStorage(tmp_path)
+    api = LearningAppApi(storage, MemoryProgressBus(), JobManager(tmp_path / 'jobs', max_workers=1),
+                         JobManager(tmp_path / 'jobs' / 'prefetch', max_workers=1), FakeCrewExecutor(storage))
+
+    def run_job(job, prefetch=False):
+        method, args, kwargs = api.crew_call(job, prefetch)
+        return api.job_result(job, api.crew_executor.run(method, *args, **kwargs), prefetch)
+
+    api.register_job_handler(run_job)
+    yield api
+    api.shutdown()
+
+def test_every_route_has_a_handler():
+    assert all(callable(getattr(LearningAppApi, name)) for _, _, name in API_ROUTES)
+
+def test_create_course_validates_and_queues(api):
+    assert api.create_course({}, {}).status == 400
+    assert api.create_course({}, None).data == {'error': 'Subject is required'}
+
+    response = api.create_course({}, {'subject': 'Rust', 'numLessons': 1})
+    assert response.status == 202
+    api.job_manager.shutdown(wait=True)
+
+    job = api.get_job({}, None, job_id=response.data['job_id']).data
+    assert job['status'] == 'completed'
+    assert job['result']['course_filename'] == 'final_course_1.json'
+
+def test_prefetch_job_builds_a_batch_assessment(api):
+    api.storage.save('course', 'final_course_1.json', COURSE)
+    api.prefetch_assessment('final_course_1.json')
+    api.prefetch_manager.shutdown(wait=True)
+
+    assert api.crew_executor.calls == [
+        ('build_assessment', ('final_course_1.json',), prefetched_assessment_name('final_course_1.json'), 'batch')
+    ]
+    assert api.find_prefetch('final_course_1.json').status == 'completed'
+
+def test_build_assessment_serves_a_prefetched_assessment(api):
+    assert api.build_assessment({}, None).status == 400
+    assert api.build_assessment({}, {'courseFilename': 'missing.json'}).status == 404
+
+    api.storage.save('course', 'final_course_1.json', COURSE)
+    api.storage.save('assessment', prefetched_assessment_name('final_course_1.json'), ASSESSMENT)
+
+    response = api.build_assessment({}, {'courseFilename': 'final_course_1.json'})
+    assert response.status == 200
+    assert response.data['assessment'] == ASSESSMENT
+    assert api.crew_executor.calls == []
+
+def test_delete_course_discards_its_prefetched_assessment(api):
+    api.storage.save('course', 'final_course_1.json', COURSE)
+    api.storage.save('assessment', prefetched_assessment_name('final_course_1.json'), ASSESSMENT)
+
+    assert api.delete_course({}, None, filename='final_course_1.json').data == {'success': True}
+    assert not api.storage.exists('assessment', prefetched_assessment_name('final_course_1.json'))
+    assert api.delete_course({}, None, filename='final_course_1.json').status == 404
+
+def test_course_listing_pages_and_streams(api):
+    for number in range(3):
+        api.storage.save('course', f"final_course_{number}.json", COURSE)
+
+    page = api.get_courses({'limit': '2', 'fields': 'filename'}, None)
+    assert len(page.data['courses']) == 2
+    assert set(page.data['courses'][0]) == {'filename'}
+
+    rest = api.get_courses({'cursor': page.data['next_cursor']}, None)
+    assert len(rest.data['courses']) == 1 and rest.data['next_cursor'] is None
+
+    stream = api.get_courses({'format': 'ndjson', 'limit': '1'}, None)
+    assert stream.content_type == 'application/x-ndjson'
+    assert 'X-Next-Cursor' in stream.headers
+    assert len(list(stream.body)) == 1
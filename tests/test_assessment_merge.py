@@ -0,0 +1,70 @@
+"""Tests for src/assessment_merge.py"""
+from src.assessment_merge import assessment_size, merge_questions
+
+def multiple_choice(question, difficulty='medium', id=1):
+    return {'id': id, 'type': 'multiple_choice', 'question': question, 'options': ['a', 'b', 'c', 'd'],
+            'correct_answer': 0, 'difficulty': difficulty}
+
+def true_false(question, difficulty='medium', id=1):
+    return {'id': id, 'type': 'true_false', 'question': question, 'correct_answer': True,
+            'difficulty': difficulty}
+
+def test_duplicates_across_lessons_are_dropped():
+    candidates = {
+        1: [multiple_choice('What does the borrow checker enforce?')],
+        2: [multiple_choice('What does the borrow checker enforce?!'),
+            multiple_choice('Which keyword declares a mutable binding?')],
+    }
+
+    questions = merge_questions(candidates, 10)
+
+    assert [q['question'] for q in questions] == ['What does the borrow checker enforce?',
+                                                  'Which keyword declares a mutable binding?']
+
+def test_ids_are_renumbered_in_lesson_order():
+    candidates = {
+        2: [multiple_choice('Lesson two question', id=1)],
+        1: [multiple_choice('Lesson one question', id=7), true_false('Lesson one statement', id=7)],
+    }
+
+    questions = merge_questions(candidates, 10)
+
+    assert [q['id'] for q in questions] == [1, 2, 3]
+    assert [q['question'] for q in questions][-1] == 'Lesson two question'
+
+def test_invalid_questions_are_dropped():
+    candidates = {1: [
+        multiple_choice(''),
+        dict(multiple_choice('Answer out of range'), correct_answer=4),
+        dict(multiple_choice('Boolean answer'), correct_answer=True),
+        dict(true_false('String answer'), correct_answer='true'),
+        {'type': 'essay', 'question': 'Unknown type'},
+        true_false('Valid statement'),
+    ]}
+
+    assert [q['question'] for q in merge_questions(candidates, 10)] == ['Valid statement']
+
+def test_selection_mixes_types_and_spreads_lessons():
+    topics = ['ownership', 'borrowing', 'lifetimes', 'traits', 'generics', 'closures',
+              'iterators', 'macros', 'modules']
+    candidates = {
+        number: [multiple_choice(f"Lesson {number}: what is {topic}?") for topic in topics[:6]]
+        + [true_false(f"Lesson {number}: {topic} is checked at compile time") for topic in topics[6:]]
+        for number in (1, 2)
+    }
+
+    questions = merge_questions(candidates, 10)
+
+    assert len(questions) == 10
+    assert sum(q['type'] == 'multiple_choice' for q in questions) == 7
+    assert sum(q['question'].startswith('Lesson 1') for q in questions) == 5
+
+def test_missing_difficulty_defaults_to_medium():
+    candidates = {1: [multiple_choice('Question', difficulty='impossible')]}
+
+    assert merge_questions(candidates, 10)[0]['difficulty'] == 'medium'
+
+def test_assessment_size():
+    assert assessment_size(1) == 8
+    assert assessment_size(3) == 12
+    assert assessment_size(5) == 12
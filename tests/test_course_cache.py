@@ -0,0 +1,49 @@
+"""Tests for src/course_cache.py"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.disk_cache import DiskCache
+
+# Generates (and caches) course "k" unless another process already is
+GENERATE = """
+import os, sys, time
+from src import course_cache
+
+def generate():
+    with open(sys.argv[1], 'a') as log:
+        log.write('generated\\n')
+    time.sleep(1)
+    result = {'course': {'pid': os.getpid()}}
+    course_cache.get_course_cache().set('k', result)
+    return result
+
+result, shared = course_cache.coalesce_course('k', generate, lambda: None)
+print(result['course']['pid'], shared)
+"""
+
+def test_lease_is_held_until_deleted_or_expired(tmp_path):
+    leases = DiskCache(tmp_path / 'cache.db', ttl_seconds=60, table='leases')
+
+    assert leases.add('k', 1)
+    assert not leases.add('k', 2)
+    leases.delete('k')
+    assert leases.add('k', 3)
+
+    expired = DiskCache(tmp_path / 'cache.db', ttl_seconds=0, table='leases')
+    assert expired.add('k', 4)
+
+def test_identical_generations_in_separate_processes_run_once(tmp_path):
+    log = tmp_path / 'generations.log'
+    env = dict(os.environ, COURSE_CACHE_PATH=str(tmp_path / 'course_cache.db'))
+    processes = [
+        subprocess.Popen([sys.executable, '-c', GENERATE, str(log)], env=env, stdout=subprocess.PIPE,
+                         text=True, cwd=Path(__file__).parent.parent)
+        for _ in range(3)
+    ]
+    outputs = [process.communicate(timeout=60)[0].split() for process in processes]
+
+    assert log.read_text().count('generated') == 1
+    assert len({pid for pid, _ in outputs}) == 1
+    assert sorted(shared for _, shared in outputs) == ['False', 'True', 'True']
@@ -0,0 +1,85 @@
+"""Tests for LearningAppCrew's course cache handling and assessment naming in crew.py"""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import course_cache, tracing
+from src.disk_cache import DiskCache
+from src.progress_tracker import ProgressTracker
+from src.storage import FileStorage
+
+COURSE = {'course': {'lesson_1': {'title': 'Introduction to Rust', 'content': 'Ownership'}}}
+
+@pytest.fixture
+def crew(tmp_path, monkeypatch):
+    monkeypatch.setenv('OUTPUTS_DIR', str(tmp_path))
+    monkeypatch.setenv('CREWAI_DISABLE_TELEMETRY', 'true')
+    monkeypatch.setattr(course_cache, '_course_cache',
+                        DiskCache(tmp_path / 'course_cache.db', ttl_seconds=3600, table='course_cache'))
+    monkeypatch.setattr(course_cache, '_course_leases', None)
+
+    import crew as crew_module
+    learning_crew = crew_module.LearningAppCrew(storage=FileStorage(tmp_path))
+    learning_crew.generated = []
+    learning_crew.saved = []
+    learning_crew.add_course_listener(learning_crew.saved.append)
+
+    def generate(subject, num_lessons, tracker, manifest=None):
+        # Stands in for the crew run: save the final course file and announce it
+        name = f"final_course_{len(learning_crew.generated)}.json"
+        learning_crew.generated.append(name)
+        learning_crew.storage.save('course', name, COURSE)
+        learning_crew._notify_course_saved(name)
+        return crew_module.with_course_filename(COURSE, name)
+
+    monkeypatch.setattr(learning_crew, '_generate_course', generate)
+    return learning_crew
+
+def test_cache_hit_reuses_the_course_file(crew):
+    first = crew.create_course('Rust', 1, tracker=ProgressTracker())
+    second = crew.create_course(' rust ', 1, tracker=ProgressTracker())
+
+    assert crew.generated == ['final_course_0.json']
+    assert second == first
+    assert second['course_filename'] == 'final_course_0.json'
+    # Nothing new was written, so pre-generation isn't triggered again
+    assert crew.saved == ['final_course_0.json']
+
+def test_cache_hit_saves_the_course_again_when_its_file_is_gone(crew):
+    crew.create_course('Rust', 1, tracker=ProgressTracker())
+    crew.storage.delete('course', 'final_course_0.json')
+
+    served = crew.create_course('Rust', 1, tracker=ProgressTracker())
+    filename = served['course_filename']
+
+    assert crew.generated == ['final_course_0.json']
+    assert filename.startswith('final_course_') and filename != 'final_course_0.json'
+    assert crew.storage.load('course', filename) == COURSE
+    assert crew.saved == ['final_course_0.json', filename]
+    # Later hits use the new file
+    assert crew.create_course('Rust', 1, tracker=ProgressTracker())['course_filename'] == filename
+    assert crew.saved == ['final_course_0.json', filename]
+
+@pytest.mark.parametrize('course, subject', [
+    (dict(COURSE, subject='Rust Ownership'), 'Rust Ownership'),
+    (COURSE, 'Rust'),
+    ({'course': {'lesson_1': {'title': 'Borrowing', 'content': 'References'}}}, 'Final 20250101 120000 Abcdef'),
+])
+def test_assessment_subject_comes_from_the_course_body(crew, monkeypatch, course, subject):
+    monkeypatch.setattr(tracing, 'TRACING_ENABLED', False)
+    name = 'final_course_20250101_120000_abcdef.json'
+    crew.storage.save('course', name, course)
+    subjects = []
+
+    def build_chunked(subject, lessons, tracker):
+        subjects.append(subject)
+        return SimpleNamespace(raw=json.dumps({'assessment': {'title': f"Assessment: {subject}", 'questions': []}}))
+
+    monkeypatch.setattr(crew, '_use_chunked_assessment', lambda lessons: True)
+    monkeypatch.setattr(crew, '_build_assessment_chunked', build_chunked)
+
+    crew.build_assessment(name, tracker=ProgressTracker())
+
+    assert subjects == [subject]
+    assert crew.storage.names('assessment')[0].startswith(f"assessment_{subject.replace(' ', '_')}_")
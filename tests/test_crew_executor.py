@@ -0,0 +1,50 @@
+"""Tests for the LLM budgets of crew worker processes in src/crew_executor.py"""
+import threading
+
+from src.crew_executor import ProcessPoolCrewExecutor
+from src.llm_gateway import LLMGateway
+
+def worker_gateway(env) -> LLMGateway:
+    """The gateway a worker started with `env` would build"""
+    return LLMGateway(requests_per_minute=float(env['LLM_REQUESTS_PER_MINUTE']),
+                      tokens_per_minute=float(env['LLM_TOKENS_PER_MINUTE']),
+                      max_concurrency=int(env['LLM_MAX_CONCURRENCY']))
+
+def test_worker_env_divides_the_llm_budgets(monkeypatch):
+    monkeypatch.setenv('LLM_REQUESTS_PER_MINUTE', '300')
+    monkeypatch.setenv('LLM_TOKENS_PER_MINUTE', '90000')
+    monkeypatch.setenv('LLM_MAX_CONCURRENCY', '8')
+
+    env = ProcessPoolCrewExecutor(processes=3)._worker_env()
+
+    assert float(env['LLM_REQUESTS_PER_MINUTE']) == 100
+    assert float(env['LLM_TOKENS_PER_MINUTE']) == 30000
+    assert env['LLM_MAX_CONCURRENCY'] == '2'
+
+def test_worker_env_keeps_one_slot_per_worker_and_disabled_limits_off(monkeypatch):
+    monkeypatch.setenv('LLM_MAX_CONCURRENCY', '2')
+    assert ProcessPoolCrewExecutor(processes=4)._worker_env()['LLM_MAX_CONCURRENCY'] == '1'
+
+    monkeypatch.setenv('LLM_MAX_CONCURRENCY', '0')
+    assert ProcessPoolCrewExecutor(processes=4)._worker_env()['LLM_MAX_CONCURRENCY'] == '0'
+
+def test_priority_only_orders_calls_within_one_worker(monkeypatch):
+    monkeypatch.setenv('LLM_MAX_CONCURRENCY', '2')
+    executor = ProcessPoolCrewExecutor(processes=2)
+    requested, prefetch = worker_gateway(executor._worker_env()), worker_gateway(executor._worker_env())
+
+    # The requested job's worker has used its only slot and has an interactive call waiting
+    requested.acquire(1)
+    waiter = threading.Thread(target=requested.acquire, args=(1,))
+    waiter.start()
+    while requested.stats()['waiting'] == 0:
+        threading.Event().wait(0.001)
+
+    # A batch call in the pre-generation worker still starts at once
+    prefetch.acquire(1, 'batch')
+    assert prefetch.stats()['in_flight'] == 1
+    assert requested.stats() == {'in_flight': 1, 'waiting': 1, 'paused_for': 0.0}
+
+    requested.release(1, 1)
+    waiter.join(5)
+    assert requested.stats()['in_flight'] == 1
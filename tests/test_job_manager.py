@@ -0,0 +1,137 @@
+"""Tests for src/job_manager.py"""
+import asyncio
+import json
+import threading
+from dataclasses import asdict
+
+from src.job_manager import AsyncJobManager, Job, JobManager
+
+def write_job(jobs_path, job):
+    jobs_path.mkdir(parents=True, exist_ok=True)
+    (jobs_path / f"{job.id}.json").write_text(json.dumps(asdict(job)))
+
+def test_completed_job_is_persisted(tmp_path):
+    manager = JobManager(tmp_path / 'jobs', max_workers=1)
+    manager.register('course', lambda job: {'subject': job.params['subject']})
+
+    job = manager.submit('course', {'subject': 'Rust'})
+    manager.shutdown(wait=True)
+
+    reloaded = JobManager(tmp_path / 'jobs').get(job.id)
+    assert reloaded.status == 'completed'
+    assert reloaded.result == {'subject': 'Rust'}
+    assert reloaded.started and reloaded.finished
+
+def test_handler_error_is_recorded(tmp_path):
+    manager = JobManager(tmp_path / 'jobs', max_workers=1)
+
+    def fail(job):
+        raise ValueError('Rate limited')
+
+    manager.register('course', fail)
+    job = manager.submit('course', {})
+    manager.shutdown(wait=True)
+
+    assert manager.get(job.id).status == 'error'
+    assert JobManager(tmp_path / 'jobs').get(job.id).error == 'Rate limited'
+
+def test_restart_interrupts_running_jobs_and_resumes_queued_ones(tmp_path):
+    jobs_path = tmp_path / 'jobs'
+    write_job(jobs_path, Job(id='running', kind='course', params={}, status='running', created='1'))
+    write_job(jobs_path, Job(id='queued', kind='course', params={'subject': 'Go'}, created='2'))
+    write_job(jobs_path, Job(id='other', kind='unknown', params={}, created='3'))
+
+    manager = JobManager(jobs_path, max_workers=1)
+    manager.register('course', lambda job: job.params['subject'])
+
+    interrupted = manager.get('running')
+    assert interrupted.status == 'error'
+    assert 'restart' in interrupted.error
+    assert manager.get('queued').status == 'queued'
+
+    manager.resume_pending()
+    manager.shutdown(wait=True)
+
+    assert manager.get('queued').status == 'completed'
+    assert manager.get('queued').result == 'Go'
+    # Jobs without a registered handler are left alone
+    assert manager.get('other').status == 'queued'
+
+def test_cancelled_queued_job_never_runs(tmp_path):
+    manager = JobManager(tmp_path / 'jobs', max_workers=1)
+    release = threading.Event()
+    ran = []
+
+    def handler(job):
+        ran.append(job.id)
+        release.wait(5)
+        return 'done'
+
+    manager.register('course', handler)
+    first = manager.submit('course', {})
+    second = manager.submit('course', {})
+
+    assert manager.cancel(second.id)
+    release.set()
+    manager.shutdown(wait=True)
+
+    assert ran == [first.id]
+    assert manager.get(second.id).status == 'cancelled'
+    assert not manager.cancel(first.id)
+
+def test_find_returns_most_recent_match(tmp_path):
+    jobs_path = tmp_path / 'jobs'
+    write_job(jobs_path, Job(id='old', kind='assessment', params={'course': 'a.json'}, status='completed',
+                             created='2025-01-01T00:00:00'))
+    write_job(jobs_path, Job(id='new', kind='assessment', params={'course': 'a.json'}, status='completed',
+                             created='2025-01-02T00:00:00'))
+
+    manager = JobManager(jobs_path)
+
+    assert manager.find('assessment', course='a.json').id == 'new'
+    assert manager.find('assessment', course='b.json') is None
+    assert manager.status_counts() == {('assessment', 'completed'): 2}
+
+def test_async_manager_runs_jobs_submitted_before_start(tmp_path):
+    manager = AsyncJobManager(tmp_path / 'jobs', max_workers=1)
+
+    async def handler(job):
+        await asyncio.sleep(0)
+        return job.params['subject']
+
+    manager.register('course', handler)
+    job = manager.submit('course', {'subject': 'Rust'})
+
+    async def run():
+        await manager.start()
+        while manager.get(job.id).status not in ('completed', 'error'):
+            await asyncio.sleep(0.01)
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert manager.get(job.id).status == 'completed'
+    assert JobManager(tmp_path / 'jobs').get(job.id).result == 'Rust'
+
+def test_finished_jobs_past_retention_are_pruned(tmp_path):
+    jobs_path = tmp_path / 'jobs'
+    write_job(jobs_path, Job(id='expired', kind='course', params={}, status='completed',
+                             created='2020-01-01T00:00:00', finished='2020-01-01T00:01:00', result={'big': 'x'}))
+    write_job(jobs_path, Job(id='queued', kind='course', params={}, created='2020-01-01T00:00:00'))
+
+    manager = JobManager(jobs_path, retention_seconds=3600)
+
+    assert manager.get('expired') is None
+    assert not (jobs_path / 'expired.json').exists()
+    # Unfinished jobs are kept whatever their age
+    assert manager.get('queued').status == 'queued'
+
+def test_only_the_most_recent_finished_jobs_are_kept(tmp_path):
+    manager = JobManager(tmp_path / 'jobs', max_workers=1, retention_seconds=0, max_finished=2)
+    manager.register('course', lambda job: job.params['n'])
+
+    # One worker, so jobs finish in submission order
+    jobs = [manager.submit('course', {'n': n}) for n in range(4)]
+    manager.shutdown(wait=True)
+
+    assert [manager.get(job.id) is not None for job in jobs] == [False, False, True, True]
+    assert sorted(path.stem for path in (tmp_path / 'jobs').glob('*.json')) == sorted([jobs[2].id, jobs[3].id])
@@ -0,0 +1,97 @@
+"""Tests for src/llm_cache.py and its use by GatewayLLM"""
+import pytest
+from crewai.llms.base_llm import BaseLLM
+
+from src import llm_cache, llm_gateway
+from src.disk_cache import DiskCache
+from src.llm_cache import llm_cache_key, llm_cache_mode, should_cache
+from src.llm_gateway import GatewayLLM, LLMGateway
+
+MESSAGES = [{'role': 'user', 'content': 'Outline a course on Rust'}]
+
+class FakeLLM(BaseLLM):
+    """Answers every call with its next response, counting calls"""
+
+    def __init__(self, temperature=0, responses=None):
+        super().__init__(model='fake-model', temperature=temperature)
+        self.responses = list(responses or ['Lesson 1: Ownership'])
+        self.calls = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.calls += 1
+        return self.responses[min(self.calls, len(self.responses)) - 1]
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = DiskCache(tmp_path / 'llm_cache.db', ttl_seconds=3600, table='llm_cache')
+    monkeypatch.setattr(llm_cache, '_llm_cache', cache)
+    monkeypatch.setattr(llm_gateway, '_gateway', LLMGateway())
+    return cache
+
+@pytest.mark.parametrize('mode, temperature, cached', [
+    ('off', 0, False),
+    ('deterministic', 0, True),
+    ('deterministic', 0.7, False),
+    ('deterministic', None, False),
+    ('all', 0.7, True),
+    ('bogus', 0, False),
+])
+def test_mode_selects_which_calls_are_cached(monkeypatch, mode, temperature, cached):
+    monkeypatch.setenv('LLM_CACHE', mode)
+
+    assert should_cache(temperature) is cached
+
+def test_unknown_mode_is_off(monkeypatch):
+    monkeypatch.setenv('LLM_CACHE', 'sometimes')
+    assert llm_cache_mode() == 'off'
+
+def test_key_depends_on_model_temperature_messages_and_stop():
+    key = llm_cache_key('gpt', 0, MESSAGES, ['\nObservation'])
+
+    assert key == llm_cache_key('gpt', 0, [dict(MESSAGES[0])], ['\nObservation'])
+    assert key != llm_cache_key('gpt-mini', 0, MESSAGES, ['\nObservation'])
+    assert key != llm_cache_key('gpt', 0.2, MESSAGES, ['\nObservation'])
+    assert key != llm_cache_key('gpt', 0, MESSAGES + [{'role': 'user', 'content': 'More'}], ['\nObservation'])
+    assert key != llm_cache_key('gpt', 0, MESSAGES, [])
+
+def test_deterministic_call_is_answered_from_the_cache(cache, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE', 'deterministic')
+    inner = FakeLLM(responses=['first', 'second'])
+    llm = GatewayLLM(inner)
+
+    assert llm.call(MESSAGES) == 'first'
+    assert llm.call(MESSAGES) == 'first'
+    assert inner.calls == 1
+    assert cache.stats()['hits'] == 1
+
+def test_sampled_call_is_only_cached_in_all_mode(cache, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE', 'deterministic')
+    inner = FakeLLM(temperature=0.7, responses=['first', 'second', 'third'])
+    llm = GatewayLLM(inner)
+
+    assert [llm.call(MESSAGES), llm.call(MESSAGES)] == ['first', 'second']
+
+    monkeypatch.setenv('LLM_CACHE', 'all')
+    assert [llm.call(MESSAGES), llm.call(MESSAGES)] == ['third', 'third']
+    assert inner.calls == 3
+
+def test_tool_calls_are_never_cached(cache, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE', 'all')
+    inner = FakeLLM()
+    llm = GatewayLLM(inner)
+    tools = [{'type': 'function', 'function': {'name': 'search'}}]
+
+    llm.call(MESSAGES, tools=tools)
+    llm.call(MESSAGES, available_functions={'search': print})
+
+    assert inner.calls == 2
+    assert cache.stats()['entries'] == 0
+
+def test_structured_outputs_are_never_cached(cache, monkeypatch):
+    monkeypatch.setenv('LLM_CACHE', 'all')
+    inner = FakeLLM(responses=[{'lessons': ['Ownership']}, {'lessons': ['Borrowing']}])
+    llm = GatewayLLM(inner)
+
+    assert llm.call(MESSAGES) == {'lessons': ['Ownership']}
+    assert llm.call(MESSAGES) == {'lessons': ['Borrowing']}
+    assert cache.stats()['entries'] == 0
@@ -0,0 +1,166 @@
+"""Tests for src/llm_gateway.py, on a fake clock"""
+import threading
+
+import pytest
+
+from src import llm_gateway
+from src.llm_gateway import LLMGateway, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+class Response:
+    def __init__(self, headers):
+        self.status_code = 429
+        self.headers = headers
+
+class RateLimitError(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__('Rate limit reached')
+        self.response = Response({'retry-after': retry_after} if retry_after is not None else {})
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def wait_until(condition):
+    for _ in range(5000):
+        if condition():
+            return
+        threading.Event().wait(0.001)
+    raise AssertionError('Timed out')
+
+def test_token_bucket_refills_at_its_rate_up_to_its_burst(clock):
+    bucket = TokenBucket(60, burst_seconds=10, clock=clock)
+
+    assert bucket.capacity == 10
+    assert bucket.wait_time(10, clock()) == 0
+    bucket.take(10)
+    assert bucket.wait_time(1, clock()) == 1.0
+
+    clock.advance(0.5)
+    assert bucket.wait_time(1, clock()) == 0.5
+
+    clock.advance(60)
+    assert bucket.level == 0.5  # Refilled lazily, on the next check
+    assert bucket.wait_time(1, clock()) == 0
+    assert bucket.level == 10
+
+def test_token_bucket_debt_is_paid_off_before_new_calls(clock):
+    bucket = TokenBucket(60, burst_seconds=10, clock=clock)
+
+    bucket.take(15)
+
+    assert bucket.wait_time(1, clock()) == 6.0
+    # Asking for more than the burst waits for a full bucket, not forever
+    assert bucket.wait_time(100, clock()) == 15.0
+
+def test_request_budget_delays_calls_once_the_burst_is_spent(clock):
+    gateway = LLMGateway(requests_per_minute=60, tokens_per_minute=0, max_concurrency=0, clock=clock)
+
+    for _ in range(10):
+        gateway.acquire(1)
+        gateway.release(1, 1)
+
+    assert gateway._wait_time(1, clock()) == 1.0
+    clock.advance(1)
+    assert gateway._wait_time(1, clock()) == 0
+
+def test_token_budget_settles_used_against_reserved_tokens(clock):
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=600, max_concurrency=0, clock=clock)
+
+    gateway.acquire(50)
+    gateway.release(50, 100)
+
+    # 100 tokens capacity, 100 used: the next 10 tokens wait for 1 second of refill
+    assert gateway._wait_time(10, clock()) == 1.0
+
+def test_waiting_calls_are_admitted_by_priority_then_arrival(clock):
+    gateway = LLMGateway(requests_per_minute=0, tokens_per_minute=0, max_concurrency=1, clock=clock)
+    admitted = []
+
+    def call(name, priority):
+        gateway.acquire(1, priority)
+        admitted.append(name)
+
+    gateway.acquire(1)
+    threads = []
+    for name, priority in [('batch 1', 'batch'), ('interactive 1', 'interactive'), ('batch 2', 'batch'),
+                           ('interactive 2', 'interactive')]:
+        threads.append(threading.Thread(target=call, args=(name, priority)))
+        threads[-1].start()
+        wait_until(lambda: gateway.stats()['waiting'] == len(threads))
+
+    for count in range(1, 5):
+        gateway.release(1, 1)
+        wait_until(lambda: len(admitted) == count)
+    for thread in threads:
+        thread.join(5)
+
+    assert admitted == ['interactive 1', 'interactive 2', 'batch 1', 'batch 2']
+
+def test_backoff_honours_retry_after(clock):
+    gateway = LLMGateway(clock=clock)
+
+    assert gateway.backoff(0, RateLimitError(retry_after='7')) == 7.0
+    assert gateway.stats()['paused_for'] == 7.0
+    assert gateway._wait_time(1, clock()) == 7.0
+
+    clock.advance(7)
+    assert gateway._wait_time(1, clock()) == 0
+
+def test_backoff_is_exponential_and_capped(clock, monkeypatch):
+    monkeypatch.setattr(llm_gateway.random, 'uniform', lambda low, high: 1.0)
+    gateway = LLMGateway(base_delay=1, max_delay=10, clock=clock)
+
+    assert [gateway.backoff(attempt, RateLimitError()) for attempt in range(6)] == [1, 2, 4, 8, 10, 10]
+    # Pauses only ever extend
+    assert gateway.stats()['paused_for'] == 10
+
+def test_throttled_calls_are_retried_up_to_the_limit(clock):
+    gateway = LLMGateway(max_retries=2, base_delay=0, clock=clock)
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        raise RateLimitError()
+
+    with pytest.raises(RateLimitError):
+        gateway.call(operation, tokens=10)
+
+    assert len(attempts) == 3
+    assert gateway.stats()['in_flight'] == 0
+
+def test_throttled_call_succeeds_on_retry(clock):
+    gateway = LLMGateway(max_retries=2, clock=clock)
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimitError(retry_after='0')
+        return 'ok'
+
+    assert gateway.call(operation, tokens=10) == 'ok'
+    assert len(attempts) == 2
+
+def test_other_errors_are_not_retried(clock):
+    gateway = LLMGateway(clock=clock)
+    attempts = []
+
+    def operation():
+        attempts.append(1)
+        raise ValueError('Bad request')
+
+    with pytest.raises(ValueError):
+        gateway.call(operation, tokens=10)
+
+    assert len(attempts) == 1
+    assert gateway.stats()['in_flight'] == 0
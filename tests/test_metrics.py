@@ -0,0 +1,52 @@
+"""Tests for src/metrics.py"""
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent, LLMCallType
+
+from src.metrics import LLM_DURATION, LLM_TOKENS, MetricsRegistry, install_llm_hooks
+
+class ScriptedLLM:
+    """Emits the events CrewAI's LLM emits around one call"""
+
+    model = 'test-model'
+
+    def call(self, messages, response=None, error=None):
+        crewai_event_bus.emit(self, event=LLMCallStartedEvent(messages=messages, model=self.model))
+        if error:
+            crewai_event_bus.emit(self, event=LLMCallFailedEvent(error=error))
+        else:
+            crewai_event_bus.emit(self, event=LLMCallCompletedEvent(
+                messages=messages, response=response, call_type=LLMCallType.LLM_CALL, model=self.model
+            ))
+
+def duration_count(status):
+    series = LLM_DURATION._series.get(('test-model', 'none', status))
+    return series[-2] if series else 0
+
+def tokens(token_type):
+    return LLM_TOKENS.values().get(('test-model', 'none', token_type), 0)
+
+def test_llm_call_records_duration_and_tokens():
+    install_llm_hooks()
+    before = duration_count('success'), tokens('prompt'), tokens('completion')
+
+    ScriptedLLM().call([{'role': 'user', 'content': 'Write a lesson on tides'}], response='The moon pulls the sea.')
+
+    assert duration_count('success') == before[0] + 1
+    assert tokens('prompt') > before[1]
+    assert tokens('completion') > before[2]
+
+def test_failed_llm_call_is_recorded_with_its_model():
+    install_llm_hooks()
+    before = duration_count('error')
+
+    ScriptedLLM().call('Write a lesson on tides', error='timeout')
+
+    assert duration_count('error') == before + 1
+
+def test_counter_renders_in_prometheus_format():
+    registry = MetricsRegistry()
+    counter = registry.counter('jobs_total', 'Jobs run', ['kind'])
+    counter.inc(kind='course')
+    counter.inc(2, kind='course')
+
+    assert 'jobs_total{kind="course"} 3' in registry.render()
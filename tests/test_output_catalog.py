@@ -0,0 +1,69 @@
+"""Tests for src/output_catalog.py"""
+import json
+import os
+
+import pytest
+
+from src.output_catalog import OutputCatalog, course_entry, course_subject
+
+def write_course(directory, name, created):
+    path = directory / f"final_course_{name}.json"
+    path.write_text(json.dumps({'course': {'lesson_1': {'title': f"Introduction to {name}"}}}))
+    os.utime(path, (created, created))
+    return path
+
+def catalog(directory):
+    return OutputCatalog(directory, 'final_course_*.json', course_entry, rescan_interval=0)
+
+def test_pages_follow_cursor_newest_first(tmp_path):
+    for i in range(5):
+        write_course(tmp_path, f"s{i}", 1000 + i)
+    # Same mtime as s4, ordered by filename
+    write_course(tmp_path, "t4", 1004)
+
+    names, cursor = [], None
+    while True:
+        entries, cursor = catalog(tmp_path).page(cursor, limit=2)
+        names += [entry['filename'] for entry in entries]
+        if cursor is None:
+            break
+
+    assert names == [f"final_course_{name}.json" for name in ['s4', 't4', 's3', 's2', 's1', 's0']]
+
+def test_cursor_is_stable_when_newer_files_appear(tmp_path):
+    for i in range(4):
+        write_course(tmp_path, f"s{i}", 1000 + i)
+    courses = catalog(tmp_path)
+
+    first, cursor = courses.page(limit=2)
+    write_course(tmp_path, "new", 2000)
+    second, cursor = courses.page(cursor, limit=2)
+
+    assert [e['filename'] for e in first] == ['final_course_s3.json', 'final_course_s2.json']
+    assert [e['filename'] for e in second] == ['final_course_s1.json', 'final_course_s0.json']
+    assert cursor is None
+
+def test_without_limit_returns_everything(tmp_path):
+    for i in range(3):
+        write_course(tmp_path, f"s{i}", 1000 + i)
+
+    entries, cursor = catalog(tmp_path).page()
+
+    assert len(entries) == 3
+    assert cursor is None
+
+def test_invalid_cursor_is_rejected(tmp_path):
+    write_course(tmp_path, "s0", 1000)
+
+    with pytest.raises(ValueError):
+        catalog(tmp_path).page('not-a-cursor', limit=2)
+
+def test_course_subject_prefers_the_course_body(tmp_path):
+    lessons = {'lesson_1': {'title': 'Introduction to Rust', 'content': 'Ownership'}}
+
+    assert course_subject({'subject': ' Go ', 'course': lessons}) == 'Go'
+    assert course_subject({'title': 'Systems Rust', 'course': lessons}) == 'Systems Rust'
+    assert course_subject({'course': lessons}) == 'Rust'
+    assert course_subject({'course': {'lesson_1': {'title': 'Borrowing'}}}) is None
+    assert course_entry(tmp_path / 'final_course_20250101_120000.json',
+                        {'course': {'lesson_1': {'title': 'Borrowing'}}})['subject'] == '20250101'
@@ -0,0 +1,43 @@
+"""Tests for src/output_parser.py"""
+import pytest
+
+from src.output_parser import OutputParseError, extract_json, repair_json
+
+def test_plain_and_parsed_values():
+    assert extract_json('{"a": 1}') == {'a': 1}
+    assert extract_json({'a': 1}) == {'a': 1}
+    assert extract_json([1, 2]) == [1, 2]
+
+def test_fenced_json():
+    assert extract_json('```json\n{"a": 1}\n```') == {'a': 1}
+    assert extract_json('Here is the course:\n```\n{"a": [1, 2]}\n```\nLet me know!') == {'a': [1, 2]}
+
+def test_unterminated_fence():
+    assert extract_json('```json\n{"a": 1}') == {'a': 1}
+
+def test_prose_around_json():
+    assert extract_json('Sure! {"a": {"b": 2}} Hope this helps.') == {'a': {'b': 2}}
+
+def test_trailing_commas():
+    assert extract_json('{"a": [1, 2,], "b": {"c": 3,},}') == {'a': [1, 2], 'b': {'c': 3}}
+    assert extract_json('```json\n[\n  {"a": 1},\n]\n```') == [{'a': 1}]
+
+def test_truncated_output():
+    assert extract_json('{"course": {"lesson_1": {"title": "Intro", "content": "Ownership') == {
+        'course': {'lesson_1': {'title': 'Intro', 'content': 'Ownership'}}
+    }
+    assert extract_json('{"questions": [{"id": 1}, {"id": 2},') == {'questions': [{'id': 1}, {'id': 2}]}
+    assert extract_json('{"a": 1, "b":') == {'a': 1}
+    assert extract_json('{"a": 1, "b') == {'a': 1}
+
+def test_repair_keeps_brackets_inside_strings():
+    assert repair_json('{"a": "x}, ]", ') == '{"a": "x}, ]"}'
+
+def test_unparseable_output():
+    with pytest.raises(OutputParseError):
+        extract_json('No JSON here')
+    with pytest.raises(OutputParseError):
+        extract_json(None)
+    # OutputParseError is a ValueError, which callers already handle
+    with pytest.raises(ValueError):
+        extract_json('{"a": nope}')
@@ -0,0 +1,112 @@
+"""Tests for src/progress_bus.py"""
+import threading
+
+import pytest
+
+from src.progress_bus import (MemoryProgressBus, SQLiteProgressBus, create_progress_bus,
+                              socketio_client_manager)
+
+def progress(job_id, step):
+    return {'job_id': job_id, 'step': step}
+
+def start_listener(bus, count):
+    """Collect messages from the bus on a thread until `count` real (non-ping) ones arrive"""
+    received = []
+
+    def listen():
+        real = 0
+        for message in bus.listen():
+            received.append(message)
+            real += 'ping' not in message
+            if real == count:
+                return
+
+    thread = threading.Thread(target=listen, daemon=True)
+    thread.start()
+    return thread, received
+
+def wait_until_listening(publish, listeners):
+    """Publish pings until every listener has started receiving, so no later message is missed"""
+    for number in range(2000):
+        if all(received for _, received in listeners):
+            return
+        publish({'ping': number})
+        threading.Event().wait(0.005)
+    raise AssertionError('Listeners never started')
+
+def real_messages(received):
+    return [message for message in received if 'ping' not in message]
+
+def test_sqlite_bus_fans_out_to_listeners_in_every_process(tmp_path):
+    # Two buses on one database stand in for two server processes
+    first = SQLiteProgressBus(tmp_path / 'bus.db', poll_interval=0.001)
+    second = SQLiteProgressBus(tmp_path / 'bus.db', poll_interval=0.001)
+    listeners = [start_listener(first, 3), start_listener(second, 3)]
+    wait_until_listening(first.publish, listeners)
+
+    first.publish(progress('a', 1))
+    second.publish(progress('b', 1))
+    first.publish(progress('a', 2))
+
+    for thread, received in listeners:
+        thread.join(5)
+        assert real_messages(received) == [progress('a', 1), progress('b', 1), progress('a', 2)]
+
+def test_sqlite_bus_listener_only_sees_new_messages(tmp_path):
+    bus = SQLiteProgressBus(tmp_path / 'bus.db', poll_interval=0.001)
+    bus.publish(progress('old', 1))
+
+    listeners = [start_listener(bus, 1)]
+    wait_until_listening(bus.publish, listeners)
+    bus.publish(progress('new', 1))
+
+    thread, received = listeners[0]
+    thread.join(5)
+    assert real_messages(received) == [progress('new', 1)]
+
+def test_sqlite_bus_prunes_old_messages(tmp_path):
+    bus = SQLiteProgressBus(tmp_path / 'bus.db', retention=0)
+
+    bus.publish(progress('a', 1))
+    bus.publish(progress('a', 2))
+
+    rows = bus._conn.execute("SELECT id FROM messages").fetchall()
+    assert len(rows) == 1 and rows[0][0] == 2
+
+def test_latest_progress_is_shared_between_processes(tmp_path):
+    first = SQLiteProgressBus(tmp_path / 'bus.db')
+    second = SQLiteProgressBus(tmp_path / 'bus.db')
+
+    first.record(progress('a', 1))
+    first.record(progress('a', 2))
+    first.record({'step': 3})
+
+    assert second.latest('a') == progress('a', 2)
+    assert second.latest('b') is None
+
+def test_memory_bus_delivers_in_process_only():
+    bus = MemoryProgressBus()
+    listeners = [start_listener(bus, 1), start_listener(bus, 1)]
+    wait_until_listening(bus.publish, listeners)
+
+    bus.publish(progress('a', 1))
+    bus.record(progress('a', 1))
+
+    for thread, received in listeners:
+        thread.join(5)
+        assert real_messages(received) == [progress('a', 1)]
+    assert bus.latest('a') is None
+    assert socketio_client_manager(bus) is None
+
+def test_create_progress_bus(tmp_path, monkeypatch):
+    monkeypatch.delenv('PROGRESS_BUS', raising=False)
+    assert isinstance(create_progress_bus(tmp_path), MemoryProgressBus)
+
+    monkeypatch.setenv('PROGRESS_BUS', 'sqlite')
+    bus = create_progress_bus(tmp_path)
+    assert isinstance(bus, SQLiteProgressBus) and bus.db_path == tmp_path / 'progress_bus.db'
+    assert socketio_client_manager(bus) is not None
+
+    monkeypatch.setenv('PROGRESS_BUS', 'kafka')
+    with pytest.raises(ValueError, match='Unknown progress bus'):
+        create_progress_bus(tmp_path)
@@ -0,0 +1,82 @@
+"""Tests for src/prompt_config.py"""
+import shutil
+from pathlib import Path
+
+import pytest
+
+from src.prompt_config import PromptConfigError, PromptConfigStore
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config'
+
+@pytest.fixture
+def config_path(tmp_path):
+    shutil.copytree(CONFIG_PATH, tmp_path / 'config')
+    return tmp_path / 'config'
+
+def edit(path: Path, old: str, new: str):
+    text = path.read_text()
+    assert old in text
+    path.write_text(text.replace(old, new, 1))
+
+def test_valid_edit_is_reloaded(config_path):
+    store = PromptConfigStore(config_path, check_interval=0)
+    first = store.current()
+
+    edit(config_path / 'agents.yaml', 'Curriculum Builder', 'Syllabus Designer')
+    second = store.current()
+
+    assert second.version != first.version
+    assert second.agents['curriculum_builder']['role'].strip() == 'Syllabus Designer'
+    assert store.status()['last_error'] is None
+
+def test_unchanged_files_keep_the_same_snapshot(config_path):
+    store = PromptConfigStore(config_path, check_interval=0)
+
+    assert store.current() is store.current()
+
+def test_bad_edit_is_rejected_and_the_last_good_version_kept(config_path):
+    store = PromptConfigStore(config_path, check_interval=0)
+    good = store.current()
+
+    edit(config_path / 'tasks.yaml', '"{subject}"', '"the subject"')
+
+    assert store.current() is good
+    assert 'missing placeholder(s) {subject}' in store.status()['last_error']
+
+    edit(config_path / 'agents.yaml', 'curriculum_builder:', 'curriculum_builder: [')
+    assert store.current() is good
+    assert 'invalid YAML' in store.status()['last_error']
+
+def test_fixing_a_bad_edit_recovers(config_path):
+    store = PromptConfigStore(config_path, check_interval=0)
+    good = store.current()
+    tasks = config_path / 'tasks.yaml'
+    original = tasks.read_text()
+
+    edit(tasks, '"{subject}"', '"{topic}"')
+    store.current()
+    tasks.write_text(original + '\n')
+
+    assert store.current().version != good.version
+    assert store.status()['last_error'] is None
+
+def test_invalid_initial_config_raises(config_path):
+    edit(config_path / 'agents.yaml', 'backstory:', 'history:')
+
+    with pytest.raises(PromptConfigError, match="needs a 'backstory'"):
+        PromptConfigStore(config_path).current()
+
+def test_pinned_run_keeps_its_version_across_a_reload(config_path):
+    store = PromptConfigStore(config_path, check_interval=0)
+
+    with store.pinned() as pinned:
+        edit(config_path / 'agents.yaml', 'Curriculum Builder', 'Syllabus Designer')
+
+        assert store.current().version != pinned.version
+        assert store.active() is pinned
+        # Nested runs share the outer pin
+        with store.pinned() as nested:
+            assert nested is pinned
+
+    assert store.active() is store.current()
+    assert store.active().version != pinned.version
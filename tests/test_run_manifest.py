@@ -0,0 +1,56 @@
+"""Tests for src/run_manifest.py"""
+import os
+
+from src.run_manifest import RunManifest
+from src.storage import FileStorage
+
+def test_completed_stages_survive_a_reload(tmp_path):
+    storage = FileStorage(tmp_path)
+    manifest = RunManifest.create(storage, 'Rust', 2)
+    manifest.complete('curriculum', 'curriculum_1.json')
+    manifest.complete('lesson_1', 'lesson_1.json')
+
+    loaded = RunManifest.load(storage, manifest.run_id)
+
+    assert loaded.subject == 'Rust'
+    assert loaded.num_lessons == 2
+    assert loaded.status == 'running'
+    assert loaded.output('curriculum') == 'curriculum_1.json'
+    assert loaded.output('lesson_1') == 'lesson_1.json'
+    assert loaded.output('lesson_2') is None
+
+def test_failed_stage_is_not_reused(tmp_path):
+    storage = FileStorage(tmp_path)
+    manifest = RunManifest.create(storage, 'Rust', 1)
+    manifest.complete('content', 'lessons_1.json')
+    manifest.fail('content', 'Unparseable lessons')
+
+    loaded = RunManifest.load(storage, manifest.run_id)
+
+    assert loaded.status == 'error'
+    assert loaded.data['error'] == 'Unparseable lessons'
+    assert loaded.output('content') is None
+
+def test_restart_and_finish(tmp_path):
+    storage = FileStorage(tmp_path)
+    manifest = RunManifest.create(storage, 'Rust', 1)
+    manifest.fail(None, 'Rate limited')
+
+    manifest.restart()
+    assert RunManifest.load(storage, manifest.run_id).status == 'running'
+
+    manifest.finish()
+    loaded = RunManifest.load(storage, manifest.run_id)
+    assert loaded.status == 'completed'
+    assert loaded.data['error'] is None
+
+def test_latest_is_the_most_recent_run(tmp_path):
+    storage = FileStorage(tmp_path)
+    assert RunManifest.latest(storage) is None
+
+    older = RunManifest.create(storage, 'Rust', 1)
+    newer = RunManifest.create(storage, 'Go', 1)
+    older_path = tmp_path / 'runs' / f'run_{older.run_id}.json'
+    os.utime(older_path, (1000, 1000))
+
+    assert RunManifest.latest(storage).run_id == newer.run_id
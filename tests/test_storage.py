@@ -0,0 +1,102 @@
+"""Tests for src/storage.py, run against every backend"""
+import os
+
+import pytest
+
+from src.storage import FileStorage, SQLiteStorage, kind_for_name
+
+COURSE = {'course': {'lesson_1': {'title': 'Introduction to Rust', 'content': 'Ownership'}}}
+ASSESSMENT = {'assessment': {'questions': [{'id': 1, 'question': 'What is a borrow?'}]}}
+
+@pytest.fixture(params=['files', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'files':
+        return FileStorage(tmp_path / 'outputs')
+    return SQLiteStorage(tmp_path / 'outputs' / 'learning_app.db')
+
+def save_at(storage, kind, name, content, created):
+    """Save an output with a fixed creation time so ordering is deterministic"""
+    if isinstance(storage, SQLiteStorage):
+        return storage.save(kind, name, content, created=created)
+    storage.save(kind, name, content)
+    path = storage._path(kind, name)
+    os.utime(path, (created, created))
+    return name
+
+def test_round_trip(storage):
+    storage.save('course', 'final_course_20250101_120000.json', COURSE)
+    storage.save('assessment', 'assessment_rust_20250101_120000.json', ASSESSMENT)
+
+    assert storage.exists('course', 'final_course_20250101_120000.json')
+    assert storage.load('course', 'final_course_20250101_120000.json') == COURSE
+    assert storage.load('assessment', 'assessment_rust_20250101_120000.json') == ASSESSMENT
+
+def test_text_content_is_parsed_on_load(storage):
+    storage.save('course', 'final_course_20250101_120000.json', '```json\n{"course": {}}\n```')
+
+    assert storage.load('course', 'final_course_20250101_120000.json') == {'course': {}}
+
+def test_missing_output(storage):
+    assert not storage.exists('course', 'final_course_missing.json')
+    assert not storage.delete('course', 'final_course_missing.json')
+    with pytest.raises(FileNotFoundError):
+        storage.load('course', 'final_course_missing.json')
+
+def test_delete(storage):
+    storage.save('course', 'final_course_20250101_120000.json', COURSE)
+
+    assert storage.delete('course', 'final_course_20250101_120000.json')
+    assert not storage.exists('course', 'final_course_20250101_120000.json')
+    assert storage.names('course') == []
+
+def test_names_are_newest_first_and_per_kind(storage):
+    save_at(storage, 'course', 'final_course_1.json', COURSE, 1000)
+    save_at(storage, 'course', 'final_course_2.json', COURSE, 2000)
+    save_at(storage, 'curriculum', 'curriculum_1.json', {'lessons': []}, 3000)
+
+    assert storage.names('course') == ['final_course_2.json', 'final_course_1.json']
+    assert storage.names('curriculum') == ['curriculum_1.json']
+
+def test_page_entries_and_cursor(storage):
+    for i in range(3):
+        save_at(storage, 'course', f'final_course_{i}.json', COURSE, 1000 + i)
+
+    first, cursor = storage.page('course', limit=2)
+    second, last = storage.page('course', cursor, limit=2)
+
+    assert [e['filename'] for e in first + second] == ['final_course_2.json', 'final_course_1.json',
+                                                       'final_course_0.json']
+    assert last is None
+    assert first[0]['id'] == 'final_course_2'
+    assert first[0]['subject'] == 'Rust'
+    assert first[0]['lesson_count'] == 1
+    assert first[0]['created'] == 1002
+
+def test_list_outputs_includes_fenced_files_newest_first(storage):
+    save_at(storage, 'course', 'final_course_20250101_120000.json', COURSE, 1000)
+    save_at(storage, 'course_result', 'course_rust_20250101_120000.json', '```json\n{"course": {}}\n```', 2000)
+    save_at(storage, 'assessment', 'assessment_rust_20250101_120000.json', ASSESSMENT, 3000)
+
+    outputs = storage.list_outputs()
+
+    assert [output['filename'] for output in outputs] == ['course_rust_20250101_120000.json',
+                                                          'final_course_20250101_120000.json']
+    assert [output['created'] for output in outputs] == [2000, 1000]
+
+def test_list_outputs_previews_follow_rewrites(tmp_path):
+    storage = FileStorage(tmp_path / 'outputs')
+    storage.save('course_result', 'course_rust_20250101_120000.json', '```json\n{"course": {}}\n```')
+    assert storage.list_outputs()[0]['preview'] == "{'course': {}}"
+
+    storage.save('course_result', 'course_rust_20250101_120000.json', {'course': {'lesson_1': 'x' * 300}})
+    preview = storage.list_outputs()[0]['preview']
+    assert preview.startswith("{'course': {'lesson_1': 'xxx") and len(preview) == 203
+
+def test_kind_for_name():
+    assert kind_for_name('final_course_1.json') == 'course'
+    assert kind_for_name('course_1.json') == 'course_result'
+    assert kind_for_name('assessment_1.json') == 'assessment'
+    assert kind_for_name('assessment_1.txt') == 'assessment_raw'
+    assert kind_for_name('lessons_1.json') == 'lessons'
+    assert kind_for_name('lesson_1.json') == 'lesson'
+    assert kind_for_name('run_1.json') == 'manifest'
@@ -0,0 +1,113 @@
+"""Tests for src/tracing.py and trace_report.py"""
+import pytest
+
+import trace_report
+from src import tracing
+
+@pytest.fixture
+def trace_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, 'TRACE_DIR', tmp_path)
+    monkeypatch.setattr(tracing, 'TRACING_ENABLED', True)
+    return tmp_path
+
+def call(kind, name, start, end):
+    return {'kind': kind, 'name': name, 'start': start, 'end': end, 'status': 'ok', 'attributes': {}}
+
+def span_record(span_id, parent_id, name, start, end, kind='stage'):
+    return {'trace_id': 'run', 'span_id': span_id, 'parent_id': parent_id, 'name': name, 'kind': kind,
+            'start': start, 'end': end, 'duration_ms': (end - start) * 1000, 'status': 'ok', 'attributes': {}}
+
+def test_spans_nest_under_the_run(trace_dir):
+    with tracing.trace_run('run-1', 'create_course', subject='Rust') as root:
+        with tracing.span('curriculum') as stage:
+            with tracing.span('build_curriculum', kind='task'):
+                tracing.set_attributes(lessons=2)
+        with pytest.raises(ValueError):
+            with tracing.span('lessons'):
+                raise ValueError('LLM failed')
+
+    spans = {span['name']: span for span in trace_report.load_spans(trace_dir / 'run-1.jsonl')}
+
+    assert spans['create_course']['parent_id'] is None
+    assert spans['create_course']['span_id'] == root.span_id
+    assert spans['create_course']['attributes'] == {'subject': 'Rust'}
+    assert spans['curriculum']['parent_id'] == root.span_id
+    assert spans['build_curriculum']['parent_id'] == stage.span_id
+    assert spans['build_curriculum']['attributes'] == {'lessons': 2}
+    assert spans['lessons']['status'] == 'error'
+    assert {span['trace_id'] for span in spans.values()} == {'run-1'}
+
+def test_spans_outside_a_run_are_not_recorded(trace_dir):
+    with tracing.span('orphan') as current:
+        assert current is None
+
+    assert list(trace_dir.iterdir()) == []
+
+def test_nested_run_is_a_span_of_the_outer_trace(trace_dir):
+    with tracing.trace_run('outer', 'train') as root:
+        with tracing.trace_run('inner', 'create_course') as inner:
+            assert inner.parent_id == root.span_id
+
+    assert [path.name for path in trace_dir.iterdir()] == ['outer.jsonl']
+
+def test_calls_are_grouped_into_agent_iterations(trace_dir):
+    with tracing.trace_run('run-2', 'create_course'):
+        with tracing.span('write_lesson', kind='task') as task:
+            start = task.start
+            task.add_call(call('tool', 'tool search', start + 0.002, start + 0.003))
+            task.add_call(call('llm', 'llm gpt', start + 0.001, start + 0.0015))
+            task.add_call(call('llm', 'llm gpt', start + 0.004, start + 0.005))
+
+    spans = trace_report.load_spans(trace_dir / 'run-2.jsonl')
+    iterations = {span['name']: span for span in spans if span['kind'] == 'iteration'}
+    calls = [span for span in spans if span['kind'] in ('llm', 'tool')]
+
+    assert sorted(iterations) == ['iteration 1', 'iteration 2']
+    assert all(span['parent_id'] == task.span_id for span in iterations.values())
+    # The first iteration lasts until the next LLM call and holds the tool call made in between
+    assert iterations['iteration 1']['end'] == pytest.approx(start + 0.004)
+    assert [(span['name'], span['parent_id']) for span in calls] == [
+        ('llm gpt', iterations['iteration 1']['span_id']),
+        ('tool search', iterations['iteration 1']['span_id']),
+        ('llm gpt', iterations['iteration 2']['span_id']),
+    ]
+
+def test_critical_path_skips_children_that_finished_earlier():
+    spans = [
+        span_record('root', None, 'run', 0, 10, kind='run'),
+        span_record('a', 'root', 'curriculum', 0, 4),
+        span_record('b', 'root', 'search', 1, 3),
+        span_record('c', 'root', 'lessons', 4, 10),
+        span_record('c1', 'c', 'lesson 1', 4, 9),
+        span_record('c2', 'c', 'lesson 2', 4, 10),
+    ]
+    roots, children = trace_report.build_tree(spans)
+
+    path = [(span['name'], depth) for span, depth in trace_report.critical_path(roots[0], children)]
+
+    assert path == [('run', 0), ('curriculum', 1), ('lessons', 1), ('lesson 2', 2)]
+    # Overlapping children cover their time once; a leaf's time is all its own
+    lessons = children['root'][-1]
+    assert trace_report.self_time_ms(lessons, children) == 0
+    assert trace_report.self_time_ms(children['c'][0], children) == 5000
+
+def test_report_prints_the_critical_path_and_time_by_kind(trace_dir, capsys):
+    spans = [
+        span_record('root', None, 'run', 0, 10, kind='run'),
+        span_record('a', 'root', 'curriculum', 0, 4),
+        span_record('c', 'root', 'lessons', 6, 10),
+        dict(span_record('l', 'c', 'llm gpt', 6, 8, kind='llm'),
+             attributes={'prompt_tokens': 120, 'completion_tokens': 30}),
+    ]
+
+    trace_report.print_summary(spans)
+    output = capsys.readouterr().out
+
+    assert 'run [run] 10.00s ok' in output
+    assert '  run [run] 10.00s (self 2.00s)' in output
+    assert '      llm gpt [llm] 2.00s (self 2.00s) (prompt_tokens=120, completion_tokens=30)' in output
+    assert 'Tokens: 120 prompt, 30 completion' in output
+
+    trace_report.print_collapsed(spans)
+    assert capsys.readouterr().out.splitlines() == ['run 2000', 'run;curriculum 4000', 'run;lessons 2000',
+                                                    'run;lessons;llm_gpt 2000']
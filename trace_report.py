@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Summarize a run trace written to outputs/traces/
+
+Usage: python trace_report.py [run-id | path/to/trace.jsonl] [--collapsed]
+
+Prints the critical path and the time spent per span kind, or with
+--collapsed, one "root;child;...;span self_ms" line per span for flamegraph
+tools (e.g. flamegraph.pl or speedscope).
+"""
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from src.tracing import TRACE_DIR
+
+def find_trace(arg: str = None) -> Path:
+    """Resolve a run id or path to a trace file; the most recent trace by default"""
+    if arg:
+        path = Path(arg)
+        if path.is_file():
+            return path
+        path = TRACE_DIR / f"{arg}.jsonl"
+        if path.is_file():
+            return path
+        raise FileNotFoundError(f"No trace found for {arg}")
+
+    traces = sorted(TRACE_DIR.glob('*.jsonl'), key=lambda p: p.stat().st_mtime, reverse=True)
+    if not traces:
+        raise FileNotFoundError(f"No traces found in {TRACE_DIR}")
+    return traces[0]
+
+def load_spans(path: Path):
+    """Load the spans of a trace, skipping lines cut off by a crash"""
+    spans = []
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                spans.append(json.loads(line))
+            except ValueError:
+                continue
+    return spans
+
+def build_tree(spans):
+    """Index spans by id and group them under their parents"""
+    by_id = {span['span_id']: span for span in spans}
+    children = defaultdict(list)
+    roots = []
+    for span in spans:
+        if span['parent_id'] in by_id:
+            children[span['parent_id']].append(span)
+        else:
+            roots.append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span['start'])
+    roots.sort(key=lambda span: span['start'])
+    return roots, children
+
+def self_time_ms(span, children) -> float:
+    """Time in a span not covered by any of its children (which may overlap)"""
+    covered = 0.0
+    current_start = current_end = None
+    for child in sorted(children.get(span['span_id'], []), key=lambda s: s['start']):
+        start, end = max(child['start'], span['start']), min(child['end'], span['end'])
+        if end <= start:
+            continue
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return max(0.0, (span['end'] - span['start'] - covered) * 1000)
+
+def critical_path(span, children, depth=0):
+    """Get the spans that determined how long a span took, with their depth
+
+    Walking back from the span's end, each step is the child that finished
+    last before the previous one started; concurrent children that finished
+    earlier did not hold anything up.
+    """
+    path = [(span, depth)]
+    chain = []
+    until = span['end']
+    remaining = list(children.get(span['span_id'], []))
+    while remaining:
+        candidates = [child for child in remaining if child['end'] <= until + 1e-3]
+        if not candidates:
+            break
+        last = max(candidates, key=lambda child: child['end'])
+        chain.append(last)
+        until = last['start']
+        remaining = [child for child in remaining if child['end'] <= until + 1e-3 and child is not last]
+
+    for child in reversed(chain):
+        path.extend(critical_path(child, children, depth + 1))
+    return path
+
+def describe(span) -> str:
+    """Render a span's notable attributes"""
+    attributes = span.get('attributes') or {}
+    keys = ('prompt_tokens', 'completion_tokens', 'prompt_bytes', 'response_bytes', 'agent', 'tool', 'from_cache')
+    parts = [f"{key}={attributes[key]}" for key in keys if attributes.get(key) not in (None, '')]
+    return f" ({', '.join(parts)})" if parts else ''
+
+def print_summary(spans):
+    roots, children = build_tree(spans)
+    for root in roots:
+        print(f"\n{root['name']} [{root['trace_id']}] {root['duration_ms'] / 1000:.2f}s {root['status']}")
+
+        print("\nCritical path:")
+        for span, depth in critical_path(root, children):
+            print(f"  {'  ' * depth}{span['name']} [{span['kind']}] {span['duration_ms'] / 1000:.2f}s"
+                  f" (self {self_time_ms(span, children) / 1000:.2f}s){describe(span)}")
+
+    by_kind = defaultdict(lambda: {'count': 0, 'ms': 0.0})
+    tokens = defaultdict(int)
+    for span in spans:
+        by_kind[span['kind']]['count'] += 1
+        by_kind[span['kind']]['ms'] += span['duration_ms']
+        if span['kind'] == 'llm':
+            for key in ('prompt_tokens', 'completion_tokens'):
+                tokens[key] += (span.get('attributes') or {}).get(key) or 0
+
+    print("\nTime by span kind (summed, concurrent spans overlap):")
+    for kind, totals in sorted(by_kind.items(), key=lambda item: -item[1]['ms']):
+        print(f"  {kind:<10} {totals['count']:>5} spans {totals['ms'] / 1000:>10.2f}s")
+    if tokens:
+        print(f"\nTokens: {tokens['prompt_tokens']} prompt, {tokens['completion_tokens']} completion")
+
+    for kind in ('llm', 'tool'):
+        slowest = sorted((span for span in spans if span['kind'] == kind), key=lambda span: -span['duration_ms'])[:5]
+        if slowest:
+            print(f"\nSlowest {kind} calls:")
+            for span in slowest:
+                print(f"  {span['duration_ms'] / 1000:>8.2f}s {span['name']}{describe(span)}")
+
+def print_collapsed(spans):
+    by_id = {span['span_id']: span for span in spans}
+    _, children = build_tree(spans)
+    for span in spans:
+        stack = []
+        current = span
+        while current is not None:
+            stack.append(current['name'].replace(';', ',').replace(' ', '_'))
+            current = by_id.get(current['parent_id'])
+        self_ms = int(round(self_time_ms(span, children)))
+        if self_ms > 0:
+            print(f"{';'.join(reversed(stack))} {self_ms}")
+
+if __name__ == '__main__':
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    try:
+        trace_path = find_trace(args[0] if args else None)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    trace_spans = load_spans(trace_path)
+    if '--collapsed' in sys.argv:
+        print_collapsed(trace_spans)
+    else:
+        print(f"Trace: {trace_path}")
+        print_summary(trace_spans)